@@ -33,7 +33,7 @@ import sys
 sys.path.append('/app')
 
 from app.database import Base
-from app.models import Logement, Client, Souscription
+from app.models import Logement, Client, Souscription, DocumentJob
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
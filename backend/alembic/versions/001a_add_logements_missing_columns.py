@@ -0,0 +1,43 @@
+"""Add logements columns of the model missing from 001
+
+titre, description, pays, montant_charges and montant_total exist in the
+model but were never created by 001; 002 indexes titre/description.
+Databases created by Base.metadata.create_all already have them and are
+stamped past this revision.
+
+Revision ID: 001a
+Revises: 001
+Create Date: 2024-01-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '001a'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('logements', sa.Column('titre', sa.String(length=200), nullable=True))
+    op.add_column('logements', sa.Column('description', sa.Text(), nullable=True))
+    op.add_column('logements', sa.Column('pays', sa.String(length=100), server_default='France', nullable=False))
+    op.add_column('logements', sa.Column('montant_charges', sa.Float(), server_default='0', nullable=False))
+    op.add_column('logements', sa.Column('montant_total', sa.Float(), nullable=True))
+
+    # Lignes existantes: titre repris de l'adresse, total = loyer + charges
+    op.execute('UPDATE logements SET titre = adresse WHERE titre IS NULL')
+    op.execute('UPDATE logements SET montant_total = loyer + montant_charges WHERE montant_total IS NULL')
+    op.alter_column('logements', 'titre', nullable=False)
+    op.alter_column('logements', 'montant_total', nullable=False)
+
+
+def downgrade() -> None:
+    # Colonnes créées par cette révision (ADD COLUMN échoue si elles existent déjà)
+    op.drop_column('logements', 'montant_total')
+    op.drop_column('logements', 'montant_charges')
+    op.drop_column('logements', 'pays')
+    op.drop_column('logements', 'description')
+    op.drop_column('logements', 'titre')
@@ -0,0 +1,44 @@
+"""Add logements search indexes (trigram + full-text)
+
+Revision ID: 002
+Revises: 001a
+Create Date: 2024-02-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001a'
+branch_labels = None
+depends_on = None
+
+# Doit rester identique à app.models.logement.logement_search_vector
+SEARCH_VECTOR = "to_tsvector('french'::regconfig, coalesce(titre, '') || ' ' || coalesce(description, ''))"
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # CONCURRENTLY: pas de verrou d'écriture sur la table pendant la construction
+    with op.get_context().autocommit_block():
+        for column in ('ville', 'adresse', 'titre'):
+            op.create_index(
+                f'ix_logements_{column}_trgm', 'logements', [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            'ix_logements_search', 'logements', [sa.text(SEARCH_VECTOR)],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_logements_search', table_name='logements', postgresql_concurrently=True)
+        for column in ('titre', 'adresse', 'ville'):
+            op.drop_index(f'ix_logements_{column}_trgm', table_name='logements', postgresql_concurrently=True)
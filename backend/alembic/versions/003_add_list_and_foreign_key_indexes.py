@@ -0,0 +1,56 @@
+"""Add composite indexes for list sorting, duplicate checks and foreign keys
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-02-05 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+# Ordre de LogementService._list_statement et _page_statement (curseur)
+RECENT_COLUMNS = [
+    sa.text('updated_at DESC NULLS LAST'),
+    sa.text('created_at DESC'),
+    sa.text('id DESC'),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_logements_recent', 'logements', RECENT_COLUMNS,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_logements_disponibles_recent', 'logements', RECENT_COLUMNS,
+            postgresql_where=sa.text("statut = 'DISPONIBLE'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_logements_adresse_ville', 'logements', ['adresse', 'ville'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f('ix_souscriptions_client_id'), 'souscriptions', ['client_id'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f('ix_souscriptions_logement_id'), 'souscriptions', ['logement_id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_souscriptions_logement_id'), table_name='souscriptions', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_souscriptions_client_id'), table_name='souscriptions', postgresql_concurrently=True)
+        op.drop_index('ix_logements_adresse_ville', table_name='logements', postgresql_concurrently=True)
+        op.drop_index('ix_logements_disponibles_recent', table_name='logements', postgresql_concurrently=True)
+        op.drop_index('ix_logements_recent', table_name='logements', postgresql_concurrently=True)
@@ -0,0 +1,40 @@
+"""Enforce logement address uniqueness on normalised (adresse, ville)
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-02-12 10:00:00.000000
+
+Remplace la vérification applicative des doublons (SELECT avant INSERT) par
+un index unique servant de cible aux INSERT ... ON CONFLICT. La création
+échoue si des doublons existent déjà (à fusionner manuellement avant).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_logements_adresse_ville', 'logements',
+            [sa.text('lower(adresse)'), sa.text('lower(ville)')],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        # Remplacé par l'index unique
+        op.drop_index('ix_logements_adresse_ville', table_name='logements', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_logements_adresse_ville', 'logements', ['adresse', 'ville'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index('uq_logements_adresse_ville', table_name='logements', postgresql_concurrently=True)
@@ -0,0 +1,62 @@
+"""Create document_jobs queue for asynchronous PDF generation
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-02-19 10:00:00.000000
+
+File d'attente persistante des PDF (proforma, attestation) générés hors
+requête par les workers de documents. L'index partiel ix_document_jobs_a_traiter
+sert la réservation (FOR UPDATE SKIP LOCKED), uq_document_jobs_actif la mise
+en file idempotente (INSERT ... ON CONFLICT DO NOTHING).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('document_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('souscription_id', sa.Integer(), nullable=False),
+    sa.Column('type_document', sa.Enum('PROFORMA', 'ATTESTATION', name='typedocument'), nullable=False),
+    sa.Column('statut', sa.Enum('EN_ATTENTE', 'EN_COURS', 'TERMINE', 'ECHEC', name='statutjob'), nullable=False),
+    sa.Column('tentatives', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('max_tentatives', sa.Integer(), server_default=sa.text('3'), nullable=False),
+    sa.Column('disponible_a', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('fichier', sa.String(), nullable=True),
+    sa.Column('erreur', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('termine_a', sa.DateTime(timezone=True), nullable=True),
+    sa.CheckConstraint('tentatives >= 0', name='check_tentatives_positive_ou_nulle'),
+    sa.CheckConstraint('max_tentatives > 0', name='check_max_tentatives_positive'),
+    sa.ForeignKeyConstraint(['souscription_id'], ['souscriptions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_document_jobs_id'), 'document_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_document_jobs_souscription_id'), 'document_jobs', ['souscription_id'], unique=False)
+    op.create_index(
+        'ix_document_jobs_a_traiter', 'document_jobs', ['disponible_a', 'id'],
+        postgresql_where=sa.text("statut = 'EN_ATTENTE'"),
+    )
+    op.create_index(
+        'uq_document_jobs_actif', 'document_jobs', ['souscription_id', 'type_document'],
+        unique=True,
+        postgresql_where=sa.text("statut IN ('EN_ATTENTE', 'EN_COURS')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_document_jobs_actif', table_name='document_jobs')
+    op.drop_index('ix_document_jobs_a_traiter', table_name='document_jobs')
+    op.drop_index(op.f('ix_document_jobs_souscription_id'), table_name='document_jobs')
+    op.drop_index(op.f('ix_document_jobs_id'), table_name='document_jobs')
+    op.drop_table('document_jobs')
+    sa.Enum(name='statutjob').drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name='typedocument').drop(op.get_bind(), checkfirst=True)
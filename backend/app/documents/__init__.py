@@ -0,0 +1,9 @@
+from .renderers import (
+    render_document, render_proforma, render_attestation, RENDERERS,
+    TEMPLATE_VERSION, AttestationTemplate, ProformaTemplate
+)
+
+__all__ = [
+    "render_document", "render_proforma", "render_attestation", "RENDERERS",
+    "TEMPLATE_VERSION", "AttestationTemplate", "ProformaTemplate"
+]
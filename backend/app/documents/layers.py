@@ -0,0 +1,170 @@
+"""Couches statiques des documents, construites une fois par processus
+
+Polices, logo, cachet et blocs de texte de l'organisation ne dépendent que de
+la configuration (organisation.json): ils sont chargés, encodés et mis en
+page au premier document puis seulement rejoués. Un document ne trace plus
+que ses champs variables (client, logement, référence, QR code).
+"""
+from copy import copy
+from functools import lru_cache
+from hashlib import sha1
+from typing import List, Optional, Tuple
+import logging
+import os
+
+from reportlab.lib.colors import Color
+from reportlab.lib.utils import ImageReader, simpleSplit
+from reportlab.pdfbase import pdfdoc, pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+# Images référencées par organisation.json ("/static/logo-boaz-housing.png"),
+# répertoire remplaçable par DOCUMENTS_STATIC_DIR
+DEFAULT_STATIC_DIR = os.path.join(os.path.dirname(__file__), "../../static")
+# Polices TrueType optionnelles (accents hors Latin-1, charte graphique), Helvetica sinon
+DOCUMENTS_FONT = os.getenv("DOCUMENTS_FONT")
+DOCUMENTS_FONT_BOLD = os.getenv("DOCUMENTS_FONT_BOLD")
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def polices() -> Tuple[str, str]:
+    """Polices (normale, grasse), enregistrées et mesurées une seule fois"""
+    if DOCUMENTS_FONT and DOCUMENTS_FONT_BOLD:
+        pdfmetrics.registerFont(TTFont("Document", DOCUMENTS_FONT))
+        pdfmetrics.registerFont(TTFont("Document-Bold", DOCUMENTS_FONT_BOLD))
+        normale, grasse = "Document", "Document-Bold"
+    else:
+        normale, grasse = "Helvetica", "Helvetica-Bold"
+    # Chargement des métriques (AFM/TTF) hors du premier document
+    for police in (normale, grasse):
+        pdfmetrics.stringWidth("Boaz-Housing", police, 10)
+    return normale, grasse
+
+class CachedImage:
+    """Image encodée une fois (flux PDF compressé), réutilisée par chaque document
+
+    canvas.drawImage réencode l'image (zlib, ASCII85) dans chaque nouveau PDF;
+    ici l'objet XObject est construit au chargement et seulement référencé.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.name = "img" + sha1(f.read()).hexdigest()[:16]
+        xobject = pdfdoc.PDFImageXObject(self.name, ImageReader(path), mask="auto")
+        xobject.name = self.name
+        xobject.XObjects = None
+        # Transparence (PNG alpha): masque encodé une fois lui aussi
+        self.smask = getattr(xobject, "_smask", None)
+        if self.smask is not None:
+            del xobject._smask
+            self.smask.XObjects = None
+        self.xobject = xobject
+        self.width, self.height = xobject.width, xobject.height
+
+    @staticmethod
+    def _copie(xobject):
+        """Copie légère (flux encodé partagé) enregistrable dans un nouveau document"""
+        xobject = copy(xobject)
+        xobject.__dict__.pop(pdfdoc.__InternalName__, None)
+        return xobject
+
+    def _register(self, c: canvas.Canvas) -> None:
+        """Déclarer l'image dans le document du canvas (une fois par PDF)"""
+        doc = c._doc
+        reg_name = doc.getXObjectName(self.name)
+        if reg_name in doc.idToObject:
+            return
+        xobject = self._copie(self.xobject)
+        if self.smask is not None:
+            # Masque partagé avec une autre image de même transparence
+            mask_name = doc.getXObjectName(self.smask.name)
+            if mask_name in doc.idToObject:
+                xobject.smask = pdfdoc.PDFObjectReference(mask_name)
+            else:
+                xobject.smask = doc.Reference(self._copie(self.smask), mask_name)
+        doc.Reference(xobject, reg_name)
+        doc.addForm(self.name, xobject)
+
+    def draw(self, c: canvas.Canvas, x: float, y: float, largeur: float) -> float:
+        """Tracer l'image en (x, y), proportions conservées, renvoie la hauteur tracée"""
+        self._register(c)
+        c._currentPageHasImages = 1
+        hauteur = largeur * self.height / self.width
+        c.saveState()
+        c.translate(x, y)
+        c.scale(largeur, hauteur)
+        c.doForm(self.name)
+        c.restoreState()
+        return hauteur
+
+def static_dir() -> str:
+    """Répertoire des images, lu à l'appel: indépendant de l'ordre des imports"""
+    return os.getenv("DOCUMENTS_STATIC_DIR", DEFAULT_STATIC_DIR)
+
+def static_path(chemin: Optional[str]) -> Optional[str]:
+    """Fichier local d'un chemin /static/... de la configuration, None s'il manque"""
+    if not chemin:
+        return None
+    relatif = chemin.split("/static/", 1)[-1].lstrip("/")
+    path = os.path.join(static_dir(), relatif)
+    return path if os.path.isfile(path) else None
+
+@lru_cache(maxsize=16)
+def cached_image(chemin: Optional[str]) -> Optional[CachedImage]:
+    """Image de la configuration chargée une fois par processus (None si absente)"""
+    path = static_path(chemin)
+    if path is None:
+        if chemin:
+            logger.warning("Image de document introuvable: %s", chemin)
+        return None
+    try:
+        return CachedImage(path)
+    except Exception:
+        logger.exception("Image de document illisible: %s", path)
+        return None
+
+class StaticLayer:
+    """Éléments fixes d'une page: textes positionnés, filets et images
+
+    Construit une fois, tracé à l'identique (ou décalé verticalement) sur
+    chaque document.
+    """
+
+    def __init__(self):
+        self.textes: List[Tuple[str, float, float, float, str, bool]] = []
+        self.filets: List[Tuple[Color, float, float, float, float, float]] = []
+        self.images: List[Tuple[CachedImage, float, float, float]] = []
+
+    def texte(self, police: str, taille: float, x: float, y: float, texte: str, centre: bool = False) -> None:
+        self.textes.append((police, taille, x, y, texte, centre))
+
+    def paragraphe(self, texte: str, x: float, y: float, largeur: float, police: str, taille: float) -> float:
+        """Paragraphe coupé à la largeur donnée, renvoie l'ordonnée sous le paragraphe"""
+        for ligne in simpleSplit(texte, police, taille, largeur):
+            self.texte(police, taille, x, y, ligne)
+            y -= taille * 1.4
+        return y - taille * 0.6
+
+    def filet(self, couleur: Color, epaisseur: float, x1: float, y1: float, x2: float, y2: float) -> None:
+        self.filets.append((couleur, epaisseur, x1, y1, x2, y2))
+
+    def image(self, image: CachedImage, x: float, y: float, largeur: float) -> None:
+        self.images.append((image, x, y, largeur))
+
+    def draw(self, c: canvas.Canvas, dy: float = 0) -> None:
+        police_courante = None
+        for police, taille, x, y, texte, centre in self.textes:
+            if (police, taille) != police_courante:
+                c.setFont(police, taille)
+                police_courante = (police, taille)
+            if centre:
+                c.drawCentredString(x, y + dy, texte)
+            else:
+                c.drawString(x, y + dy, texte)
+        for couleur, epaisseur, x1, y1, x2, y2 in self.filets:
+            c.setStrokeColor(couleur)
+            c.setLineWidth(epaisseur)
+            c.line(x1, y1 + dy, x2, y2 + dy)
+        for image, x, y, largeur in self.images:
+            image.draw(c, x, y + dy, largeur)
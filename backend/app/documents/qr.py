@@ -0,0 +1,93 @@
+"""QR codes des documents: matrice calculée une fois par contenu, tracée en un seul chemin
+
+Les mêmes matrices donnent les images PNG/SVG servies par l'API (voir
+QRCodeService), rendues par lots dans un pool de processus.
+"""
+from functools import lru_cache
+from io import BytesIO
+from typing import Iterator, List, Sequence, Tuple
+
+import qrcode
+from PIL import Image
+from qrcode.constants import ERROR_CORRECT_M
+from reportlab.pdfgen import canvas
+
+Matrice = Tuple[Tuple[bool, ...], ...]
+
+# Marge blanche autour du QR code (modules), minimum de la norme pour les images
+MARGE_IMAGE = 4
+
+@lru_cache(maxsize=1024)
+def qr_matrix(data: str) -> Matrice:
+    """Modules du QR code (True = noir), sans marge"""
+    qr = qrcode.QRCode(error_correction=ERROR_CORRECT_M, border=0)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(tuple(ligne) for ligne in qr.get_matrix())
+
+def _runs(matrice: Matrice) -> Iterator[Tuple[int, int, int]]:
+    """Modules noirs consécutifs de chaque ligne: (ligne, colonne de début, longueur)"""
+    for i, ligne in enumerate(matrice):
+        j = 0
+        while j < len(ligne):
+            if ligne[j]:
+                debut = j
+                while j < len(ligne) and ligne[j]:
+                    j += 1
+                yield i, debut, j - debut
+            else:
+                j += 1
+
+def draw_qr(c: canvas.Canvas, data: str, x: float, y: float, taille: float) -> None:
+    """Tracer le QR code en (x, y), coin bas gauche, sur `taille` points de côté
+
+    Les modules noirs consécutifs d'une ligne sont fusionnés en un rectangle,
+    le tout rempli en une opération (au lieu d'une forme par module).
+    """
+    matrice = qr_matrix(data)
+    module = taille / len(matrice)
+    chemin = c.beginPath()
+    for i, debut, longueur in _runs(matrice):
+        chemin.rect(x + debut * module, y + taille - (i + 1) * module, longueur * module, module)
+    c.saveState()
+    c.setFillColorRGB(0, 0, 0)
+    c.drawPath(chemin, stroke=0, fill=1)
+    c.restoreState()
+
+def qr_png(data: str, module: int = 8) -> bytes:
+    """Image PNG noir et blanc (1 bit), `module` pixels par module"""
+    matrice = qr_matrix(data)
+    cote = len(matrice) + 2 * MARGE_IMAGE
+    image = Image.new("1", (cote, cote), 1)
+    pixels = image.load()
+    for i, debut, longueur in _runs(matrice):
+        for j in range(debut, debut + longueur):
+            pixels[j + MARGE_IMAGE, i + MARGE_IMAGE] = 0
+    image = image.resize((cote * module, cote * module), Image.NEAREST)
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+def qr_svg(data: str, module: int = 8) -> bytes:
+    """Image SVG: un seul chemin, coordonnées en modules (mise à l'échelle par viewBox)"""
+    matrice = qr_matrix(data)
+    cote = len(matrice) + 2 * MARGE_IMAGE
+    chemin = "".join(
+        f"M{debut + MARGE_IMAGE} {i + MARGE_IMAGE}h{longueur}v1h-{longueur}z"
+        for i, debut, longueur in _runs(matrice)
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{cote * module}" height="{cote * module}" '
+        f'viewBox="0 0 {cote} {cote}" shape-rendering="crispEdges">'
+        f'<rect width="{cote}" height="{cote}" fill="#fff"/><path d="{chemin}" fill="#000"/></svg>'
+    ).encode()
+
+QR_FORMATS = {"png": qr_png, "svg": qr_svg}
+
+def render_qr_batch(format: str, datas: Sequence[str], module: int = 8) -> List[bytes]:
+    """Point d'entrée des processus du pool: un lot d'images du même format"""
+    try:
+        renderer = QR_FORMATS[format]
+    except KeyError:
+        raise ValueError(f"Format de QR code inconnu: {format}") from None
+    return [renderer(data, module) for data in datas]
@@ -0,0 +1,227 @@
+"""Rendu PDF des documents de souscription (reportlab)
+
+Les fonctions de ce module ne dépendent ni de la base ni de l'application:
+elles reçoivent un dictionnaire de données simples (voir
+DocumentJobService.build_payload) et s'exécutent dans les processus du pool
+des workers de documents.
+
+Chaque type de document est un gabarit construit une fois par processus et par
+configuration de l'organisation (couches statiques, voir layers.py); le rendu
+d'un document ne trace que ses champs variables.
+"""
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, Callable, Dict
+import json
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+
+from app.documents.layers import StaticLayer, cached_image, polices
+from app.documents.qr import draw_qr
+
+# Version de la mise en page, à incrémenter à chaque modification visible des PDF
+TEMPLATE_VERSION = "2"
+
+LARGEUR, HAUTEUR = A4
+MARGE = 20 * mm
+LARGEUR_UTILE = LARGEUR - 2 * MARGE
+COULEUR = colors.HexColor("#1f4e79")
+
+def _montant(valeur: float) -> str:
+    """1234.5 -> '1 234,50 €'"""
+    return f"{valeur:,.2f} €".replace(",", " ").replace(".", ",")
+
+class DocumentTemplate:
+    """Gabarit A4: en-tête de l'organisation (texte et logo) construit une fois"""
+
+    titre = ""
+
+    def __init__(self, organisation: Dict[str, Any], ceo: Dict[str, Any]):
+        self.organisation = organisation
+        self.ceo = ceo
+        self.normale, self.grasse = polices()
+        self.fixe = StaticLayer()
+        self.y_contenu = self._build_entete(self.fixe)
+
+    def _build_entete(self, couche: StaticLayer) -> float:
+        """Bloc organisation et titre du document, renvoie l'ordonnée du contenu"""
+        organisation = self.organisation
+        y = HAUTEUR - MARGE
+        logo = cached_image(organisation.get("logo_path"))
+        if logo is not None:
+            couche.image(logo, LARGEUR - MARGE - 30 * mm, y - 30 * mm * logo.height / logo.width + 12, 30 * mm)
+        couche.texte(self.grasse, 16, MARGE, y, organisation["nom"])
+        for ligne in (
+            organisation["adresse_siege"],
+            f"{organisation['telephone']} - {organisation['email_contact']} - {organisation['site_web']}",
+            f"RCS {organisation['ville_rcs']} {organisation['numero_rcs']} - NAF {organisation['code_naf']}",
+        ):
+            y -= 12
+            couche.texte(self.normale, 9, MARGE, y, ligne)
+        y -= 8
+        couche.filet(COULEUR, 1.5, MARGE, y, LARGEUR - MARGE, y)
+        y -= 12 * mm
+        couche.texte(self.grasse, 18, LARGEUR / 2, y, self.titre, centre=True)
+        return y - 16
+
+    def _nouveau_canvas(self, buffer: BytesIO, reference: str) -> canvas.Canvas:
+        c = canvas.Canvas(buffer, pagesize=A4)
+        c.setTitle(f"{self.titre.capitalize()} {reference}")
+        c.setAuthor(self.organisation["nom"])
+        return c
+
+    def _reference(self, c: canvas.Canvas, data: Dict[str, Any]) -> float:
+        c.setFont(self.normale, 10)
+        c.drawCentredString(LARGEUR / 2, self.y_contenu, f"Référence: {data['reference']} - Émis le {data['date_emission']}")
+        return self.y_contenu - 16 * mm + 16
+
+    def _paragraphe(self, c: canvas.Canvas, texte: str, y: float, police: str = None, taille: int = 11) -> float:
+        """Texte variable sur plusieurs lignes, renvoie l'ordonnée sous le paragraphe"""
+        police = police or self.normale
+        c.setFont(police, taille)
+        for ligne in simpleSplit(texte, police, taille, LARGEUR_UTILE):
+            c.drawString(MARGE, y, ligne)
+            y -= taille * 1.4
+        return y - taille * 0.6
+
+    def render(self, data: Dict[str, Any]) -> bytes:
+        buffer = BytesIO()
+        c = self._nouveau_canvas(buffer, data["reference"])
+        self.fixe.draw(c)
+        self.draw(c, data, self._reference(c, data))
+        c.showPage()
+        c.save()
+        return buffer.getvalue()
+
+    def draw(self, c: canvas.Canvas, data: Dict[str, Any], y: float) -> None:
+        raise NotImplementedError
+
+class ProformaTemplate(DocumentTemplate):
+    """Facture proforma: loyer et charges sur la durée de location"""
+
+    titre = "FACTURE PROFORMA"
+    COLONNES = (MARGE, MARGE + 105 * mm, MARGE + 130 * mm, LARGEUR - MARGE)
+
+    def __init__(self, organisation: Dict[str, Any], ceo: Dict[str, Any]):
+        super().__init__(organisation, ceo)
+        self.fixe.paragraphe(
+            "Document proforma sans valeur de facture définitive. Paiement à réception, "
+            "en indiquant la référence du document.",
+            MARGE, MARGE + 20 * mm, LARGEUR_UTILE, self.normale, 9
+        )
+
+    def _ligne(self, c: canvas.Canvas, y: float, cellules, police: str) -> None:
+        c.setFont(police, 10)
+        c.drawString(self.COLONNES[0], y, cellules[0])
+        for x, cellule in zip(self.COLONNES[1:], cellules[1:]):
+            c.drawRightString(x, y, cellule)
+
+    def draw(self, c: canvas.Canvas, data: Dict[str, Any], y: float) -> None:
+        client, logement, souscription = data["client"], data["logement"], data["souscription"]
+        c.setFont(self.grasse, 11)
+        c.drawString(MARGE, y, "Client")
+        y = self._paragraphe(c, f"{client['nom_complet']} - {client['email']} - {client['telephone']}", y - 14)
+        c.setFont(self.grasse, 11)
+        c.drawString(MARGE, y, "Logement")
+        y = self._paragraphe(
+            c,
+            f"{logement['titre']}, {logement['adresse']}, {logement['code_postal']} {logement['ville']}, {logement['pays']}",
+            y - 14
+        )
+        y = self._paragraphe(c, f"Entrée le {souscription['date_entree']} pour {souscription['duree_location']} mois", y)
+
+        duree = souscription["duree_location"]
+        self._ligne(c, y, ("Désignation", "Mensuel", "Mois", "Montant"), self.grasse)
+        for libelle, mensuel in (("Loyer", logement["loyer"]), ("Charges", logement["montant_charges"])):
+            y -= 16
+            self._ligne(c, y, (libelle, _montant(mensuel), str(duree), _montant(mensuel * duree)), self.normale)
+        c.setStrokeColor(colors.black)
+        c.setLineWidth(1)
+        c.line(MARGE, y - 8, LARGEUR - MARGE, y - 8)
+        c.setFont(self.grasse, 11)
+        c.drawString(MARGE, y - 22, "Total")
+        c.drawRightString(LARGEUR - MARGE, y - 22, _montant(logement["montant_total"] * duree))
+
+class AttestationTemplate(DocumentTemplate):
+    """Attestation d'hébergement vérifiable par QR code"""
+
+    titre = "ATTESTATION D'HÉBERGEMENT"
+
+    def __init__(self, organisation: Dict[str, Any], ceo: Dict[str, Any]):
+        super().__init__(organisation, ceo)
+        # Préambule du dirigeant: position fixe sous le titre
+        self.y_contenu_client = self.fixe.paragraphe(
+            f"Je soussigné {ceo['nom_complet']}, né le {ceo['date_naissance']} à {ceo['ville_naissance']} "
+            f"({ceo['pays_naissance']}), agissant en qualité de dirigeant de {organisation['nom']}, "
+            "atteste que:",
+            MARGE, self.y_contenu - 16 * mm + 16, LARGEUR_UTILE, self.normale, 11
+        )
+        # Formule de clôture et signature: tracées sous le texte variable (décalage vertical)
+        self.cloture = StaticLayer()
+        y = self.cloture.paragraphe(
+            "Cette attestation est délivrée pour servir et valoir ce que de droit.",
+            MARGE, 0, LARGEUR_UTILE, self.normale, 11
+        )
+        self.x_signature = LARGEUR - MARGE - 70 * mm
+        self.cloture.texte(self.normale, 11, self.x_signature, y - 26, ceo["nom_complet"])
+        cachet = cached_image(organisation.get("cachet_signature_path"))
+        if cachet is not None:
+            self.cloture.image(cachet, self.x_signature, y - 36 - 40 * mm * cachet.height / cachet.width, 40 * mm)
+        self.y_signature = y - 10
+        self.fixe.texte(self.normale, 8, MARGE + 34 * mm, MARGE + 14 * mm, "Vérifier l'authenticité de ce document:")
+
+    def draw(self, c: canvas.Canvas, data: Dict[str, Any], y: float) -> None:
+        client, logement, souscription = data["client"], data["logement"], data["souscription"]
+        y = self._paragraphe(
+            c,
+            f"{client['nom_complet']}, né(e) le {client['date_naissance']} à {client['ville_naissance']} "
+            f"({client['pays_naissance']}), étudiant(e) en {client['niveau_etude']} à {client['etablissement']},",
+            self.y_contenu_client, police=self.grasse
+        )
+        y = self._paragraphe(
+            c,
+            f"est hébergé(e) au {logement['adresse']}, {logement['code_postal']} {logement['ville']}, "
+            f"{logement['pays']}, à compter du {souscription['date_entree']} pour une durée de "
+            f"{souscription['duree_location']} mois, moyennant un loyer mensuel charges comprises de "
+            f"{_montant(logement['montant_total'])}.",
+            y
+        )
+        self.cloture.draw(c, dy=y)
+        c.setFont(self.normale, 11)
+        c.drawString(self.x_signature, y + self.y_signature, f"Fait le {data['date_emission']}")
+
+        draw_qr(c, data["qr_code_url"], MARGE, MARGE, 30 * mm)
+        c.setFont(self.normale, 8)
+        c.drawString(MARGE + 34 * mm, MARGE + 10 * mm, data["qr_code_url"])
+
+@lru_cache(maxsize=8)
+def _template(classe: type, configuration: str) -> DocumentTemplate:
+    organisation, ceo = json.loads(configuration)
+    return classe(organisation, ceo)
+
+def get_template(classe: type, data: Dict[str, Any]) -> DocumentTemplate:
+    """Gabarit du processus pour la configuration de l'organisation du document"""
+    return _template(classe, json.dumps([data["organisation"], data["ceo"]], sort_keys=True))
+
+def render_proforma(data: Dict[str, Any]) -> bytes:
+    return get_template(ProformaTemplate, data).render(data)
+
+def render_attestation(data: Dict[str, Any]) -> bytes:
+    return get_template(AttestationTemplate, data).render(data)
+
+RENDERERS: Dict[str, Callable[[Dict[str, Any]], bytes]] = {
+    "proforma": render_proforma,
+    "attestation": render_attestation,
+}
+
+def render_document(type_document: str, data: Dict[str, Any]) -> bytes:
+    """Point d'entrée des processus du pool (type en chaîne pour rester sérialisable)"""
+    try:
+        renderer = RENDERERS[type_document]
+    except KeyError:
+        raise ValueError(f"Type de document inconnu: {type_document}") from None
+    return renderer(data)
@@ -0,0 +1,69 @@
+"""Stockage des PDF adressé par contenu
+
+Un document est rangé sous l'empreinte de ce qui le produit: version du
+gabarit, type et données d'entrée (référence, client, logement, souscription,
+organisation). Retélécharger ou renvoyer un document inchangé ne le refait
+pas; toute modification du client ou du logement change l'empreinte, le PDF
+précédent n'est plus servi et sera remplacé au prochain rendu.
+"""
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+from app.documents.renderers import TEMPLATE_VERSION
+
+# Répertoire des PDF générés (partagé entre l'API et les workers)
+DOCUMENTS_DIR = os.getenv("DOCUMENTS_DIR", os.path.join(os.path.dirname(__file__), "../../storage/documents"))
+
+# Champs du payload sans effet sur l'empreinte: la date d'émission est celle
+# du premier rendu, elle ne doit pas invalider le document chaque jour.
+CHAMPS_HORS_EMPREINTE = frozenset({"date_emission"})
+
+class DocumentStore:
+    """PDF sur le système de fichiers local, un fichier par empreinte"""
+
+    def __init__(self, root: str = DOCUMENTS_DIR):
+        self.root = root
+
+    def key(self, type_document: str, payload: Dict[str, Any]) -> str:
+        """Empreinte SHA-256 de (version du gabarit, type, données d'entrée)"""
+        entrees = {champ: valeur for champ, valeur in payload.items() if champ not in CHAMPS_HORS_EMPREINTE}
+        contenu = json.dumps(
+            [TEMPLATE_VERSION, type_document, entrees],
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(contenu.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        # Sous-répertoires par préfixe: pas de répertoire géant
+        return os.path.join(self.root, key[:2], f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[str]:
+        """Chemin du document déjà rendu, None s'il faut le (re)générer"""
+        path = self.path(key)
+        return path if os.path.isfile(path) else None
+
+    def put(self, key: str, contenu: bytes) -> str:
+        """Écriture atomique: un lecteur ne voit jamais de PDF partiel"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporaire = f"{path}.{os.getpid()}.tmp"
+        with open(temporaire, "wb") as f:
+            f.write(contenu)
+        os.replace(temporaire, path)
+        return path
+
+    def discard(self, path: str) -> bool:
+        """Supprimer un document remplacé (uniquement dans le stockage)"""
+        root = os.path.realpath(self.root)
+        path = os.path.realpath(path)
+        if os.path.commonpath([root, path]) != root:
+            return False
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+# Instance globale du stockage
+document_store = DocumentStore()
@@ -0,0 +1,178 @@
+"""Worker de génération des PDF de souscription
+
+Réserve les jobs de la table document_jobs par lots, rend les PDF dans un pool
+de processus (le rendu reportlab est lié au CPU) et enregistre le résultat.
+
+Exécution dédiée, conseillée en production:
+
+    python -m app.documents.worker
+
+ou embarquée dans chaque worker de l'API avec DOCUMENT_WORKER_ENABLED=true.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.documents.renderers import render_document
+from app.models.document_job import DocumentJob
+from app.services.document_job_service import document_job_service, DocumentJobService
+
+DOCUMENT_WORKER_ENABLED = os.getenv("DOCUMENT_WORKER_ENABLED", "false").lower() == "true"
+DOCUMENT_WORKER_PROCESSES = int(os.getenv("DOCUMENT_WORKER_PROCESSES", "2"))
+DOCUMENT_WORKER_BATCH_SIZE = int(os.getenv("DOCUMENT_WORKER_BATCH_SIZE", "20"))
+DOCUMENT_WORKER_POLL_INTERVAL = float(os.getenv("DOCUMENT_WORKER_POLL_INTERVAL", "2"))
+
+logger = logging.getLogger(__name__)
+
+class DocumentWorker:
+    """Boucle de traitement des jobs de documents"""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        service: DocumentJobService = document_job_service,
+        processes: int = DOCUMENT_WORKER_PROCESSES,
+        batch_size: int = DOCUMENT_WORKER_BATCH_SIZE,
+        poll_interval: float = DOCUMENT_WORKER_POLL_INTERVAL,
+        executor: Optional[Executor] = None
+    ):
+        if session_factory is None:
+            from app.database import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+        self.service = service
+        self.processes = processes
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._executor = executor
+        self._task: Optional[asyncio.Task] = None
+        self._last_requeue = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        # spawn: pas de fork d'un processus avec threads et connexions ouvertes
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _claim(self) -> Tuple[List[DocumentJob], Dict[int, Dict[str, Any]]]:
+        with self.session_factory() as db:
+            if time.monotonic() - self._last_requeue >= self.service.timeout:
+                self._last_requeue = time.monotonic()
+                remis = self.service.requeue_stale(db)
+                if remis:
+                    logger.warning("%d job(s) de document abandonné(s) remis en file", remis)
+            jobs = self.service.claim(db, self.batch_size)
+            if not jobs:
+                return [], {}
+            return jobs, self.service.build_payloads(db, jobs)
+
+    async def _render(self, job: DocumentJob, payload: Optional[Dict[str, Any]]) -> Tuple[str, Optional[bytes]]:
+        """Empreinte du document et PDF rendu (None s'il est déjà stocké)"""
+        if payload is None:
+            raise LookupError(f"Souscription {job.souscription_id} introuvable")
+        key = self.service.store.key(job.type_document.value, payload)
+        if self.service.store.get(key) is not None:
+            # Mêmes données qu'un rendu précédent (nouvelle demande, reprise)
+            return key, None
+        loop = asyncio.get_running_loop()
+        try:
+            contenu = await loop.run_in_executor(self.executor, render_document, job.type_document.value, payload)
+        except BrokenProcessPool:
+            # Processus du pool tué (mémoire, signal): pool recréé au lot suivant
+            self._executor = None
+            raise
+        return key, contenu
+
+    def _record(self, jobs: Sequence[DocumentJob], resultats: Sequence[Any]) -> None:
+        with self.session_factory() as db:
+            for job, resultat in zip(jobs, resultats):
+                if not isinstance(resultat, BaseException):
+                    try:
+                        key, contenu = resultat
+                        fichier = self.service.store.get(key) if contenu is None else self.service.store.put(key, contenu)
+                        if fichier is None:
+                            raise FileNotFoundError(f"Document {key} supprimé pendant le traitement")
+                        self.service.complete(db, job, fichier)
+                        continue
+                    except OSError as e:
+                        resultat = e
+                statut = self.service.fail(db, job, f"{type(resultat).__name__}: {resultat}")
+                logger.warning(
+                    "Échec du document %s de la souscription %d (tentative %d/%d, %s): %s",
+                    job.type_document.value, job.souscription_id, job.tentatives, job.max_tentatives,
+                    statut.value, resultat
+                )
+
+    async def run_once(self) -> int:
+        """Traiter un lot de jobs prêts, renvoie le nombre de jobs réservés"""
+        jobs, payloads = await run_in_threadpool(self._claim)
+        if not jobs:
+            return 0
+        resultats = await asyncio.gather(
+            *(self._render(job, payloads.get(job.id)) for job in jobs),
+            return_exceptions=True
+        )
+        await run_in_threadpool(self._record, jobs, resultats)
+        return len(jobs)
+
+    async def run(self) -> None:
+        """Boucle principale: enchaîne les lots tant que la file est pleine"""
+        while True:
+            try:
+                traites = await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erreur du worker de documents")
+                traites = 0
+            if traites < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+# Instance globale (pool de processus créé au premier lot)
+document_worker = DocumentWorker()
+
+async def _run_forever() -> None:
+    try:
+        await document_worker.run()
+    finally:
+        await document_worker.stop()
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logger.info(
+        "Worker de documents: %d processus, lots de %d",
+        document_worker.processes, document_worker.batch_size
+    )
+    try:
+        asyncio.run(_run_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
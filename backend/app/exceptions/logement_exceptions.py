@@ -1,4 +1,5 @@
 from fastapi import HTTPException
+from app.monitoring.metrics import LOGEMENT_ERRORS
 
 class LogementException(Exception):
     """Exception de base pour les logements"""
@@ -34,7 +35,12 @@ class LogementStatutError(LogementException):
         super().__init__(self.message)
 
 def convert_to_http_exception(exc: LogementException) -> HTTPException:
-    """Convertir une exception métier en HTTPException FastAPI"""
+    """Convertir une exception métier en HTTPException FastAPI (comptée dans /metrics)"""
+    http_exception = _to_http_exception(exc)
+    LOGEMENT_ERRORS.inc(exception=type(exc).__name__, status_code=http_exception.status_code)
+    return http_exception
+
+def _to_http_exception(exc: LogementException) -> HTTPException:
     if isinstance(exc, LogementValidationError):
         return HTTPException(
             status_code=422,
@@ -0,0 +1,104 @@
+from fastapi import HTTPException
+from typing import Union
+
+class SouscriptionException(Exception):
+    """Exception de base pour les souscriptions et leurs documents"""
+    pass
+
+class SouscriptionNotFoundError(SouscriptionException):
+    """Souscription non trouvée (par ID ou par référence)"""
+    def __init__(self, souscription_id: Union[int, str]):
+        self.souscription_id = souscription_id
+        if isinstance(souscription_id, str):
+            self.message = f"Souscription avec la référence {souscription_id} non trouvée"
+        else:
+            self.message = f"Souscription avec l'ID {souscription_id} non trouvée"
+        super().__init__(self.message)
+
+class SouscriptionStatutError(SouscriptionException):
+    """Transition de statut non autorisée"""
+    def __init__(self, message: str, current_statut: str, target_statut: str):
+        self.message = message
+        self.current_statut = current_statut
+        self.target_statut = target_statut
+        super().__init__(self.message)
+
+class DocumentJobNotFoundError(SouscriptionException):
+    """Job de génération de document non trouvé"""
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.message = f"Job de document avec l'ID {job_id} non trouvé"
+        super().__init__(self.message)
+
+class DocumentNotReadyError(SouscriptionException):
+    """Document pas encore généré (job en attente, en cours ou en échec)"""
+    def __init__(self, job_id: int, statut: str):
+        self.job_id = job_id
+        self.statut = statut
+        self.message = f"Document du job {job_id} non disponible (statut: {statut})"
+        super().__init__(self.message)
+
+class AttestationNotFoundError(SouscriptionException):
+    """Attestation inconnue ou non délivrée (vérification publique)"""
+    def __init__(self, reference: str):
+        self.reference = reference
+        self.message = f"Aucune attestation délivrée avec la référence {reference}"
+        super().__init__(self.message)
+
+def convert_to_http_exception(exc: SouscriptionException) -> HTTPException:
+    """Convertir une exception métier en HTTPException FastAPI"""
+    if isinstance(exc, SouscriptionNotFoundError):
+        return HTTPException(
+            status_code=404,
+            detail={
+                "type": "not_found_error",
+                "message": exc.message,
+                "souscription_id": exc.souscription_id
+            }
+        )
+    elif isinstance(exc, DocumentJobNotFoundError):
+        return HTTPException(
+            status_code=404,
+            detail={
+                "type": "not_found_error",
+                "message": exc.message,
+                "job_id": exc.job_id
+            }
+        )
+    elif isinstance(exc, AttestationNotFoundError):
+        return HTTPException(
+            status_code=404,
+            detail={
+                "type": "not_found_error",
+                "message": exc.message,
+                "reference": exc.reference
+            }
+        )
+    elif isinstance(exc, SouscriptionStatutError):
+        return HTTPException(
+            status_code=409,
+            detail={
+                "type": "statut_error",
+                "message": exc.message,
+                "current_statut": exc.current_statut,
+                "target_statut": exc.target_statut
+            }
+        )
+    elif isinstance(exc, DocumentNotReadyError):
+        return HTTPException(
+            status_code=409,
+            detail={
+                "type": "document_not_ready",
+                "message": exc.message,
+                "job_id": exc.job_id,
+                "statut": exc.statut
+            }
+        )
+    else:
+        return HTTPException(
+            status_code=500,
+            detail={
+                "type": "internal_error",
+                "message": "Erreur interne du serveur"
+            }
+        )
@@ -5,13 +5,26 @@ import os
 from dotenv import load_dotenv
 
 # Import des routers
-from app.routers import organisation, logements
+from app.routers import organisation, logements, souscriptions, documents, metrics, verification
+from app.database import READ_PRIMARY_HEADER
+from app.middleware import CompressionMiddleware, PrometheusMiddleware, QueryTimingMiddleware
+from app.services.logement_cache import logement_cache
+from app.services.qr_service import qr_service
+from app.documents.worker import document_worker, DOCUMENT_WORKER_ENABLED
 
 load_dotenv()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Invalidations du cache émises par les autres workers
+    logement_cache.start()
+    # PDF de souscription rendus dans ce processus (sinon: python -m app.documents.worker)
+    if DOCUMENT_WORKER_ENABLED:
+        document_worker.start()
     yield
+    await document_worker.stop()
+    await qr_service.stop()
+    logement_cache.stop()
 
 app = FastAPI(
     title="Boaz Housing API",
@@ -26,11 +39,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified", READ_PRIMARY_HEADER],
 )
 
+# gzip/brotli des listes JSON et exports (COMPRESSION_* dans .env)
+app.add_middleware(CompressionMiddleware)
+# Server-Timing et journal par requête: requêtes SQL, temps en base, temps total
+app.add_middleware(QueryTimingMiddleware)
+# Latence par route, statuts et requêtes en cours (GET /metrics)
+app.add_middleware(PrometheusMiddleware)
+
 # Inclusion des routers
 app.include_router(organisation.router, prefix="/api")
 app.include_router(logements.router, prefix="/api")
+app.include_router(souscriptions.router, prefix="/api")
+app.include_router(documents.router, prefix="/api")
+app.include_router(verification.router, prefix="/api")
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
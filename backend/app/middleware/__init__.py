@@ -0,0 +1,5 @@
+from .compression import CompressionMiddleware
+from .metrics import PrometheusMiddleware
+from .timing import QueryTimingMiddleware
+
+__all__ = ["CompressionMiddleware", "PrometheusMiddleware", "QueryTimingMiddleware"]
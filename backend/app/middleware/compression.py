@@ -0,0 +1,171 @@
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli optionnel: gzip seul
+    brotli = None
+
+# Taille minimale (octets) en dessous de laquelle la réponse part telle quelle
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+# Encodages proposés, par ordre de préférence du serveur (vide pour désactiver)
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "br,gzip")
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# Qualité brotli modérée: réponses dynamiques compressées à chaque requête
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_CONTENT_TYPES = os.getenv(
+    "COMPRESSION_CONTENT_TYPES",
+    "application/json,application/x-ndjson,text/csv,text/plain,text/html"
+)
+
+# Formats déjà compressés: jamais recompressés, même ajoutés à la liste
+EXCLUDED_CONTENT_TYPES = frozenset({"application/pdf", "application/zip", "application/gzip", "image/png", "image/jpeg"})
+
+def _split(value: str) -> List[str]:
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+def available_encodings(encodings: Iterable[str]) -> List[str]:
+    """Encodages configurés réellement utilisables (br seulement si brotli est installé)"""
+    return [encoding for encoding in encodings if encoding == "gzip" or (encoding == "br" and brotli is not None)]
+
+def negotiate_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """Choisir l'encodage selon Accept-Encoding (q-values, joker), préférence serveur à égalité"""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+            self._compress = self._compressor.process
+        else:
+            # wbits=31: en-tête et somme de contrôle gzip
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+            self._compress = self._compressor.compress
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        chunk = self._compress(data)
+        # Chaque morceau d'un flux est vidé pour être envoyé sans attendre
+        return chunk + (self._finish() if final else self._flush())
+
+class CompressionMiddleware:
+    """Compression gzip/brotli des réponses HTTP selon Accept-Encoding
+
+    Ne compresse que les types de la liste autorisée, au-delà de
+    `minimum_size`, et jamais une réponse qui porte déjà un Content-Encoding
+    ni un format déjà compressé (PDF). Les réponses en flux (exports CSV,
+    NDJSON) sont compressées morceau par morceau. L'ETag est conservé: il
+    désigne la version du logement, comparée en fort par If-Match.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        encodings: Iterable[str] = tuple(_split(COMPRESSION_ENCODINGS)),
+        content_types: Iterable[str] = tuple(_split(COMPRESSION_CONTENT_TYPES)),
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = available_encodings(encodings)
+        self.content_types = frozenset(content_types) - EXCLUDED_CONTENT_TYPES
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return media_type in self.content_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        start: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if not self.compressible(headers):
+                    passthrough = True
+                    await send(message)
+                    return
+                # La représentation dépend d'Accept-Encoding, compressée ou non
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    passthrough = True
+                    await send(message)
+                    return
+                start = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(raw=start["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                if more_body:
+                    # Taille finale inconnue: envoi en chunked
+                    del headers["Content-Length"]
+                    await send(start)
+                    await send({"type": "http.response.body", "body": compressor.compress(body, False), "more_body": True})
+                    return
+                compressed = compressor.compress(body, True)
+                headers["Content-Length"] = str(len(compressed))
+                await send(start)
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, not more_body),
+                "more_body": more_body
+            })
+
+        await self.app(scope, receive, send_compressed)
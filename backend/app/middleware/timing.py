@@ -0,0 +1,64 @@
+import logging
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.monitoring import QueryStats, start_request_stats, stop_request_stats
+
+logger = logging.getLogger("app.requests")
+
+def server_timing(stats: QueryStats, total: float) -> str:
+    """En-tête Server-Timing: temps en base (et nombre de requêtes), application, total"""
+    total_ms = total * 1000
+    return (
+        f'db;dur={stats.db_ms:.3f};desc="SQL: {stats.count}", '
+        f"app;dur={max(total_ms - stats.db_ms, 0):.3f}, "
+        f"total;dur={total_ms:.3f}"
+    )
+
+class QueryTimingMiddleware:
+    """Nombre de requêtes SQL, temps en base et temps total de chaque requête HTTP
+
+    Les mesures sont envoyées dans l'en-tête Server-Timing (à l'envoi des
+    en-têtes) et journalisées à la fin de la réponse sur le logger
+    "app.requests", avec les champs en `extra` pour une sortie structurée.
+    Les requêtes SQL d'une réponse en flux (exports) ne figurent que dans
+    le journal.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request_stats()
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            stop_request_stats(token)
+            total_ms = round((time.perf_counter() - start) * 1000, 3)
+            logger.info(
+                "%s %s %s - %d requêtes SQL, %.1f ms en base, %.1f ms au total",
+                scope["method"], scope["path"], status_code, stats.count, stats.db_ms, total_ms,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "queries": stats.count,
+                    "db_ms": stats.db_ms,
+                    "total_ms": total_ms
+                }
+            )
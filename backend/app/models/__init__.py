@@ -1,5 +1,6 @@
 from .logement import Logement
 from .client import Client
 from .souscription import Souscription
+from .document_job import DocumentJob
 
-__all__ = ["Logement", "Client", "Souscription"]
\ No newline at end of file
+__all__ = ["Logement", "Client", "Souscription", "DocumentJob"]
\ No newline at end of file
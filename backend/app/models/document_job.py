@@ -0,0 +1,64 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, CheckConstraint, Index, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+class TypeDocument(str, enum.Enum):
+    PROFORMA = "proforma"
+    ATTESTATION = "attestation"
+
+class StatutJob(str, enum.Enum):
+    EN_ATTENTE = "en_attente"
+    EN_COURS = "en_cours"
+    TERMINE = "termine"
+    ECHEC = "echec"
+
+# Statuts d'un job qui n'a pas encore abouti (un seul par souscription et type)
+STATUTS_ACTIFS = (StatutJob.EN_ATTENTE, StatutJob.EN_COURS)
+
+class DocumentJob(Base):
+    """Génération asynchrone d'un PDF (proforma ou attestation) d'une souscription"""
+    __tablename__ = "document_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    souscription_id = Column(Integer, ForeignKey("souscriptions.id", ondelete="CASCADE"), nullable=False, index=True)
+    type_document = Column(Enum(TypeDocument), nullable=False)
+    statut = Column(Enum(StatutJob), default=StatutJob.EN_ATTENTE, nullable=False)
+    
+    # Reprises: prochaine tentative au plus tôt à disponible_a
+    tentatives = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    max_tentatives = Column(Integer, nullable=False, default=3, server_default=text("3"))
+    disponible_a = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    
+    # Résultat: chemin du PDF généré ou dernière erreur
+    fichier = Column(String, nullable=True)
+    erreur = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    termine_a = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        CheckConstraint('tentatives >= 0', name='check_tentatives_positive_ou_nulle'),
+        CheckConstraint('max_tentatives > 0', name='check_max_tentatives_positive'),
+        # File d'attente des workers (DocumentJobService.claim_statement)
+        Index(
+            'ix_document_jobs_a_traiter', disponible_a, id,
+            postgresql_where=text("statut = 'EN_ATTENTE'")
+        ),
+        # Un seul job actif par souscription et type (INSERT ... ON CONFLICT dans DocumentJobService)
+        Index(
+            'uq_document_jobs_actif', souscription_id, type_document,
+            unique=True,
+            postgresql_where=text("statut IN ('EN_ATTENTE', 'EN_COURS')")
+        ),
+    )
+    
+    # statut/updated_at relus par UPDATE ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
+    
+    souscription = relationship("Souscription", backref="document_jobs")
+    
+    def __repr__(self):
+        return f"<DocumentJob(id={self.id}, souscription_id={self.souscription_id}, type='{self.type_document}', statut='{self.statut}')>"
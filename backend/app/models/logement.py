@@ -1,15 +1,40 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Text, CheckConstraint
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Text, CheckConstraint, Index, literal_column, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import validates
 from app.database import Base
+from app.validators import logement_validators
 import enum
-import re
 
 class StatutLogement(str, enum.Enum):
     DISPONIBLE = "disponible"
     OCCUPE = "occupe"
     MAINTENANCE = "maintenance"
 
+# Configuration de recherche plein texte PostgreSQL utilisée par l'index et les requêtes
+SEARCH_CONFIG = literal_column("'french'::regconfig")
+
+# Caractère d'échappement des motifs LIKE construits depuis une saisie utilisateur
+LIKE_ESCAPE = "\\"
+
+def contains_pattern(value: str) -> str:
+    """Motif ILIKE '%…%' où %, _ et \\ saisis sont pris littéralement (escape=LIKE_ESCAPE)"""
+    for char in (LIKE_ESCAPE, "%", "_"):
+        value = value.replace(char, LIKE_ESCAPE + char)
+    return f"%{value}%"
+
+def logement_search_vector(titre, description):
+    """Document plein texte d'un logement (titre + description)
+    
+    L'expression doit rester identique à celle de l'index ix_logements_search
+    pour que PostgreSQL puisse l'utiliser.
+    """
+    return func.to_tsvector(
+        SEARCH_CONFIG,
+        func.coalesce(titre, literal_column("''"))
+        + literal_column("' '")
+        + func.coalesce(description, literal_column("''"))
+    )
+
 class Logement(Base):
     __tablename__ = "logements"
     
@@ -38,88 +63,56 @@ class Logement(Base):
         CheckConstraint("trim(adresse) != ''", name='check_adresse_non_vide'),
         CheckConstraint("trim(ville) != ''", name='check_ville_non_vide'),
         CheckConstraint("trim(code_postal) != ''", name='check_code_postal_non_vide'),
+        
+        # Recherche (extension pg_trgm activée par init-db.sql)
+        Index('ix_logements_ville_trgm', ville, postgresql_using='gin', postgresql_ops={'ville': 'gin_trgm_ops'}),
+        Index('ix_logements_adresse_trgm', adresse, postgresql_using='gin', postgresql_ops={'adresse': 'gin_trgm_ops'}),
+        Index('ix_logements_titre_trgm', titre, postgresql_using='gin', postgresql_ops={'titre': 'gin_trgm_ops'}),
+        Index('ix_logements_search', logement_search_vector(titre, description), postgresql_using='gin'),
+        
+        # Tri des listes (LogementService._list_statement) et pagination par curseur (_page_statement)
+        Index('ix_logements_recent', updated_at.desc().nulls_last(), created_at.desc(), id.desc()),
+        Index(
+            'ix_logements_disponibles_recent',
+            updated_at.desc().nulls_last(), created_at.desc(), id.desc(),
+            postgresql_where=text("statut = 'DISPONIBLE'")
+        ),
+        # Unicité de l'adresse normalisée (INSERT ... ON CONFLICT dans LogementService)
+        Index('uq_logements_adresse_ville', func.lower(adresse), func.lower(ville), unique=True),
     )
     
+    # updated_at (onupdate) relu par UPDATE ... RETURNING: pas de refresh après écriture
+    __mapper_args__ = {"eager_defaults": True}
+    
+    # Règles partagées avec LogementBase (app/validators/logement_validators.py)
     @validates('titre')
     def validate_titre(self, key, titre):
-        if not titre or not titre.strip():
-            raise ValueError("Le titre ne peut pas être vide")
-        if len(titre.strip()) < 3:
-            raise ValueError("Le titre doit contenir au moins 3 caractères")
-        return titre.strip()
+        return logement_validators.validate_titre(titre)
     
     @validates('adresse')
     def validate_adresse(self, key, adresse):
-        if not adresse or not adresse.strip():
-            raise ValueError("L'adresse ne peut pas être vide")
-        if len(adresse.strip()) < 5:
-            raise ValueError("L'adresse doit contenir au moins 5 caractères")
-        return adresse.strip()
+        return logement_validators.validate_adresse(adresse)
     
     @validates('ville')
     def validate_ville(self, key, ville):
-        if not ville or not ville.strip():
-            raise ValueError("La ville ne peut pas être vide")
-        if len(ville.strip()) < 2:
-            raise ValueError("La ville doit contenir au moins 2 caractères")
-        # Autoriser uniquement les lettres, espaces, tirets et apostrophes
-        if not re.match(r"^[a-zA-ZÀ-ÿ\s\-']+$", ville.strip()):
-            raise ValueError("La ville ne doit contenir que des lettres, espaces, tirets et apostrophes")
-        return ville.strip().title()
+        return logement_validators.validate_ville(ville)
     
     @validates('code_postal')
     def validate_code_postal(self, key, code_postal):
-        if not code_postal or not code_postal.strip():
-            raise ValueError("Le code postal ne peut pas être vide")
-        code_postal = code_postal.strip()
-        
-        # Validation pour différents formats de codes postaux
-        patterns = {
-            'France': r'^\d{5}$',
-            'Belgique': r'^\d{4}$',
-            'Suisse': r'^\d{4}$',
-            'Canada': r'^[A-Za-z]\d[A-Za-z] \d[A-Za-z]\d$',
-            'USA': r'^\d{5}(-\d{4})?$'
-        }
-        
-        # Par défaut, validation française si pas spécifiée
-        if not any(re.match(pattern, code_postal) for pattern in patterns.values()):
-            raise ValueError("Format de code postal invalide")
-            
-        return code_postal.upper()
+        # Pays vérifié avec le code postal par LogementService (valeurs finales connues)
+        return logement_validators.validate_code_postal(code_postal)
     
     @validates('pays')
     def validate_pays(self, key, pays):
-        if not pays or not pays.strip():
-            return "France"  # Valeur par défaut
-        
-        pays_valides = {
-            'france', 'belgique', 'suisse', 'luxembourg', 'canada', 
-            'usa', 'etats-unis', 'allemagne', 'italie', 'espagne'
-        }
-        
-        if pays.strip().lower() not in pays_valides:
-            raise ValueError(f"Pays non supporté. Pays valides: {', '.join(pays_valides)}")
-            
-        return pays.strip().title()
+        return logement_validators.validate_pays(pays)
     
     @validates('loyer')
     def validate_loyer(self, key, loyer):
-        if loyer is None or loyer <= 0:
-            raise ValueError("Le loyer doit être supérieur à 0")
-        if loyer > 50000:  # Limite raisonnable pour éviter les erreurs de saisie
-            raise ValueError("Le loyer semble anormalement élevé (max 50 000€)")
-        return round(float(loyer), 2)
+        return logement_validators.validate_loyer(loyer)
     
     @validates('montant_charges')
     def validate_montant_charges(self, key, montant_charges):
-        if montant_charges is None:
-            return 0.0
-        if montant_charges < 0:
-            raise ValueError("Le montant des charges ne peut pas être négatif")
-        if montant_charges > 10000:  # Limite raisonnable
-            raise ValueError("Le montant des charges semble anormalement élevé (max 10 000€)")
-        return round(float(montant_charges), 2)
+        return logement_validators.validate_montant_charges(montant_charges)
     
     @validates('statut')
     def validate_statut(self, key, statut):
@@ -16,8 +16,8 @@ class Souscription(Base):
     id = Column(Integer, primary_key=True, index=True)
     
     # Relations
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
-    logement_id = Column(Integer, ForeignKey("logements.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
+    logement_id = Column(Integer, ForeignKey("logements.id"), nullable=False, index=True)
     
     # Informations souscription
     date_entree = Column(Date, nullable=False)
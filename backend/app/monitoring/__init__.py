@@ -0,0 +1,34 @@
+from .pool import (
+    InstrumentedQueuePool,
+    InstrumentedAsyncQueuePool,
+    PoolMetrics,
+    register_engine,
+    pool_stats
+)
+from .queries import (
+    QueryStats,
+    current_request_stats,
+    instrument_engine,
+    start_request_stats,
+    stop_request_stats
+)
+from .prometheus import CONTENT_TYPE, Counter, Gauge, Histogram, Registry, registry
+
+__all__ = [
+    "InstrumentedQueuePool",
+    "InstrumentedAsyncQueuePool",
+    "PoolMetrics",
+    "register_engine",
+    "pool_stats",
+    "QueryStats",
+    "current_request_stats",
+    "instrument_engine",
+    "start_request_stats",
+    "stop_request_stats",
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+    "registry"
+]
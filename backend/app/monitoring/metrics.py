@@ -0,0 +1,105 @@
+from typing import Callable, List
+from app.monitoring.pool import pool_stats
+from app.monitoring.prometheus import Counter, Gauge, Histogram, Metric, registry
+
+# Métriques HTTP, étiquetées par modèle de route (/api/logements/{logement_id})
+# et non par chemin, pour garder un nombre de séries borné.
+REQUEST_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Durée des requêtes HTTP par route",
+    ["method", "route"]
+))
+REQUESTS_TOTAL = registry.register(Counter(
+    "http_requests_total",
+    "Requêtes HTTP par route et code de statut",
+    ["method", "route", "status_code"]
+))
+REQUESTS_IN_PROGRESS = registry.register(Gauge(
+    "http_requests_in_progress",
+    "Requêtes HTTP en cours de traitement"
+))
+LOGEMENT_ERRORS = registry.register(Counter(
+    "logement_errors_total",
+    "Erreurs métier des logements par classe (voir convert_to_http_exception)",
+    ["exception", "status_code"]
+))
+
+# Compteurs cumulés de PoolMetrics et état courant du pool
+_POOL_COUNTERS = {
+    "checkouts": ("db_pool_checkouts_total", "Connexions empruntées au pool"),
+    "timeouts": ("db_pool_timeouts_total", "Attentes de connexion expirées"),
+    "overflow_created": ("db_pool_overflow_created_total", "Connexions créées au-delà de pool_size"),
+}
+_POOL_GAUGES = {
+    "size": ("db_pool_size", "Taille configurée du pool"),
+    "checked_out": ("db_pool_checked_out", "Connexions actuellement empruntées"),
+    "checked_in": ("db_pool_checked_in", "Connexions disponibles dans le pool"),
+    "overflow": ("db_pool_overflow", "Connexions hors pool ouvertes"),
+}
+
+def pool_metrics() -> List[Metric]:
+    stats = pool_stats()
+    metrics: List[Metric] = []
+    for kind, definitions in ((Counter, _POOL_COUNTERS), (Gauge, _POOL_GAUGES)):
+        for key, (name, documentation) in definitions.items():
+            metric = kind(name, documentation, ["engine"])
+            for engine_name, state in stats.items():
+                if key in state:
+                    metric.inc(state[key], engine=engine_name)
+            metrics.append(metric)
+
+    wait = Counter("db_pool_wait_seconds_total", "Temps cumulé d'attente d'une connexion", ["engine"])
+    for engine_name, state in stats.items():
+        if "wait_ms_total" in state:
+            wait.inc(state["wait_ms_total"] / 1000, engine=engine_name)
+    metrics.append(wait)
+    return metrics
+
+registry.register_collector(pool_metrics)
+
+def cache_collector(cache) -> Callable[[], List[Metric]]:
+    """Collecteur des compteurs d'un LogementCache (hits, misses, ratio)"""
+
+    def collect() -> List[Metric]:
+        stats = cache.stats()
+        metrics: List[Metric] = []
+        for key, documentation in (
+            ("hits", "Lectures servies par le cache"),
+            ("misses", "Lectures absentes du cache"),
+            ("invalidations", "Invalidations locales du cache"),
+            ("remote_invalidations", "Invalidations reçues des autres workers"),
+            ("evictions", "Entrées évincées (LRU)"),
+        ):
+            if key in stats:
+                counter = Counter(f"logement_cache_{key}_total", documentation)
+                counter.inc(stats[key])
+                metrics.append(counter)
+        ratio = Gauge("logement_cache_hit_ratio", "Part des lectures servies par le cache")
+        ratio.set(stats["hit_ratio"])
+        metrics.append(ratio)
+        return metrics
+
+    return collect
+
+def verification_collector(service) -> Callable[[], List[Metric]]:
+    """Collecteur des vérifications d'attestation par origine de la réponse"""
+
+    def collect() -> List[Metric]:
+        stats = service.stats()
+        verifications = Counter(
+            "attestation_verifications_total",
+            "Vérifications d'attestation par origine (seul database atteint PostgreSQL)",
+            ["source"]
+        )
+        for source, key in (
+            ("positive_cache", "positive_hits"),
+            ("negative_cache", "negative_hits"),
+            ("bloom_filter", "bloom_rejections"),
+            ("database", "database_lookups"),
+        ):
+            verifications.inc(stats[key], source=source)
+        references = Gauge("attestation_bloom_references", "Références chargées dans le filtre de Bloom")
+        references.set(stats["bloom_count"])
+        return [verifications, references]
+
+    return collect
@@ -0,0 +1,106 @@
+import threading
+import time
+from typing import Dict
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+class PoolMetrics:
+    """Compteurs d'utilisation d'un pool de connexions (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_created = 0
+        self.overflow_max = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_checkout(self, wait: float, overflow: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.overflow_max = max(self.overflow_max, overflow)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_overflow(self) -> None:
+        with self._lock:
+            self.overflow_created += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "overflow_created": self.overflow_created,
+                "overflow_max": self.overflow_max,
+                "wait_ms_total": round(self.wait_total * 1000, 3),
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+                "wait_ms_moyen": round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+            }
+
+class InstrumentedPoolMixin:
+    """Mesure l'attente d'obtention d'une connexion et les débordements du pool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start, self.overflow())
+        return record
+
+    def _inc_overflow(self) -> bool:
+        # overflow() part de -pool_size: au-delà de 0 la connexion est hors pool
+        created = super()._inc_overflow()
+        if created and self.overflow() > 0:
+            self.metrics.record_overflow()
+        return created
+
+    def recreate(self):
+        # Conserver les compteurs après engine.dispose()
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+# Moteurs suivis, par nom (primary, async, ...)
+_engines: Dict[str, object] = {}
+
+def register_engine(name: str, engine) -> None:
+    """Publier les métriques du pool d'un moteur (sync ou async)"""
+    _engines[name] = engine
+
+def pool_stats() -> Dict[str, dict]:
+    """État courant et compteurs cumulés de chaque pool enregistré"""
+    stats = {}
+    for name, engine in _engines.items():
+        pool = engine.pool
+        state = {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        }
+        metrics = getattr(pool, "metrics", None)
+        if metrics is not None:
+            state.update(metrics.snapshot())
+        stats[name] = state
+    return stats
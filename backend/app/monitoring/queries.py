@@ -0,0 +1,73 @@
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Requêtes SQL plus lentes que ce seuil journalisées (millisecondes, 0 pour désactiver)
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "0"))
+
+class QueryStats:
+    """Requêtes SQL émises pendant une requête HTTP: nombre et temps cumulé en base"""
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def record(self, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+
+    @property
+    def db_ms(self) -> float:
+        return round(self.duration * 1000, 3)
+
+# Statistiques de la requête HTTP en cours. L'objet est partagé (pas copié)
+# avec le threadpool et les greenlets SQLAlchemy, qui héritent du contexte.
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+def start_request_stats():
+    """Démarrer le comptage pour la requête courante; renvoie (stats, jeton de reset)"""
+    stats = QueryStats()
+    return stats, _request_stats.set(stats)
+
+def stop_request_stats(token) -> None:
+    _request_stats.reset(token)
+
+def current_request_stats() -> Optional[QueryStats]:
+    return _request_stats.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_start", None)
+    if start is None:
+        return
+    duration = time.perf_counter() - start
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(duration)
+
+    duration_ms = duration * 1000
+    if SLOW_QUERY_THRESHOLD_MS and duration_ms >= SLOW_QUERY_THRESHOLD_MS:
+        logger.warning(
+            "Requête SQL lente (%.1f ms): %s",
+            duration_ms,
+            " ".join(statement.split())[:500],
+            extra={"duration_ms": round(duration_ms, 3), "statement": statement}
+        )
+
+def instrument_engine(engine) -> None:
+    """Compter et chronométrer chaque requête SQL d'un moteur (sync ou async)"""
+    target = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
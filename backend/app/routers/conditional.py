@@ -0,0 +1,101 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Optional
+from fastapi import HTTPException, Request, Response
+
+# Requêtes conditionnelles (RFC 9110): ETag / Last-Modified, 304 et 412
+
+def _etag(*parts) -> str:
+    digest = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest}"'
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def parse_version(value: Optional[str]) -> Optional[datetime]:
+    """Relire un horodatage ISO 8601 sérialisé (réponse JSON ou empreinte)"""
+    return datetime.fromisoformat(value) if value else None
+
+def resource_etag(resource_id: int, version: datetime) -> str:
+    """ETag fort d'une ressource, dérivé de sa version (updated_at/created_at)"""
+    return _etag(resource_id, round(_as_utc(version).timestamp() * 1_000_000))
+
+def collection_etag(fingerprint: dict, **params) -> str:
+    """ETag fort d'une liste: empreinte de l'ensemble filtré et paramètres de la page"""
+    return _etag(fingerprint, params)
+
+def page_etag(versions: List, **params) -> str:
+    """ETag fort d'une page de liste: versions de ses lignes et paramètres (curseurs compris)
+
+    Calculé sur la page elle-même, sans la sérialiser: aucun parcours de
+    l'ensemble filtré.
+    """
+    return _etag(versions, params)
+
+def _etag_list(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """If-None-Match (comparaison faible), sinon If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _etag_list(if_none_match)
+        return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        # Last-Modified est à la seconde près
+        return _as_utc(last_modified).replace(microsecond=0) <= since
+    return False
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+def not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime]
+) -> Optional[Response]:
+    """Réponse 304 si le client détient déjà cette version, sinon None
+
+    Dans les deux cas les validateurs sont posés, pour que le client puisse
+    revalider au prochain appel.
+    """
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        # En-têtes déjà posés sur la réponse (X-Next-Cursor, lecture sur le primaire...) conservés
+        reponse_304 = Response(status_code=304)
+        reponse_304.raw_headers.extend(
+            (name, value) for name, value in response.raw_headers
+            if name not in (b"content-length", b"content-type")
+        )
+        reponse_304.headers.update(headers)
+        return reponse_304
+    response.headers.update(headers)
+    return None
+
+def check_if_match(request: Request, current_etag: str) -> None:
+    """Concurrence optimiste: 412 si If-Match ne correspond pas à la version courante
+
+    Comparaison forte: un ETag faible ne correspond jamais.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+    tags = _etag_list(if_match)
+    if "*" in tags or current_etag in tags:
+        return
+    raise HTTPException(
+        status_code=412,
+        detail="Le logement a été modifié depuis sa dernière lecture"
+    )
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.routers.responses import RangeFileResponse
+from app.schemas.document_job import DocumentJobResponse
+from app.services.document_job_service import document_job_service
+from app.exceptions.souscription_exceptions import SouscriptionException, convert_to_http_exception
+
+router = APIRouter(prefix="/documents", tags=["Documents"])
+
+# Lectures sur la base principale: l'état d'un job change en continu, la
+# réplique renverrait un statut en retard.
+
+@router.get("/jobs/{job_id}", response_model=DocumentJobResponse)
+def get_document_job(job_id: int, db: Session = Depends(get_db)):
+    """État d'un job de génération (en_attente, en_cours, termine, echec)"""
+    try:
+        return document_job_service.get_job(db, job_id)
+    except SouscriptionException as e:
+        raise convert_to_http_exception(e)
+
+@router.get("/jobs/{job_id}/fichier")
+def download_document(job_id: int, request: Request, db: Session = Depends(get_db)):
+    """Télécharger le PDF d'un job terminé (409 tant qu'il n'est pas prêt)"""
+    try:
+        job, fichier = document_job_service.get_fichier(db, job_id)
+    except SouscriptionException as e:
+        raise convert_to_http_exception(e)
+    return RangeFileResponse(
+        fichier,
+        request,
+        media_type="application/pdf",
+        filename=f"{job.type_document.value}-{job.souscription_id}.pdf"
+    )
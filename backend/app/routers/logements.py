@@ -1,91 +1,270 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db
-from app.schemas.logement import LogementCreate, LogementUpdate, LogementResponse
+from app.database import (
+    DATABASE_ASYNC,
+    get_read_db,
+    get_logement_write_db,
+    get_write_db,
+    get_async_read_db,
+    get_async_write_db
+)
+from app.schemas.logement import LogementCreate, LogementUpdate, LogementResponse, serialize_logement
 from app.services.logement_service import logement_service
+from app.services.logement_async_service import async_logement_service, ThreadedLogementService
+from app.services.logement_cache import CachedLogementService, logement_cache
+from app.services.logement_import_service import logement_import_service
+from app.services.export_service import export_service
 from app.models.logement import StatutLogement
-from app.exceptions.logement_exceptions import LogementException, convert_to_http_exception
+from app.routers import conditional
+from app.routers.responses import ORJSONResponse, json_response
+from app.exceptions.logement_exceptions import (
+    LogementException,
+    LogementValidationError,
+    convert_to_http_exception
+)
 
-router = APIRouter(prefix="/logements", tags=["Logements"])
+router = APIRouter(prefix="/logements", tags=["Logements"], default_response_class=ORJSONResponse)
+
+# Identité et version d'une ligne: seules colonnes lues pour revalider une page
+VERSION_FIELDS = ",".join(logement_service.CHAMPS_TRI)
+
+def _page_versions(logements) -> list:
+    """(id, updated_at, created_at) des lignes d'une page, objets Logement ou projections"""
+    return [
+        (l["id"], l["updated_at"], l["created_at"]) if isinstance(l, dict) else (l.id, l.updated_at, l.created_at)
+        for l in logements
+    ]
+
+# Pile base de données des routes CRUD: asyncpg (DATABASE_ASYNC=true) ou
+# sessions synchrones exécutées dans le threadpool. Les lectures passent par
+# la réplique (DATABASE_READ_URL) si elle est configurée.
+if DATABASE_ASYNC:
+    service = async_logement_service
+    get_read_session = get_async_read_db
+    get_write_session = get_async_write_db
+else:
+    service = ThreadedLogementService(logement_service)
+    get_read_session = get_read_db
+    get_write_session = get_logement_write_db
+
+# Détail, disponibles et stats servis depuis le cache en mémoire
+service = CachedLogementService(service, logement_cache)
 
 @router.post("/", response_model=LogementResponse)
-def create_logement(
+async def create_logement(
     logement: LogementCreate,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_session)
 ):
     """Créer un nouveau logement"""
     try:
-        return logement_service.create_logement(db=db, logement=logement)
+        return await service.create_logement(db=db, logement=logement)
+    except LogementException as e:
+        raise convert_to_http_exception(e)
+
+@router.post("/bulk")
+def import_logements(
+    fichier: UploadFile = File(..., description="Fichier CSV (avec en-tête) ou NDJSON (un logement par ligne)"),
+    format: Optional[str] = Query(None, description="csv ou ndjson (déduit du type ou de l'extension sinon)"),
+    db: Session = Depends(get_write_db)
+):
+    """Importer des logements en masse
+    
+    Le fichier est lu en flux et inséré par lots. Les lignes invalides ou en
+    doublon sont ignorées et listées dans le rapport.
+    """
+    try:
+        format = logement_import_service.detect_format(format, fichier.content_type, fichier.filename)
+        rows = logement_import_service.iter_rows(fichier.file, format)
+        return logement_import_service.import_logements(db=db, rows=rows)
     except LogementException as e:
         raise convert_to_http_exception(e)
 
 @router.get("/", response_model=List[LogementResponse])
-def list_logements(
-    skip: int = Query(0, ge=0, description="Nombre d'éléments à ignorer"),
+async def list_logements(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0, description="Nombre d'éléments à ignorer (pagination par offset, déconseillée)"),
     limit: int = Query(100, ge=1, le=1000, description="Nombre maximum d'éléments à retourner"),
     statut: Optional[StatutLogement] = Query(None, description="Filtrer par statut"),
     ville: Optional[str] = Query(None, description="Filtrer par ville"),
-    db: Session = Depends(get_db)
+    q: Optional[str] = Query(None, min_length=2, max_length=200, description="Recherche plein texte (titre, description, adresse, ville)"),
+    cursor: Optional[str] = Query(None, description="Curseur de la page suivante (en-tête X-Next-Cursor)"),
+    fields: Optional[str] = Query(None, description="Champs à renvoyer séparés par des virgules, ou 'compact' (vue carte: LogementCompact)"),
+    db: Session = Depends(get_read_session)
 ):
-    """Récupérer la liste des logements avec filtres optionnels"""
-    return logement_service.get_logements(
-        db=db, 
-        skip=skip, 
-        limit=limit, 
-        statut=statut, 
-        ville=ville
+    """Récupérer la liste des logements avec filtres optionnels
+    
+    Sans `skip` ni `q`, la pagination se fait par curseur : le curseur de la
+    page suivante est renvoyé dans l'en-tête `X-Next-Cursor`. Avec `q`, les
+    résultats sont triés par pertinence et paginés par `skip`.
+    
+    L'ETag est calculé sur l'identité et la version (id, updated_at,
+    created_at) des lignes de la page, ses curseurs et ses paramètres: sans
+    sérialisation ni parcours de l'ensemble filtré. Avec If-None-Match, ces
+    seules colonnes sont lues d'abord, et un 304 ne lit ni ne rend la page.
+    
+    Avec `fields`, seules les colonnes demandées sont lues en base et
+    renvoyées (par exemple `fields=compact` pour les cartes).
+    """
+    try:
+        if (skip or q) and cursor:
+            raise LogementValidationError(
+                "Le paramètre cursor ne peut pas être combiné avec skip ou q",
+                "cursor"
+            )
+        champs = logement_service.parse_fields(fields)
+        
+        async def lire(fields: Optional[str]):
+            if skip or q:
+                logements = await service.get_logements(
+                    db=db, 
+                    skip=skip, 
+                    limit=limit, 
+                    statut=statut, 
+                    ville=ville,
+                    q=q,
+                    fields=fields
+                )
+                return logements, None
+            return await service.get_logements_page(
+                db=db,
+                limit=limit,
+                statut=statut,
+                ville=ville,
+                cursor=cursor,
+                fields=fields
+            )
+        
+        def page_etag(logements, next_cursor: Optional[str]) -> str:
+            return conditional.page_etag(
+                _page_versions(logements), skip=skip, limit=limit, statut=statut, ville=ville, q=q,
+                cursor=cursor, next_cursor=next_cursor, fields=fields
+            )
+        
+        # Pas de Last-Modified: la date la plus récente d'une page ne change
+        # pas quand une ligne en sort, seul l'ETag suit la page exacte
+        if "if-none-match" in request.headers:
+            versions, next_cursor = await lire(VERSION_FIELDS)
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            not_modified = conditional.not_modified(request, response, page_etag(versions, next_cursor), None)
+            if not_modified is not None:
+                return not_modified
+        
+        # Projection: clés de version lues avec les champs demandés, retirées au rendu
+        version_en_plus = champs is not None and not set(logement_service.CHAMPS_TRI) <= set(champs)
+        logements, next_cursor = await lire(
+            ",".join(dict.fromkeys([*champs, *logement_service.CHAMPS_TRI])) if version_en_plus else fields
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        response.headers.update(conditional.validator_headers(page_etag(logements, next_cursor), None))
+        
+        if version_en_plus:
+            return json_response([{champ: l[champ] for champ in champs} for l in logements], response)
+        if champs:
+            # Projection partielle: dicts rendus tels quels, hors LogementResponse
+            return json_response(logements, response)
+        return json_response([serialize_logement(l) for l in logements], response)
+    except LogementException as e:
+        raise convert_to_http_exception(e)
+
+@router.get("/export")
+def export_logements(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Format d'export: csv ou ndjson"),
+    statut: Optional[StatutLogement] = Query(None, description="Filtrer par statut"),
+    ville: Optional[str] = Query(None, description="Filtrer par ville"),
+    db: Session = Depends(get_read_db)
+):
+    """Exporter le catalogue de logements en flux (mémoire constante)"""
+    filename = export_service.filename("logements", format)
+    return StreamingResponse(
+        export_service.stream(db, export_service.logements_statement(statut=statut, ville=ville), format),
+        media_type=export_service.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
 
 @router.get("/disponibles", response_model=List[LogementResponse])
-def list_logements_disponibles(db: Session = Depends(get_db)):
+async def list_logements_disponibles(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_session)
+):
     """Récupérer tous les logements disponibles"""
-    return logement_service.get_logements_disponibles(db=db)
+    snapshot = await service.get_disponibles_snapshot(db=db)
+    fingerprint = snapshot["fingerprint"]
+    etag = conditional.collection_etag(fingerprint, statut=StatutLogement.DISPONIBLE)
+    last_modified = conditional.parse_version(fingerprint["last_modified"])
+    return conditional.not_modified(request, response, etag, last_modified) or json_response(snapshot["items"], response)
 
 @router.get("/stats")
-def get_stats_logements(db: Session = Depends(get_db)):
+async def get_stats_logements(db: Session = Depends(get_read_session)):
     """Obtenir les statistiques des logements"""
-    return logement_service.get_stats_logements(db=db)
+    return await service.get_stats_logements(db=db)
 
 @router.get("/{logement_id}", response_model=LogementResponse)
-def get_logement(
+async def get_logement(
     logement_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_session)
 ):
     """Récupérer un logement par son ID"""
     try:
-        db_logement = logement_service.get_logement(db=db, logement_id=logement_id)
+        db_logement = await service.get_logement(db=db, logement_id=logement_id)
         if db_logement is None:
             raise HTTPException(status_code=404, detail="Logement non trouvé")
-        return db_logement
+        
+        version = conditional.parse_version(db_logement["updated_at"] or db_logement["created_at"])
+        etag = conditional.resource_etag(logement_id, version)
+        return conditional.not_modified(request, response, etag, version) or json_response(db_logement, response)
     except LogementException as e:
         raise convert_to_http_exception(e)
 
 @router.put("/{logement_id}", response_model=LogementResponse)
-def update_logement(
+async def update_logement(
     logement_id: int,
     logement_update: LogementUpdate,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_write_session)
 ):
-    """Mettre à jour un logement"""
+    """Mettre à jour un logement
+    
+    Avec `If-Match`, la mise à jour n'a lieu que si le logement n'a pas été
+    modifié depuis la lecture de cet ETag (sinon 412).
+    """
     try:
-        return logement_service.update_logement(
+        if "if-match" in request.headers:
+            # Ligne verrouillée jusqu'au commit de la mise à jour
+            version = await service.get_logement_version(db=db, logement_id=logement_id, for_update=True)
+            if version is None:
+                raise HTTPException(status_code=404, detail="Logement non trouvé")
+            conditional.check_if_match(request, conditional.resource_etag(logement_id, version))
+        
+        db_logement = await service.update_logement(
             db=db, 
             logement_id=logement_id, 
             logement_update=logement_update
         )
+        response.headers["ETag"] = conditional.resource_etag(
+            logement_id, db_logement.updated_at or db_logement.created_at
+        )
+        return db_logement
     except LogementException as e:
         raise convert_to_http_exception(e)
 
 @router.patch("/{logement_id}/statut")
-def changer_statut_logement(
+async def changer_statut_logement(
     logement_id: int,
     nouveau_statut: StatutLogement,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_session)
 ):
     """Changer le statut d'un logement"""
     try:
-        db_logement = logement_service.changer_statut_logement(
+        db_logement = await service.changer_statut_logement(
             db=db, 
             logement_id=logement_id, 
             nouveau_statut=nouveau_statut
@@ -95,12 +274,12 @@ def changer_statut_logement(
         raise convert_to_http_exception(e)
 
 @router.delete("/{logement_id}")
-def delete_logement(
+async def delete_logement(
     logement_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_write_session)
 ):
     """Supprimer un logement"""
-    success = logement_service.delete_logement(db=db, logement_id=logement_id)
+    success = await service.delete_logement(db=db, logement_id=logement_id)
     if not success:
         raise HTTPException(status_code=404, detail="Logement non trouvé")
     return {"message": "Logement supprimé avec succès"}
\ No newline at end of file
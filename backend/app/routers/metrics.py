@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Response
+from app.monitoring import CONTENT_TYPE, pool_stats, registry
+from app.monitoring.metrics import cache_collector, verification_collector
+from app.services.logement_cache import logement_cache
+from app.services.verification_service import verification_service
+
+router = APIRouter(prefix="/metrics", tags=["Métriques"])
+
+registry.register_collector(cache_collector(logement_cache))
+registry.register_collector(verification_collector(verification_service))
+
+@router.get("")
+def get_prometheus_metrics():
+    """Métriques au format texte Prometheus: HTTP, erreurs métier, pools et cache"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+@router.get("/pool")
+def get_pool_metrics():
+    """Métriques des pools de connexions: emprunts, attente et débordements"""
+    return pool_stats()
+
+@router.get("/cache")
+def get_cache_metrics():
+    """Métriques du cache des logements: hits, misses, évictions"""
+    return logement_cache.stats()
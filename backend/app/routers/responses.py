@@ -0,0 +1,120 @@
+from typing import Any, Optional, Tuple
+import os
+import re
+import anyio
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, ORJSONResponse as BaseORJSONResponse
+from starlette.types import Receive, Scope, Send
+
+class ORJSONResponse(BaseORJSONResponse):
+    """Réponse JSON rendue par orjson, datetimes UTC notés "Z" comme Pydantic"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+def json_response(content: Any, response: Response) -> ORJSONResponse:
+    """Contenu déjà sérialisé rendu directement, sans repasser par response_model
+
+    Les en-têtes posés sur la réponse injectée (ETag, X-Next-Cursor, cookie
+    de lecture sur le primaire) sont recopiés: FastAPI ne les fusionne pas
+    quand la route renvoie elle-même une Response.
+    """
+    rendered = ORJSONResponse(content)
+    rendered.raw_headers.extend(response.raw_headers)
+    return rendered
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Intervalle (début, fin inclus) d'un en-tête Range à un seul intervalle
+
+    None: fichier complet (pas de Range, syntaxe non gérée ou multi-intervalles,
+    ignorés comme le permet la RFC 9110). ValueError: intervalle non satisfaisable.
+    """
+    if not header:
+        return None
+    match = _RANGE.match(header.strip())
+    if match is None:
+        return None
+    debut, fin = match.groups()
+    if not debut and not fin:
+        return None
+    if not debut:
+        # bytes=-N: les N derniers octets
+        longueur = int(fin)
+        if longueur == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - longueur, 0), size - 1
+    debut = int(debut)
+    fin = min(int(fin), size - 1) if fin else size - 1
+    if debut >= size or fin < debut:
+        raise ValueError(header)
+    return debut, fin
+
+class RangeFileResponse(FileResponse):
+    """Fichier servi avec Range (206/416) et envoi zero-copy si le serveur le permet
+
+    Starlette 0.27 ne gère ni Range ni les extensions d'envoi de fichier:
+    "http.response.zerocopy" (sendfile) est utilisée quand le serveur ASGI la
+    propose, sinon "http.response.pathsend" pour un fichier complet, à défaut
+    lecture par blocs.
+    """
+
+    def __init__(self, path: str, request: Request, etag: Optional[str] = None, **kwargs: Any):
+        stat_result = os.stat(path)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if etag:
+            headers["etag"] = etag
+        headers["accept-ranges"] = "bytes"
+        super().__init__(path, headers=headers, stat_result=stat_result, method=request.method, **kwargs)
+
+        taille = stat_result.st_size
+        self.offset, self.count = 0, taille
+        if_range = request.headers.get("if-range")
+        if if_range is not None and if_range not in (self.headers.get("etag"), self.headers.get("last-modified")):
+            # Fichier modifié depuis le premier morceau: renvoyé en entier
+            return
+        try:
+            intervalle = parse_range(request.headers.get("range"), taille)
+        except ValueError:
+            self.status_code = 416
+            self.headers["content-range"] = f"bytes */{taille}"
+            self.headers["content-length"] = "0"
+            self.count = 0
+            return
+        if intervalle is not None:
+            debut, fin = intervalle
+            self.status_code = 206
+            self.offset, self.count = debut, fin - debut + 1
+            self.headers["content-range"] = f"bytes {debut}-{fin}/{taille}"
+            self.headers["content-length"] = str(self.count)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+
+        if self.send_header_only or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopy" in extensions:
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False
+                })
+        elif "http.response.pathsend" in extensions and self.status_code == 200:
+            await send({"type": "http.response.pathsend", "path": os.fspath(self.path)})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as file:
+                await file.seek(self.offset)
+                restant = self.count
+                while restant > 0:
+                    chunk = await file.read(min(self.chunk_size, restant))
+                    restant = restant - len(chunk) if chunk else 0
+                    await send({"type": "http.response.body", "body": chunk, "more_body": restant > 0})
+
+        if self.background is not None:
+            await self.background()
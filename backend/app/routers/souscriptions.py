@@ -0,0 +1,130 @@
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import List
+from app.database import get_db, get_read_db, get_write_db
+from app.models.document_job import TypeDocument
+from app.models.souscription import StatutSouscription
+from app.routers import conditional
+from app.routers.responses import ORJSONResponse, RangeFileResponse
+from app.schemas.document_job import DocumentJobResponse, SouscriptionStatutResponse
+from app.services.export_service import export_service
+from app.services.document_job_service import document_job_service
+from app.services.souscription_service import souscription_service
+from app.services.qr_service import qr_service, QR_HTTP_MAX_AGE
+from app.exceptions.souscription_exceptions import SouscriptionException, convert_to_http_exception
+
+router = APIRouter(prefix="/souscriptions", tags=["Souscriptions"])
+
+@router.get("/export")
+def export_souscriptions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Format d'export: csv ou ndjson"),
+    db: Session = Depends(get_read_db)
+):
+    """Exporter toutes les souscriptions en flux (mémoire constante)"""
+    filename = export_service.filename("souscriptions", format)
+    return StreamingResponse(
+        export_service.stream(db, export_service.souscriptions_statement(), format),
+        media_type=export_service.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.patch("/{souscription_id}/statut", response_model=SouscriptionStatutResponse)
+def changer_statut_souscription(
+    souscription_id: int,
+    nouveau_statut: StatutSouscription,
+    db: Session = Depends(get_write_db)
+):
+    """Changer le statut d'une souscription
+    
+    Au passage à PAYE, la proforma et l'attestation sont générées en arrière-plan:
+    suivre les jobs renvoyés via GET /api/documents/jobs/{job_id}.
+    """
+    try:
+        souscription, jobs = souscription_service.changer_statut(db, souscription_id, nouveau_statut)
+        return {
+            "message": f"Statut changé vers {nouveau_statut.value}",
+            "souscription_id": souscription.id,
+            "statut": souscription.statut,
+            "jobs": jobs
+        }
+    except SouscriptionException as e:
+        raise convert_to_http_exception(e)
+
+@router.post("/{souscription_id}/documents", response_model=List[DocumentJobResponse], status_code=202)
+def generer_documents_souscription(souscription_id: int, db: Session = Depends(get_write_db)):
+    """(Re)générer les documents d'une souscription payée en arrière-plan"""
+    try:
+        return souscription_service.generer_documents(db, souscription_id)
+    except SouscriptionException as e:
+        raise convert_to_http_exception(e)
+
+@router.get("/{souscription_id}/documents", response_model=List[DocumentJobResponse])
+def list_documents_souscription(souscription_id: int, db: Session = Depends(get_db)):
+    """Jobs de documents d'une souscription, le plus récent d'abord"""
+    return document_job_service.get_jobs_souscription(db, souscription_id)
+
+@router.get("/{reference}/qr")
+async def qr_code_souscription(
+    reference: str,
+    request: Request,
+    format: str = Query("png", pattern="^(png|svg)$", description="Format d'image: png ou svg"),
+    db: Session = Depends(get_read_db)
+):
+    """QR code de vérification d'une souscription (image PNG ou SVG)
+    
+    Servi depuis le cache mémoire sans accès à la base; la référence n'est
+    vérifiée qu'au premier rendu. L'image d'une référence ne change pas:
+    cache HTTP public de longue durée.
+    """
+    image = qr_service.cached(reference, format)
+    if image is None:
+        try:
+            await run_in_threadpool(souscription_service.get_by_reference, db, reference)
+        except SouscriptionException as e:
+            raise convert_to_http_exception(e)
+        image = await qr_service.get(reference, format)
+    
+    headers = {"ETag": image.etag, "Cache-Control": f"public, max-age={QR_HTTP_MAX_AGE}, immutable"}
+    if conditional.is_not_modified(request, image.etag, None):
+        return Response(status_code=304, headers=headers)
+    return Response(image.contenu, media_type=qr_service.MEDIA_TYPES[format], headers=headers)
+
+@router.get("/{reference}/documents/{type_document}")
+def telecharger_document_souscription(
+    reference: str,
+    type_document: TypeDocument,
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """Télécharger la proforma ou l'attestation d'une souscription par référence
+    
+    Servi depuis le stockage (Range, ETag = empreinte du document) sans nouveau
+    rendu tant que client et logement sont inchangés. Sinon le document est
+    remis en file: 202 avec le job à suivre (Location).
+    """
+    try:
+        document = document_job_service.get_document(db, reference, type_document)
+    except SouscriptionException as e:
+        raise convert_to_http_exception(e)
+    
+    if document.fichier is None:
+        return ORJSONResponse(
+            DocumentJobResponse.model_validate(document.job).model_dump(mode="json"),
+            status_code=202,
+            headers={"Location": f"/api/documents/jobs/{document.job.id}", "Retry-After": "2"}
+        )
+    
+    etag = f'"{document.key}"'
+    headers = {"Cache-Control": "private, no-cache"}
+    if conditional.is_not_modified(request, etag, None):
+        return Response(status_code=304, headers={"ETag": etag, **headers})
+    return RangeFileResponse(
+        document.fichier,
+        request,
+        etag=etag,
+        media_type="application/pdf",
+        filename=f"{reference}-{type_document.value}.pdf",
+        headers=headers
+    )
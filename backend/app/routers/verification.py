@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
+from app.routers.responses import ORJSONResponse
+from app.schemas.verification import VerificationAttestationResponse
+from app.services.verification_service import verification_service, VERIFICATION_HTTP_MAX_AGE
+from app.exceptions.souscription_exceptions import SouscriptionException, convert_to_http_exception
+
+router = APIRouter(prefix="/verify-attestation", tags=["Vérification"])
+
+@router.get("/{reference}", response_model=VerificationAttestationResponse)
+async def verify_attestation(reference: str):
+    """Vérifier une attestation depuis son QR code: valide, expirée ou annulée
+    
+    Endpoint public: les références déjà vérifiées et les références
+    inexistantes sont servies sans accès à la base ni au pool de threads.
+    """
+    try:
+        verification = verification_service.cached(reference)
+        if verification is None:
+            verification = await run_in_threadpool(verification_service.verify, reference)
+    except SouscriptionException as e:
+        http_exception = convert_to_http_exception(e)
+        # Jamais en cache partagé: la référence peut être délivrée juste après
+        http_exception.headers = {"Cache-Control": "no-store"}
+        raise http_exception
+    return ORJSONResponse(
+        verification.to_dict(),
+        headers={"Cache-Control": f"public, max-age={VERIFICATION_HTTP_MAX_AGE}"}
+    )
@@ -1,3 +1,9 @@
-from .logement import LogementCreate, LogementUpdate, LogementResponse
+from .logement import LogementCreate, LogementUpdate, LogementResponse, serialize_logement
+from .document_job import DocumentJobResponse, SouscriptionStatutResponse
+from .verification import StatutVerification, VerificationAttestationResponse
 
-__all__ = ["LogementCreate", "LogementUpdate", "LogementResponse"]
\ No newline at end of file
+__all__ = [
+    "LogementCreate", "LogementUpdate", "LogementResponse", "serialize_logement",
+    "DocumentJobResponse", "SouscriptionStatutResponse",
+    "StatutVerification", "VerificationAttestationResponse"
+]
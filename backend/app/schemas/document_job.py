@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+from app.models.document_job import TypeDocument, StatutJob
+from app.models.souscription import StatutSouscription
+
+class DocumentJobResponse(BaseModel):
+    """État d'un job de génération de document (suivi par polling)"""
+    id: int
+    souscription_id: int
+    type_document: TypeDocument
+    statut: StatutJob
+    tentatives: int = Field(..., description="Tentatives de rendu effectuées")
+    max_tentatives: int
+    disponible_a: Optional[datetime] = Field(None, description="Prochaine tentative au plus tôt")
+    erreur: Optional[str] = Field(None, description="Dernière erreur de rendu")
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    termine_a: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class SouscriptionStatutResponse(BaseModel):
+    """Résultat d'un changement de statut de souscription"""
+    message: str
+    souscription_id: int
+    statut: StatutSouscription
+    jobs: List[DocumentJobResponse] = Field(default_factory=list, description="Documents mis en file")
@@ -2,7 +2,7 @@ from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, Any
 from datetime import datetime
 from app.models.logement import StatutLogement
-import re
+from app.validators import logement_validators
 
 class LogementBase(BaseModel):
     """Schéma de base pour un logement"""
@@ -16,17 +16,11 @@ class LogementBase(BaseModel):
     montant_charges: float = Field(0.0, ge=0, le=10000, description="Montant des charges mensuelles en euros")
     statut: Optional[StatutLogement] = Field(StatutLogement.DISPONIBLE, description="Statut du logement")
     
+    # Règles partagées avec le modèle Logement (app/validators/logement_validators.py)
     @field_validator('titre')
     @classmethod
     def validate_titre(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError('Le titre ne peut pas être vide')
-        v = v.strip()
-        if len(v) < 3:
-            raise ValueError('Le titre doit contenir au moins 3 caractères')
-        if len(v) > 200:
-            raise ValueError('Le titre ne peut pas dépasser 200 caractères')
-        return v
+        return logement_validators.validate_titre(v)
     
     @field_validator('description')
     @classmethod
@@ -38,76 +32,32 @@ class LogementBase(BaseModel):
     @field_validator('adresse')
     @classmethod
     def validate_adresse(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError('L\'adresse ne peut pas être vide')
-        v = v.strip()
-        if len(v) < 5:
-            raise ValueError('L\'adresse doit contenir au moins 5 caractères')
-        return v
+        return logement_validators.validate_adresse(v)
     
     @field_validator('ville')
     @classmethod
     def validate_ville(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError('La ville ne peut pas être vide')
-        v = v.strip()
-        if len(v) < 2:
-            raise ValueError('La ville doit contenir au moins 2 caractères')
-        if not re.match(r"^[a-zA-ZÀ-ÿ\s\-']+$", v):
-            raise ValueError('La ville ne doit contenir que des lettres, espaces, tirets et apostrophes')
-        return v.title()
+        return logement_validators.validate_ville(v)
     
     @field_validator('code_postal')
     @classmethod
     def validate_code_postal(cls, v: str) -> str:
-        if not v or not v.strip():
-            raise ValueError('Le code postal ne peut pas être vide')
-        v = v.strip()
-        
-        # Formats de codes postaux supportés
-        patterns = [
-            r'^\d{5}$',  # France
-            r'^\d{4}$',  # Belgique, Suisse
-            r'^[A-Za-z]\d[A-Za-z] \d[A-Za-z]\d$',  # Canada
-            r'^\d{5}(-\d{4})?$'  # USA
-        ]
-        
-        if not any(re.match(pattern, v) for pattern in patterns):
-            raise ValueError('Format de code postal invalide')
-        return v.upper()
+        return logement_validators.validate_code_postal(v)
     
     @field_validator('pays')
     @classmethod
     def validate_pays(cls, v: str) -> str:
-        if not v or not v.strip():
-            return "France"
-        
-        pays_valides = {
-            'france', 'belgique', 'suisse', 'luxembourg', 'canada', 
-            'usa', 'etats-unis', 'allemagne', 'italie', 'espagne'
-        }
-        
-        if v.strip().lower() not in pays_valides:
-            raise ValueError(f'Pays non supporté. Pays valides: {", ".join(sorted(pays_valides))}')
-        return v.strip().title()
+        return logement_validators.validate_pays(v)
     
     @field_validator('loyer')
     @classmethod
     def validate_loyer(cls, v: float) -> float:
-        if v <= 0:
-            raise ValueError('Le loyer doit être supérieur à 0')
-        if v > 50000:
-            raise ValueError('Le loyer semble anormalement élevé (max 50 000€)')
-        return round(float(v), 2)
+        return logement_validators.validate_loyer(v)
     
     @field_validator('montant_charges')
     @classmethod
     def validate_montant_charges(cls, v: float) -> float:
-        if v < 0:
-            raise ValueError('Le montant des charges ne peut pas être négatif')
-        if v > 10000:
-            raise ValueError('Le montant des charges semble anormalement élevé (max 10 000€)')
-        return round(float(v), 2)
+        return logement_validators.validate_montant_charges(v)
     
     @model_validator(mode='after')
     def validate_coherence_prix(self) -> 'LogementBase':
@@ -124,7 +74,14 @@ class LogementBase(BaseModel):
 
 class LogementCreate(LogementBase):
     """Schéma pour créer un logement"""
-    pass
+    
+    # Entrée seulement: LogementResponse relit aussi des lignes enregistrées
+    # sous l'ancienne règle (LogementUpdate: voir LogementService._apply_update)
+    @model_validator(mode='after')
+    def validate_code_postal_pays(self) -> 'LogementCreate':
+        """Format du code postal propre au pays du logement"""
+        logement_validators.validate_code_postal(self.code_postal, self.pays)
+        return self
 
 class LogementUpdate(BaseModel):
     """Schéma pour mettre à jour un logement"""
@@ -146,4 +103,47 @@ class LogementResponse(LogementBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class LogementCompact(BaseModel):
+    """Vue carte d'un logement (liste avec fields=compact)"""
+    id: int
+    titre: str
+    ville: str
+    loyer: float
+    montant_total: float
+    statut: StatutLogement
+
+    class Config:
+        from_attributes = True
+
+def _json_datetime(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    iso = value.isoformat()
+    # Même rendu que Pydantic: UTC noté "Z"
+    return iso[:-6] + "Z" if iso.endswith("+00:00") else iso
+
+def serialize_logement(logement) -> dict:
+    """Logement ORM sérialisé en dict JSON, identique à LogementResponse en mode json
+
+    Lecture directe des attributs: les validateurs d'entrée de LogementBase
+    ne sont pas rejoués sur des données déjà validées à l'écriture, ce qui
+    évite l'essentiel du coût par élément des grandes listes.
+    """
+    statut = logement.statut
+    return {
+        "titre": logement.titre,
+        "description": logement.description,
+        "adresse": logement.adresse,
+        "ville": logement.ville,
+        "code_postal": logement.code_postal,
+        "pays": logement.pays,
+        "loyer": float(logement.loyer),
+        "montant_charges": float(logement.montant_charges),
+        "statut": statut.value if statut is not None else None,
+        "id": logement.id,
+        "montant_total": float(logement.montant_total),
+        "created_at": _json_datetime(logement.created_at),
+        "updated_at": _json_datetime(logement.updated_at),
+    }
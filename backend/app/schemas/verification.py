@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from datetime import date
+import enum
+
+class StatutVerification(str, enum.Enum):
+    VALIDE = "valide"
+    EXPIREE = "expiree"
+    ANNULEE = "annulee"
+
+class VerificationAttestationResponse(BaseModel):
+    """Résultat public de la vérification d'une attestation (QR code)"""
+    reference: str
+    statut: StatutVerification = Field(
+        ...,
+        description="valide, expiree (hébergement terminé) ou annulee (souscription clôturée)"
+    )
+    date_expiration: date = Field(..., description="Fin de l'hébergement: date d'entrée + durée de location")
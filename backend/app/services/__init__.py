@@ -1,4 +1,23 @@
 from .organisation_service import organisation_service, OrganisationService
 from .logement_service import logement_service, LogementService
+from .logement_async_service import async_logement_service, AsyncLogementService
+from .logement_cache import logement_cache, LogementCache, CachedLogementService
+from .logement_import_service import logement_import_service, LogementImportService
+from .export_service import export_service, ExportService
+from .document_job_service import document_job_service, DocumentJobService
+from .souscription_service import souscription_service, SouscriptionService
+from .qr_service import qr_service, QRCodeService
+from .verification_service import verification_service, AttestationVerificationService
 
-__all__ = ["organisation_service", "OrganisationService", "logement_service", "LogementService"]
\ No newline at end of file
+__all__ = [
+    "organisation_service", "OrganisationService",
+    "logement_service", "LogementService",
+    "async_logement_service", "AsyncLogementService",
+    "logement_cache", "LogementCache", "CachedLogementService",
+    "logement_import_service", "LogementImportService",
+    "export_service", "ExportService",
+    "document_job_service", "DocumentJobService",
+    "souscription_service", "SouscriptionService",
+    "qr_service", "QRCodeService",
+    "verification_service", "AttestationVerificationService"
+]
\ No newline at end of file
@@ -0,0 +1,442 @@
+import hashlib
+import json
+import logging
+import math
+import queue
+import select
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from redis.exceptions import ConnectionError as RedisConnectionError, RedisError
+
+logger = logging.getLogger(__name__)
+
+# Reconnexion des écoutes d'invalidation: premier délai puis doublement jusqu'au maximum (secondes)
+RECONNECT_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+class CacheBackend:
+    """Stockage clé/valeur avec expiration utilisé par LogementCache
+
+    `shared` indique si le stockage est commun à tous les workers (Redis) ou
+    propre au processus (mémoire).
+    """
+
+    shared = False
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class MemoryCacheBackend(CacheBackend):
+    """Stockage en mémoire du processus, borné (LRU) avec TTL par entrée"""
+
+    def __init__(self, max_size: int, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "evictions": self.evictions}
+
+class BloomFilter:
+    """Ensemble probabiliste: "absent" est certain, "présent" peut être un faux positif
+
+    Dimensionné pour `capacity` éléments au taux de faux positifs `error_rate`;
+    au-delà, le taux réel augmente (reconstruire avec une capacité plus grande).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / self.capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value: str) -> Iterable[int]:
+        # Double hachage (Kirsch-Mitzenmacher): k positions depuis un seul digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+    @property
+    def full(self) -> bool:
+        return self.count > self.capacity
+
+class RedisCacheBackend(CacheBackend):
+    """Stockage partagé entre workers dans Redis (valeurs sérialisées en JSON)
+
+    `client` est un client compatible redis-py (decode_responses=True) ou
+    FakeRedis pour les tests. Redis indisponible n'interrompt pas les
+    requêtes: lecture traitée comme un miss, écriture ignorée, et une clé
+    dont la suppression a échoué n'est plus lue par ce worker tant qu'elle
+    n'a pas été réécrite ou supprimée.
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix: str = "logements:"):
+        self.client = client
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        # Clés peut-être périmées dans Redis (suppression échouée)
+        self._stale: Set[str] = set()
+        self.errors = 0
+
+    def _error(self, message: str) -> None:
+        with self._lock:
+            self.errors += 1
+        logger.warning(message, exc_info=True)
+
+    def get(self, key: str) -> Optional[Any]:
+        if key in self._stale:
+            return None
+        try:
+            raw = self.client.get(self.prefix + key)
+        except RedisError:
+            self._error("Lecture du cache Redis impossible")
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            self.client.set(self.prefix + key, json.dumps(value), px=max(int(ttl * 1000), 1))
+        except RedisError:
+            self._error("Écriture du cache Redis impossible")
+            return
+        with self._lock:
+            self._stale.discard(key)
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            self.client.delete(*(self.prefix + key for key in keys))
+        except RedisError:
+            # L'écriture est déjà commitée: la valeur restée dans Redis n'est
+            # plus servie par ce worker (les autres expirent par TTL)
+            self._error("Suppression dans le cache Redis impossible")
+            with self._lock:
+                self._stale.update(keys)
+            return
+        with self._lock:
+            self._stale.difference_update(keys)
+
+    def clear(self) -> None:
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + "*"))
+            if keys:
+                self.client.delete(*keys)
+        except RedisError:
+            self._error("Vidage du cache Redis impossible")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"errors": self.errors, "stale_keys": len(self._stale)}
+
+class FakeRedis:
+    """Client Redis en processus (GET/SET PX/DEL/SCAN/PUBLISH/SUBSCRIBE) pour les tests
+
+    Plusieurs clients créés avec le même `server` partagent données et canaux,
+    ce qui simule plusieurs workers connectés au même Redis.
+    """
+
+    def __init__(self, server: Optional[dict] = None, clock: Callable[[], float] = time.monotonic):
+        self.server = server if server is not None else {"data": {}, "subscribers": {}, "lock": threading.Lock()}
+        self._clock = clock
+
+    def get(self, key: str) -> Optional[str]:
+        with self.server["lock"]:
+            entry = self.server["data"].get(key)
+            if entry is None or (entry[0] is not None and entry[0] <= self._clock()):
+                self.server["data"].pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: str, px: Optional[int] = None) -> bool:
+        expires = self._clock() + px / 1000 if px else None
+        with self.server["lock"]:
+            self.server["data"][key] = (expires, value)
+        return True
+
+    def delete(self, *keys: str) -> int:
+        with self.server["lock"]:
+            return sum(self.server["data"].pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match: str = "*"):
+        prefix = match.rstrip("*")
+        with self.server["lock"]:
+            keys = [key for key in self.server["data"] if key.startswith(prefix)]
+        return iter(keys)
+
+    def publish(self, channel: str, message: str) -> int:
+        with self.server["lock"]:
+            subscribers = list(self.server["subscribers"].get(channel, []))
+        for inbox in subscribers:
+            inbox.put({"type": "message", "channel": channel, "data": message})
+        return len(subscribers)
+
+    def pubsub(self, ignore_subscribe_messages: bool = True) -> "FakePubSub":
+        return FakePubSub(self.server)
+
+    def disconnect_subscribers(self) -> None:
+        """Simuler une coupure: abonnements perdus, écoutes interrompues par une erreur"""
+        with self.server["lock"]:
+            inboxes = [inbox for inboxes in self.server["subscribers"].values() for inbox in inboxes]
+            self.server["subscribers"] = {}
+        for inbox in inboxes:
+            inbox.put(RedisConnectionError("Connexion à Redis perdue"))
+
+class FakePubSub:
+    def __init__(self, server: dict):
+        self.server = server
+        self._inbox: "queue.Queue" = queue.Queue()
+        self._channels: List[str] = []
+
+    def subscribe(self, *channels: str) -> None:
+        with self.server["lock"]:
+            for channel in channels:
+                self.server["subscribers"].setdefault(channel, []).append(self._inbox)
+                self._channels.append(channel)
+
+    def listen(self):
+        while True:
+            message = self._inbox.get()
+            if message is None:
+                return
+            if isinstance(message, Exception):
+                raise message
+            yield message
+
+    def close(self) -> None:
+        with self.server["lock"]:
+            for channel in self._channels:
+                inboxes = self.server["subscribers"].get(channel, [])
+                if self._inbox in inboxes:
+                    inboxes.remove(self._inbox)
+        self._inbox.put(None)
+
+class InvalidationChannel:
+    """Diffusion des invalidations de cache aux autres workers
+
+    Le canal local ne diffuse rien: il suffit avec un seul worker ou un
+    stockage partagé.
+    """
+
+    def __init__(self):
+        # Identifiant du worker: ses propres messages sont ignorés à la réception
+        self.origin = uuid.uuid4().hex
+
+    def _encode(self, keys: Iterable[str]) -> str:
+        return json.dumps({"origin": self.origin, "keys": list(keys)})
+
+    def _decode(self, payload: str) -> Optional[List[str]]:
+        message = json.loads(payload)
+        if message.get("origin") == self.origin:
+            return None
+        return message.get("keys", [])
+
+    def publish(self, keys: Iterable[str]) -> None:
+        pass
+
+    def start(
+        self,
+        on_invalidate: Callable[[List[str]], None],
+        on_reconnect: Optional[Callable[[], None]] = None
+    ) -> None:
+        """Écouter les invalidations des autres workers
+
+        `on_reconnect` est appelé après chaque reconnexion: les messages
+        diffusés pendant la coupure sont perdus.
+        """
+        pass
+
+    def stop(self) -> None:
+        pass
+
+class RedisInvalidationChannel(InvalidationChannel):
+    """Invalidations diffusées par Redis PUBLISH/SUBSCRIBE"""
+
+    def __init__(self, client, channel: str = "logements:invalidation", reconnect_delay: float = RECONNECT_DELAY):
+        super().__init__()
+        self.client = client
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._pubsub = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, keys: Iterable[str]) -> None:
+        try:
+            self.client.publish(self.channel, self._encode(keys))
+        except Exception:
+            # L'écriture est déjà commitée: les autres workers expireront par TTL
+            logger.warning("Diffusion de l'invalidation du cache impossible", exc_info=True)
+
+    def start(
+        self,
+        on_invalidate: Callable[[List[str]], None],
+        on_reconnect: Optional[Callable[[], None]] = None
+    ) -> None:
+        self._running = True
+
+        def listen():
+            delay, connected = self.reconnect_delay, False
+            while self._running:
+                pubsub = None
+                try:
+                    pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(self.channel)
+                    self._pubsub = pubsub
+                    if connected and on_reconnect is not None:
+                        on_reconnect()
+                    connected, delay = True, self.reconnect_delay
+                    for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        keys = self._decode(message["data"])
+                        if keys:
+                            on_invalidate(keys)
+                except Exception:
+                    if not self._running:
+                        return
+                    logger.warning("Écoute des invalidations du cache interrompue, reconnexion", exc_info=True)
+                    if pubsub is not None:
+                        try:
+                            pubsub.close()
+                        except Exception:
+                            pass
+                if self._running:
+                    time.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+        self._thread = threading.Thread(target=listen, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+class PostgresInvalidationChannel(InvalidationChannel):
+    """Invalidations diffusées par PostgreSQL NOTIFY/LISTEN (sans Redis)"""
+
+    def __init__(self, dsn: str, channel: str = "logements_cache", reconnect_delay: float = RECONNECT_DELAY):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._publish_lock = threading.Lock()
+        self._publish_conn = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def _connect(self):
+        import psycopg2
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        return conn
+
+    def publish(self, keys: Iterable[str]) -> None:
+        payload = self._encode(keys)
+        with self._publish_lock:
+            try:
+                if self._publish_conn is None or self._publish_conn.closed:
+                    self._publish_conn = self._connect()
+                with self._publish_conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+            except Exception:
+                self._publish_conn = None
+                logger.warning("Diffusion de l'invalidation du cache impossible", exc_info=True)
+
+    def start(
+        self,
+        on_invalidate: Callable[[List[str]], None],
+        on_reconnect: Optional[Callable[[], None]] = None
+    ) -> None:
+        self._running = True
+
+        def listen():
+            delay, connected = self.reconnect_delay, False
+            while self._running:
+                try:
+                    conn = self._connect()
+                    with conn.cursor() as cursor:
+                        cursor.execute(f'LISTEN "{self.channel}"')
+                    if connected and on_reconnect is not None:
+                        on_reconnect()
+                    connected, delay = True, self.reconnect_delay
+                    while self._running:
+                        if select.select([conn], [], [], 1.0) == ([], [], []):
+                            continue
+                        conn.poll()
+                        while conn.notifies:
+                            keys = self._decode(conn.notifies.pop(0).payload)
+                            if keys:
+                                on_invalidate(keys)
+                    conn.close()
+                except Exception:
+                    logger.warning("Écoute des invalidations du cache interrompue, reconnexion", exc_info=True)
+                    time.sleep(delay)
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+        self._thread = threading.Thread(target=listen, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
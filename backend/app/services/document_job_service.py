@@ -0,0 +1,317 @@
+from sqlalchemy import case, literal, select, update, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, joinedload
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from datetime import date, timedelta
+import os
+from app.documents.store import document_store, DocumentStore
+from app.models.document_job import DocumentJob, TypeDocument, StatutJob, STATUTS_ACTIFS
+from app.models.souscription import Souscription, StatutSouscription
+from app.services.organisation_service import organisation_service, OrganisationService
+from app.exceptions.souscription_exceptions import (
+    DocumentJobNotFoundError,
+    DocumentNotReadyError,
+    SouscriptionNotFoundError,
+    SouscriptionStatutError
+)
+
+# Tentatives par job avant l'échec définitif
+DOCUMENT_JOB_MAX_TENTATIVES = int(os.getenv("DOCUMENT_JOB_MAX_TENTATIVES", "3"))
+# Délai avant la première reprise (secondes), doublé à chaque échec
+DOCUMENT_JOB_RETRY_DELAY = float(os.getenv("DOCUMENT_JOB_RETRY_DELAY", "30"))
+# Job EN_COURS sans nouvelles depuis ce délai (worker arrêté): remis en file
+DOCUMENT_JOB_TIMEOUT = float(os.getenv("DOCUMENT_JOB_TIMEOUT", "300"))
+
+def _date(valeur: Optional[date]) -> str:
+    return valeur.strftime("%d/%m/%Y") if valeur else ""
+
+class StoredDocument(NamedTuple):
+    """Document d'une souscription: fichier stocké, ou job qui le génère"""
+    key: str
+    fichier: Optional[str]
+    job: Optional[DocumentJob]
+
+class DocumentJobService:
+    """File d'attente persistante des PDF de souscription (table document_jobs)
+
+    L'API ne fait que mettre les jobs en file; les workers (app/documents/worker.py)
+    les réservent par lots avec FOR UPDATE SKIP LOCKED, rendent les PDF dans un
+    pool de processus et enregistrent le résultat ou planifient une reprise.
+    """
+
+    # Statuts de souscription pour lesquels les documents sont délivrés
+    STATUTS_DOCUMENTS = (StatutSouscription.PAYE, StatutSouscription.LIVRE)
+
+    def __init__(
+        self,
+        store: DocumentStore = document_store,
+        max_tentatives: int = DOCUMENT_JOB_MAX_TENTATIVES,
+        retry_delay: float = DOCUMENT_JOB_RETRY_DELAY,
+        timeout: float = DOCUMENT_JOB_TIMEOUT,
+        organisation: OrganisationService = organisation_service
+    ):
+        self.store = store
+        self.max_tentatives = max_tentatives
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.organisation = organisation
+
+    # Mise en file (API)
+
+    def _enqueue_statement(self, rows: List[dict]):
+        """INSERT ... ON CONFLICT DO NOTHING sur l'index partiel uq_document_jobs_actif"""
+        return (
+            pg_insert(DocumentJob)
+            .values(rows)
+            .on_conflict_do_nothing(
+                index_elements=[DocumentJob.souscription_id, DocumentJob.type_document],
+                # Prédicat identique à l'index (inférence de l'index partiel par PostgreSQL)
+                index_where=text("statut IN ('EN_ATTENTE', 'EN_COURS')")
+            )
+            .returning(DocumentJob)
+        )
+
+    def enqueue(
+        self,
+        db: Session,
+        souscription_ids: Sequence[int],
+        types: Iterable[TypeDocument] = tuple(TypeDocument)
+    ) -> List[DocumentJob]:
+        """Mettre en file les documents des souscriptions (sans commit)
+
+        Idempotent: une souscription a au plus un job actif par type. Les jobs
+        déjà en file sont renvoyés à la place des doublons. Appelé dans la
+        transaction du changement de statut pour que job et statut soient
+        commités ensemble.
+        """
+        types = list(types)
+        rows = [
+            {"souscription_id": souscription_id, "type_document": type_document, "max_tentatives": self.max_tentatives}
+            for souscription_id in souscription_ids
+            for type_document in types
+        ]
+        if not rows:
+            return []
+
+        jobs = list(db.scalars(self._enqueue_statement(rows)).all())
+        if len(jobs) < len(rows):
+            # Conflits: jobs actifs existants
+            crees = {job.id for job in jobs}
+            jobs.extend(
+                job for job in db.scalars(
+                    select(DocumentJob).where(
+                        DocumentJob.souscription_id.in_(list(souscription_ids)),
+                        DocumentJob.type_document.in_(types),
+                        DocumentJob.statut.in_(STATUTS_ACTIFS)
+                    )
+                )
+                if job.id not in crees
+            )
+        return sorted(jobs, key=lambda job: job.id)
+
+    def get_job(self, db: Session, job_id: int) -> DocumentJob:
+        job = db.get(DocumentJob, job_id)
+        if job is None:
+            raise DocumentJobNotFoundError(job_id)
+        return job
+
+    def get_jobs_souscription(self, db: Session, souscription_id: int) -> List[DocumentJob]:
+        """Jobs d'une souscription, le plus récent d'abord"""
+        return list(db.scalars(
+            select(DocumentJob)
+            .where(DocumentJob.souscription_id == souscription_id)
+            .order_by(DocumentJob.id.desc())
+        ))
+
+    def get_fichier(self, db: Session, job_id: int) -> Tuple[DocumentJob, str]:
+        """Job terminé et chemin de son PDF (supprimé s'il a été remplacé depuis)"""
+        job = self.get_job(db, job_id)
+        if job.statut != StatutJob.TERMINE or not job.fichier or not os.path.exists(job.fichier):
+            raise DocumentNotReadyError(job_id, job.statut.value)
+        return job, job.fichier
+
+    def get_document(self, db: Session, reference: str, type_document: TypeDocument) -> StoredDocument:
+        """Document d'une souscription par référence, sans nouveau rendu s'il est à jour
+
+        L'empreinte est calculée sur les données actuelles: si le client ou le
+        logement a changé depuis le dernier rendu, le document est remis en file.
+        """
+        souscription = db.scalars(
+            select(Souscription)
+            .options(joinedload(Souscription.client), joinedload(Souscription.logement))
+            .where(Souscription.reference == reference)
+        ).first()
+        if souscription is None:
+            raise SouscriptionNotFoundError(reference)
+        if souscription.statut not in self.STATUTS_DOCUMENTS:
+            statut = (souscription.statut or StatutSouscription.ATTENTE_PAIEMENT).value
+            raise SouscriptionStatutError(
+                "Documents disponibles uniquement pour une souscription payée",
+                statut,
+                StatutSouscription.PAYE.value
+            )
+
+        key = self.store.key(type_document.value, self.build_payload(souscription))
+        fichier = self.store.get(key)
+        if fichier is not None:
+            return StoredDocument(key, fichier, None)
+
+        job = self.enqueue(db, [souscription.id], [type_document])[0]
+        db.commit()
+        return StoredDocument(key, None, job)
+
+    # Traitement (workers)
+
+    def claim_statement(self, limit: int):
+        """Réserver jusqu'à `limit` jobs prêts en une requête (index ix_document_jobs_a_traiter)
+
+        SKIP LOCKED: plusieurs workers réservent des lots disjoints sans s'attendre.
+        """
+        a_traiter = (
+            select(DocumentJob.id)
+            .where(DocumentJob.statut == StatutJob.EN_ATTENTE, DocumentJob.disponible_a <= func.now())
+            .order_by(DocumentJob.disponible_a, DocumentJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return (
+            update(DocumentJob)
+            .where(DocumentJob.id.in_(a_traiter.scalar_subquery()))
+            .values(statut=StatutJob.EN_COURS, tentatives=DocumentJob.tentatives + 1, updated_at=func.now())
+            .returning(DocumentJob)
+            .execution_options(synchronize_session=False)
+        )
+
+    def claim(self, db: Session, limit: int) -> List[DocumentJob]:
+        jobs = list(db.scalars(self.claim_statement(limit)).all())
+        db.commit()
+        return sorted(jobs, key=lambda job: job.id)
+
+    def requeue_stale(self, db: Session) -> int:
+        """Remettre en file les jobs EN_COURS abandonnés (worker arrêté pendant le rendu)
+
+        Un job qui a déjà épuisé ses tentatives passe en échec: un document qui
+        fait tomber le worker ne doit pas être réessayé indéfiniment.
+        """
+        result = db.execute(
+            update(DocumentJob)
+            .where(
+                DocumentJob.statut == StatutJob.EN_COURS,
+                DocumentJob.updated_at < func.now() - timedelta(seconds=self.timeout)
+            )
+            .values(
+                statut=case(
+                    (DocumentJob.tentatives >= DocumentJob.max_tentatives, literal(StatutJob.ECHEC, DocumentJob.statut.type)),
+                    else_=literal(StatutJob.EN_ATTENTE, DocumentJob.statut.type)
+                ),
+                erreur=case(
+                    (DocumentJob.tentatives >= DocumentJob.max_tentatives, "Rendu interrompu (délai dépassé)"),
+                    else_=DocumentJob.erreur
+                ),
+                disponible_a=func.now(),
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+
+    def build_payload(self, souscription: Souscription) -> Dict[str, Any]:
+        """Données du document, en types simples pour le pool de processus"""
+        client, logement = souscription.client, souscription.logement
+        return {
+            "reference": souscription.reference,
+            "date_emission": _date(date.today()),
+            "qr_code_url": self.organisation.generate_qr_code_url(souscription.reference),
+            "organisation": dict(self.organisation.get_organisation_info()),
+            "ceo": dict(self.organisation.get_ceo_info()),
+            "client": {
+                "nom_complet": client.nom_complet,
+                "date_naissance": _date(client.date_naissance),
+                "ville_naissance": client.ville_naissance,
+                "pays_naissance": client.pays_naissance,
+                "email": client.email,
+                "telephone": client.telephone,
+                "etablissement": client.etablissement,
+                "niveau_etude": client.niveau_etude,
+            },
+            "logement": {
+                "titre": logement.titre,
+                "adresse": logement.adresse,
+                "ville": logement.ville,
+                "code_postal": logement.code_postal,
+                "pays": logement.pays,
+                "loyer": float(logement.loyer),
+                "montant_charges": float(logement.montant_charges),
+                "montant_total": float(logement.montant_total),
+            },
+            "souscription": {
+                "date_entree": _date(souscription.date_entree),
+                "duree_location": souscription.duree_location,
+                "statut": souscription.statut.value if souscription.statut else None,
+            },
+        }
+
+    def build_payloads(self, db: Session, jobs: Sequence[DocumentJob]) -> Dict[int, Dict[str, Any]]:
+        """Données de chaque job, souscriptions chargées en une requête"""
+        souscriptions = {
+            souscription.id: souscription
+            for souscription in db.scalars(
+                select(Souscription)
+                .options(joinedload(Souscription.client), joinedload(Souscription.logement))
+                .where(Souscription.id.in_({job.souscription_id for job in jobs}))
+            ).unique()
+        }
+        return {
+            job.id: self.build_payload(souscriptions[job.souscription_id])
+            for job in jobs
+            if job.souscription_id in souscriptions
+        }
+
+    def complete(self, db: Session, job: DocumentJob, fichier: str) -> None:
+        """Enregistrer le document d'un job et supprimer les versions qu'il remplace"""
+        remplaces = db.scalars(
+            select(DocumentJob.fichier)
+            .where(
+                DocumentJob.souscription_id == job.souscription_id,
+                DocumentJob.type_document == job.type_document,
+                DocumentJob.statut == StatutJob.TERMINE,
+                DocumentJob.fichier != fichier
+            )
+            .distinct()
+        ).all()
+        db.execute(
+            update(DocumentJob)
+            .where(DocumentJob.id == job.id)
+            .values(statut=StatutJob.TERMINE, fichier=fichier, erreur=None, termine_a=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        # Données modifiées depuis: l'ancienne empreinte n'est plus jamais servie
+        for ancien in remplaces:
+            self.store.discard(ancien)
+
+    def retry_delay_for(self, tentatives: int) -> timedelta:
+        """Attente avant la reprise suivant la n-ième tentative (backoff exponentiel)"""
+        return timedelta(seconds=self.retry_delay * 2 ** max(tentatives - 1, 0))
+
+    def fail(self, db: Session, job: DocumentJob, erreur: str) -> StatutJob:
+        """Planifier une reprise, ou l'échec définitif après max_tentatives"""
+        if job.tentatives >= job.max_tentatives:
+            valeurs = {"statut": StatutJob.ECHEC, "termine_a": func.now()}
+        else:
+            valeurs = {
+                "statut": StatutJob.EN_ATTENTE,
+                "disponible_a": func.now() + self.retry_delay_for(job.tentatives)
+            }
+        db.execute(
+            update(DocumentJob)
+            .where(DocumentJob.id == job.id)
+            .values(erreur=erreur[:2000], **valeurs)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return valeurs["statut"]
+
+# Instance globale du service
+document_job_service = DocumentJobService()
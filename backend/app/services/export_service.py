@@ -0,0 +1,97 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from typing import Any, Iterator, List, Optional, Sequence
+from datetime import date, datetime
+import csv
+import enum
+import io
+import json
+from app.models.logement import LIKE_ESCAPE, Logement, StatutLogement, contains_pattern
+from app.models.client import Client
+from app.models.souscription import Souscription
+
+class ExportService:
+    """Service d'export en flux (CSV ou NDJSON) à mémoire constante"""
+
+    MEDIA_TYPES = {
+        "csv": "text/csv; charset=utf-8",
+        "ndjson": "application/x-ndjson"
+    }
+
+    # Lignes lues par aller-retour sur le curseur serveur
+    BATCH_SIZE = 1000
+
+    def _format_value(self, value: Any) -> Any:
+        if isinstance(value, enum.Enum):
+            return value.value
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    def _csv_chunk(self, rows: Sequence[Sequence[Any]]) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if value is None else self._format_value(value) for value in row])
+        return buffer.getvalue()
+
+    def stream(self, db: Session, stmt: Select, format: str) -> Iterator[str]:
+        """Exécuter la requête sur un curseur serveur et produire le fichier par lots
+
+        Les lignes sont lues comme tuples (sans objets ORM ni schémas Pydantic),
+        BATCH_SIZE à la fois: la mémoire reste constante quelle que soit la taille
+        de la table.
+        """
+        result = db.execute(stmt.execution_options(yield_per=self.BATCH_SIZE))
+        columns: List[str] = list(result.keys())
+
+        if format == "csv":
+            yield self._csv_chunk([columns])
+
+        for partition in result.partitions():
+            if format == "csv":
+                yield self._csv_chunk(partition)
+            else:
+                yield "".join(
+                    json.dumps(
+                        {column: self._format_value(value) for column, value in zip(columns, row)},
+                        ensure_ascii=False
+                    ) + "\n"
+                    for row in partition
+                )
+
+    def logements_statement(
+        self,
+        statut: Optional[StatutLogement] = None,
+        ville: Optional[str] = None
+    ) -> Select:
+        """Toutes les colonnes des logements, dans l'ordre des identifiants"""
+        stmt = select(*Logement.__table__.columns).order_by(Logement.id)
+        if statut:
+            stmt = stmt.where(Logement.statut == statut)
+        if ville:
+            stmt = stmt.where(Logement.ville.ilike(contains_pattern(ville), escape=LIKE_ESCAPE))
+        return stmt
+
+    def souscriptions_statement(self) -> Select:
+        """Souscriptions avec l'identité du client et le logement concerné"""
+        return (
+            select(
+                *Souscription.__table__.columns,
+                Client.nom_complet.label("client_nom_complet"),
+                Client.email.label("client_email"),
+                Logement.titre.label("logement_titre"),
+                Logement.adresse.label("logement_adresse"),
+                Logement.ville.label("logement_ville")
+            )
+            .join(Client, Souscription.client_id == Client.id)
+            .join(Logement, Souscription.logement_id == Logement.id)
+            .order_by(Souscription.id)
+        )
+
+    def filename(self, prefix: str, format: str) -> str:
+        return f"{prefix}-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+
+# Instance globale du service
+export_service = ExportService()
@@ -0,0 +1,178 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from app.models.logement import Logement, StatutLogement
+from app.schemas.logement import LogementCreate, LogementUpdate
+from app.services.logement_service import LogementService
+from app.exceptions.logement_exceptions import LogementNotFoundError
+
+class AsyncLogementService(LogementService):
+    """Variante asynchrone (AsyncSession/asyncpg) de LogementService
+
+    Les règles métier et la construction des requêtes sont héritées; seules
+    les exécutions sur la base sont réécrites en coroutines.
+    """
+
+    async def create_logement(self, db: AsyncSession, logement: LogementCreate) -> Logement:
+        """Créer un nouveau logement avec validations métier"""
+        logement_data = self._prepare_logement_data(logement)
+        stmt = self._insert_statement(logement_data)
+
+        try:
+            db_logement = (await db.scalars(stmt)).first()
+        except IntegrityError as e:
+            await db.rollback()
+            raise self._integrity_error(e, logement_data['adresse'], logement_data['ville'])
+
+        if db_logement is None:
+            await db.rollback()
+            raise self._duplicate_error(logement_data['adresse'], logement_data['ville'])
+
+        logement_id = db_logement.id
+        await db.commit()
+        self._invalidate_cache(logement_id, [logement_data['statut']])
+        return db_logement
+
+    async def get_logement(self, db: AsyncSession, logement_id: int) -> Optional[Logement]:
+        """Récupérer un logement par ID"""
+        return await db.get(Logement, logement_id)
+
+    async def get_logements(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        statut: Optional[StatutLogement] = None,
+        ville: Optional[str] = None,
+        q: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> List:
+        """Récupérer une liste de logements avec filtres et recherche optionnels"""
+        champs = self.parse_fields(fields)
+        query = self._list_statement(statut=statut, ville=ville, q=q, champs=champs).offset(skip).limit(limit)
+        if champs:
+            return self._project((await db.execute(query)).all(), champs)
+        return (await db.scalars(query)).all()
+
+    async def get_logements_page(
+        self,
+        db: AsyncSession,
+        limit: int = 100,
+        statut: Optional[StatutLogement] = None,
+        ville: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """Récupérer une page de logements par curseur (keyset pagination)"""
+        champs = self.parse_fields(fields)
+        stmt = self._page_statement(limit, statut, ville, cursor, champs)
+        logements = (await db.execute(stmt)).all() if champs else (await db.scalars(stmt)).all()
+        return self._split_page(logements, limit, champs)
+
+    async def get_logements_fingerprint(
+        self,
+        db: AsyncSession,
+        statut: Optional[StatutLogement] = None,
+        ville: Optional[str] = None,
+        q: Optional[str] = None
+    ) -> Dict:
+        """Empreinte d'une liste filtrée, sans charger les lignes"""
+        row = (await db.execute(self._fingerprint_statement(statut, ville, q))).one()
+        return self._build_fingerprint(row)
+
+    async def get_logement_version(
+        self,
+        db: AsyncSession,
+        logement_id: int,
+        for_update: bool = False
+    ) -> Optional[datetime]:
+        """Version courante d'un logement (None s'il n'existe pas)"""
+        return (await db.scalars(self._version_statement(logement_id, for_update))).first()
+
+    async def update_logement(
+        self,
+        db: AsyncSession,
+        logement_id: int,
+        logement_update: LogementUpdate
+    ) -> Logement:
+        """Mettre à jour un logement avec validations métier"""
+        db_logement = await self.get_logement(db, logement_id)
+        if not db_logement:
+            raise LogementNotFoundError(logement_id)
+
+        ancien_statut = db_logement.statut
+        self._apply_update(db_logement, logement_update)
+
+        adresse, ville = db_logement.adresse, db_logement.ville
+        try:
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            raise self._integrity_error(e, adresse, ville)
+
+        self._invalidate_cache(logement_id, [ancien_statut, db_logement.statut])
+        return db_logement
+
+    async def delete_logement(self, db: AsyncSession, logement_id: int) -> bool:
+        """Supprimer un logement"""
+        db_logement = await self.get_logement(db, logement_id)
+        if not db_logement:
+            return False
+
+        statut = db_logement.statut
+        await db.delete(db_logement)
+        await db.commit()
+        self._invalidate_cache(logement_id, [statut])
+        return True
+
+    async def get_logements_disponibles(self, db: AsyncSession) -> List[Logement]:
+        """Récupérer tous les logements disponibles"""
+        return await self.get_logements(db, statut=StatutLogement.DISPONIBLE)
+
+    async def changer_statut_logement(
+        self,
+        db: AsyncSession,
+        logement_id: int,
+        nouveau_statut: StatutLogement
+    ) -> Logement:
+        """Changer le statut d'un logement avec validations métier"""
+        db_logement = await self.get_logement(db, logement_id)
+        if not db_logement:
+            raise LogementNotFoundError(logement_id)
+
+        self._validate_statut_change(db_logement, nouveau_statut)
+
+        ancien_statut = db_logement.statut
+        db_logement.statut = nouveau_statut
+        await db.commit()
+        self._invalidate_cache(logement_id, [ancien_statut, nouveau_statut])
+        return db_logement
+
+    async def get_stats_logements(self, db: AsyncSession) -> dict:
+        """Obtenir les statistiques des logements en un seul aller-retour"""
+        rows = (await db.execute(self._stats_statement())).all()
+        return self._build_stats(rows)
+
+class ThreadedLogementService:
+    """LogementService synchrone exposé sous forme de coroutines
+
+    Chaque appel s'exécute dans le threadpool de Starlette, comme une route
+    `def`: les routes async fonctionnent ainsi avec les deux piles.
+    """
+
+    def __init__(self, service: LogementService):
+        self._service = service
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._service, name)
+        if not callable(attr):
+            return attr
+
+        async def call_in_threadpool(*args, **kwargs):
+            return await run_in_threadpool(attr, *args, **kwargs)
+        return call_in_threadpool
+
+# Instance globale du service
+async_logement_service = AsyncLogementService()
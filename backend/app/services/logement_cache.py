@@ -0,0 +1,266 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from sqlalchemy.engine import make_url
+from app.models.logement import StatutLogement
+from app.schemas.logement import serialize_logement
+from app.services.cache_backends import (
+    CacheBackend,
+    FakeRedis,
+    InvalidationChannel,
+    MemoryCacheBackend,
+    PostgresInvalidationChannel,
+    RedisCacheBackend,
+    RedisInvalidationChannel
+)
+
+# Durée de vie (secondes, 0 pour désactiver) et nombre maximum d'entrées
+CACHE_TTL = float(os.getenv("LOGEMENT_CACHE_TTL", "30"))
+CACHE_MAX_SIZE = int(os.getenv("LOGEMENT_CACHE_MAX_SIZE", "1024"))
+# Avec une réplique de lecture, retard de réplication toléré (même délai que
+# le routage read-your-writes): pas de remplissage du cache pendant ce délai
+# après une invalidation, la réplique pouvant encore servir la ligne périmée
+CACHE_REPLICA_LAG = (
+    float(os.getenv("DATABASE_READ_STICKY_SECONDS", "10")) if os.getenv("DATABASE_READ_URL") else 0.0
+)
+
+# Stockage: memory (par worker), redis (partagé) ou fake (Redis en processus, tests)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+# Diffusion des invalidations entre workers: local (aucune), redis ou postgres
+CACHE_INVALIDATION = os.getenv("CACHE_INVALIDATION", "local")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+class LogementCache:
+    """Cache des lectures fréquentes de logements (TTL, taille bornée)
+
+    Les valeurs sont des structures JSON (dict/list) déjà sérialisées: elles
+    ne dépendent d'aucune session et peuvent être partagées entre requêtes et
+    entre workers. Chaque invalidation locale est diffusée aux autres workers
+    par le canal d'invalidation.
+    """
+
+    DISPONIBLES = "disponibles"
+    STATS = "stats"
+
+    def __init__(
+        self,
+        ttl: float = CACHE_TTL,
+        max_size: int = CACHE_MAX_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+        backend: Optional[CacheBackend] = None,
+        channel: Optional[InvalidationChannel] = None,
+        replica_lag: float = CACHE_REPLICA_LAG
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.replica_lag = replica_lag
+        self._clock = clock
+        self.backend = backend or MemoryCacheBackend(max_size, clock)
+        self.channel = channel or InvalidationChannel()
+        self._lock = threading.Lock()
+        # Incrémenté à chaque invalidation: une lecture commencée avant une
+        # écriture ne doit pas remettre en cache une valeur périmée
+        self.generation = 0
+        self._invalidated_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.remote_invalidations = 0
+        self.reconnections = 0
+
+    @staticmethod
+    def detail_key(logement_id: int) -> str:
+        return f"logement:{logement_id}"
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Valeur en cache, ou None si absente ou expirée"""
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, generation: Optional[int] = None) -> None:
+        """Mettre en cache, sauf si une invalidation a eu lieu depuis `generation`
+
+        Une valeur lue en base (`generation` fourni) n'est pas non plus mise en
+        cache moins de `replica_lag` secondes après la dernière invalidation:
+        lue sur la réplique, elle peut précéder l'écriture invalidée.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation is not None and (
+                generation != self.generation
+                or self._clock() - self._invalidated_at < self.replica_lag
+            ):
+                return
+            self.backend.set(key, value, self.ttl)
+
+    def _drop(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self.generation += 1
+            self._invalidated_at = self._clock()
+            self.backend.delete(*keys)
+
+    def invalidate(self, *keys: str) -> None:
+        """Invalider localement puis diffuser aux autres workers"""
+        self._drop(keys)
+        with self._lock:
+            self.invalidations += 1
+        self.channel.publish(keys)
+
+    def _on_remote_invalidation(self, keys: List[str]) -> None:
+        self._drop(keys)
+        with self._lock:
+            self.remote_invalidations += 1
+
+    def _on_reconnect(self) -> None:
+        """Invalidations perdues pendant la coupure du canal: tout le cache local est suspect"""
+        with self._lock:
+            self.generation += 1
+            self._invalidated_at = self._clock()
+            self.reconnections += 1
+            # Stockage partagé: les workers émetteurs l'ont déjà invalidé eux-mêmes
+            if not self.backend.shared:
+                self.backend.clear()
+
+    def start(self) -> None:
+        """Écouter les invalidations des autres workers (démarrage de l'application)"""
+        self.channel.start(self._on_remote_invalidation, self._on_reconnect)
+
+    def stop(self) -> None:
+        self.channel.stop()
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._invalidated_at = self._clock()
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "backend": type(self.backend).__name__,
+                "channel": type(self.channel).__name__,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "remote_invalidations": self.remote_invalidations,
+                "reconnections": self.reconnections,
+            }
+        stats.update(self.backend.stats())
+        return stats
+
+    def keys_for_write(self, logement_id: Optional[int], statuts: Iterable[StatutLogement]) -> List[str]:
+        """Clés touchées par l'écriture d'un logement (statuts avant/après)
+
+        Les statistiques changent à chaque écriture; la liste des disponibles
+        seulement si le logement y entre, en sort ou y figure.
+        """
+        keys = [self.STATS]
+        if logement_id is not None:
+            keys.append(self.detail_key(logement_id))
+        if StatutLogement.DISPONIBLE in set(statuts):
+            keys.append(self.DISPONIBLES)
+        return keys
+
+class CachedLogementService:
+    """Lectures chaudes (détail, disponibles, stats) servies depuis le cache
+
+    Enveloppe un service à coroutines (AsyncLogementService ou
+    ThreadedLogementService); sur un hit la session n'est jamais utilisée.
+    Les écritures sont déléguées telles quelles: l'invalidation est faite par
+    LogementService après chaque commit.
+    """
+
+    def __init__(self, service, cache: LogementCache):
+        self._service = service
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._service, name)
+
+    async def get_logement(self, db, logement_id: int) -> Optional[dict]:
+        key = self.cache.detail_key(logement_id)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation
+        db_logement = await self._service.get_logement(db=db, logement_id=logement_id)
+        if db_logement is None:
+            return None
+        data = serialize_logement(db_logement)
+        self.cache.set(key, data, generation)
+        return data
+
+    async def get_disponibles_snapshot(self, db) -> dict:
+        """Logements disponibles et empreinte de la liste (pour l'ETag), mis en cache ensemble"""
+        cached = self.cache.get(self.cache.DISPONIBLES)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation
+        fingerprint = await self._service.get_logements_fingerprint(db=db, statut=StatutLogement.DISPONIBLE)
+        items = [serialize_logement(l) for l in await self._service.get_logements_disponibles(db=db)]
+        snapshot = {"fingerprint": fingerprint, "items": items}
+        self.cache.set(self.cache.DISPONIBLES, snapshot, generation)
+        return snapshot
+
+    async def get_logements_disponibles(self, db) -> List[dict]:
+        return (await self.get_disponibles_snapshot(db))["items"]
+
+    async def get_stats_logements(self, db) -> dict:
+        cached = self.cache.get(self.cache.STATS)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation
+        data = await self._service.get_stats_logements(db=db)
+        self.cache.set(self.cache.STATS, data, generation)
+        return data
+
+def _redis_client():
+    import redis
+    return redis.Redis.from_url(REDIS_URL, decode_responses=True)
+
+def create_logement_cache() -> LogementCache:
+    """Construire le cache selon CACHE_BACKEND et CACHE_INVALIDATION"""
+    client = None
+    if CACHE_BACKEND == "redis":
+        client = _redis_client()
+        backend = RedisCacheBackend(client)
+    elif CACHE_BACKEND == "fake":
+        client = FakeRedis()
+        backend = RedisCacheBackend(client)
+    elif CACHE_BACKEND == "memory":
+        backend = MemoryCacheBackend(CACHE_MAX_SIZE)
+    else:
+        raise ValueError(f"CACHE_BACKEND inconnu: {CACHE_BACKEND}")
+
+    if CACHE_INVALIDATION == "redis":
+        channel = RedisInvalidationChannel(client or _redis_client())
+    elif CACHE_INVALIDATION == "postgres":
+        from app.database import DATABASE_URL
+        dsn = make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        channel = PostgresInvalidationChannel(dsn)
+    elif CACHE_INVALIDATION == "local":
+        channel = InvalidationChannel()
+    else:
+        raise ValueError(f"CACHE_INVALIDATION inconnu: {CACHE_INVALIDATION}")
+
+    return LogementCache(backend=backend, channel=channel)
+
+# Instance globale du cache
+logement_cache = create_logement_cache()
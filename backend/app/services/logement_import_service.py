@@ -0,0 +1,243 @@
+from sqlalchemy import Integer, String, column, func, select, values
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from pydantic import ValidationError
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+import csv
+import io
+import json
+from app.models.logement import Logement
+from app.schemas.logement import LogementCreate
+from app.services.logement_service import LogementService, logement_service
+from app.exceptions.logement_exceptions import LogementBusinessRuleError, LogementValidationError
+
+# (numéro de ligne, données brutes, erreur de lecture éventuelle)
+ImportRow = Tuple[int, Optional[dict], Optional[str]]
+
+class LogementImportService:
+    """Service d'import en masse de logements (CSV ou NDJSON)"""
+
+    FORMATS = ("csv", "ndjson")
+
+    # Nombre de lignes insérées (et validées en base) par transaction
+    CHUNK_SIZE = 1000
+
+    def __init__(self, logement_service: LogementService):
+        self.logement_service = logement_service
+
+    def detect_format(self, format: Optional[str], content_type: Optional[str], filename: Optional[str]) -> str:
+        """Déterminer le format du fichier: paramètre explicite, type MIME puis extension"""
+        if format:
+            format = format.lower()
+        elif content_type in ("text/csv", "application/csv"):
+            format = "csv"
+        elif content_type in ("application/x-ndjson", "application/jsonl", "application/x-jsonlines"):
+            format = "ndjson"
+        elif filename and "." in filename:
+            extension = filename.rsplit(".", 1)[1].lower()
+            format = "ndjson" if extension in ("ndjson", "jsonl") else extension
+
+        if format not in self.FORMATS:
+            raise LogementValidationError(
+                f"Format d'import non supporté. Formats valides: {', '.join(self.FORMATS)}",
+                "format"
+            )
+        return format
+
+    def iter_rows(self, stream: BinaryIO, format: str) -> Iterator[ImportRow]:
+        """Lire le fichier ligne à ligne sans le charger entièrement en mémoire"""
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        try:
+            if format == "csv":
+                # Ligne 1: en-tête
+                for ligne, row in enumerate(csv.DictReader(text), start=2):
+                    # Les cellules vides prennent la valeur par défaut du schéma
+                    yield ligne, {
+                        key.strip(): value
+                        for key, value in row.items()
+                        if key is not None and value not in (None, "")
+                    }, None
+            else:
+                for ligne, raw in enumerate(text, start=1):
+                    if not raw.strip():
+                        continue
+                    try:
+                        data = json.loads(raw)
+                    except json.JSONDecodeError as e:
+                        yield ligne, None, f"JSON invalide: {e.msg}"
+                        continue
+                    if not isinstance(data, dict):
+                        yield ligne, None, "Chaque ligne doit être un objet JSON"
+                        continue
+                    yield ligne, data, None
+        finally:
+            # Ne pas fermer le fichier téléversé avec l'enveloppe texte
+            text.detach()
+
+    def _format_validation_error(self, e: ValidationError) -> str:
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'logement'}: {err['msg']}"
+            for err in e.errors()
+        )
+
+    def _cles_adresse(self, db: Session, chunk: List[Tuple[int, dict]]) -> Dict[int, Tuple[str, str]]:
+        """Clés normalisées par ligne, calculées comme l'index unique uq_logements_adresse_ville
+
+        lower() de PostgreSQL dépend de la collation et peut différer de
+        str.lower() hors ASCII: ces lignes sont normalisées par la base, en
+        une requête pour le lot; les lignes ASCII le sont localement.
+        """
+        cles = {}
+        a_normaliser = []
+        for ligne, data in chunk:
+            if data['adresse'].isascii() and data['ville'].isascii():
+                cles[ligne] = data['adresse'].lower(), data['ville'].lower()
+            else:
+                a_normaliser.append((ligne, data['adresse'], data['ville']))
+        if a_normaliser:
+            table = values(
+                column("ligne", Integer), column("adresse", String), column("ville", String), name="cles"
+            ).data(a_normaliser)
+            for ligne, adresse, ville in db.execute(
+                select(table.c.ligne, func.lower(table.c.adresse), func.lower(table.c.ville))
+            ):
+                cles[ligne] = adresse, ville
+        return cles
+
+    def _insert_statement(self, rows: List[dict]):
+        """INSERT ... ON CONFLICT DO NOTHING RETURNING des clés normalisées insérées"""
+        return (
+            pg_insert(Logement)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=self.logement_service._adresse_conflict_target())
+            .returning(*self.logement_service._adresse_conflict_target())
+        )
+
+    def _duplicate(self, ligne: int, data: dict) -> Dict:
+        return {
+            "ligne": ligne,
+            "message": f"Un logement existe déjà à cette adresse: {data['adresse']}, {data['ville']}",
+            "rule": "duplicate_adresse"
+        }
+
+    def _doublon_fichier(self, ligne: int) -> Dict:
+        return {"ligne": ligne, "message": "Adresse en double dans le fichier", "rule": "duplicate_adresse"}
+
+    def _insert_rows(
+        self,
+        db: Session,
+        chunk: List[Tuple[int, dict]],
+        cles: Dict[int, Tuple[str, str]],
+        rapport: Dict,
+        adresses_vues: set
+    ) -> None:
+        """Lot rejeté par une contrainte: reprise ligne par ligne pour nommer les lignes fautives
+
+        Une ligne rejetée ne réserve pas son adresse: une ligne suivante du
+        fichier à la même adresse est encore insérée.
+        """
+        for ligne, data in chunk:
+            if cles[ligne] in adresses_vues:
+                rapport["erreurs"].append(self._doublon_fichier(ligne))
+                continue
+            try:
+                inseree = db.execute(self._insert_statement([data])).first()
+                db.commit()
+            except IntegrityError as e:
+                db.rollback()
+                erreur = self.logement_service._integrity_error(e, data['adresse'], data['ville'])
+                rapport["erreurs"].append({"ligne": ligne, "message": erreur.message})
+                if isinstance(erreur, LogementBusinessRuleError):
+                    rapport["erreurs"][-1]["rule"] = erreur.rule
+                continue
+            adresses_vues.add(cles[ligne])
+            if inseree is None:
+                rapport["erreurs"].append(self._duplicate(ligne, data))
+                continue
+            rapport["crees"] += 1
+            self.logement_service._invalidate_cache(None, [data["statut"]])
+
+    def _insert_chunk(self, db: Session, chunk: List[Tuple[int, dict]], rapport: Dict, adresses_vues: set) -> None:
+        """Insérer un lot en une requête; doublons du fichier et adresses déjà en base signalés
+
+        `adresses_vues` ne reçoit que les clés insérées ou déjà présentes en base.
+        """
+        cles = self._cles_adresse(db, chunk)
+        lignes, doublons, cles_lot = [], [], set()
+        for ligne, data in chunk:
+            if cles[ligne] in adresses_vues or cles[ligne] in cles_lot:
+                doublons.append((ligne, data))
+                continue
+            cles_lot.add(cles[ligne])
+            lignes.append((ligne, data))
+        if not lignes:
+            rapport["erreurs"].extend(self._doublon_fichier(ligne) for ligne, _ in doublons)
+            return
+
+        try:
+            inserees = {tuple(row) for row in db.execute(self._insert_statement([data for _, data in lignes]))}
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            # Doublons du lot repris dans l'ordre du fichier: l'adresse d'une ligne rejetée reste libre
+            self._insert_rows(db, sorted(lignes + doublons, key=lambda row: row[0]), cles, rapport, adresses_vues)
+            return
+
+        adresses_vues.update(cles_lot)
+        rapport["erreurs"].extend(self._doublon_fichier(ligne) for ligne, _ in doublons)
+        rapport["crees"] += len(inserees)
+        if inserees:
+            self.logement_service._invalidate_cache(None, {data["statut"] for _, data in lignes})
+        for ligne, data in lignes:
+            if cles[ligne] not in inserees:
+                rapport["erreurs"].append(self._duplicate(ligne, data))
+
+    def import_logements(
+        self,
+        db: Session,
+        rows: Iterable[ImportRow],
+        chunk_size: Optional[int] = None
+    ) -> Dict:
+        """Valider et insérer des logements par lots
+
+        Chaque ligne passe par les mêmes validations que POST /logements/
+        (schéma LogementCreate et règles métier). Les doublons sont détectés
+        dans le fichier (clés normalisées comme l'index unique) puis en base
+        par ON CONFLICT, un commit par lot; un lot rejeté par une contrainte
+        est repris ligne par ligne. Retourne un rapport avec les erreurs par ligne.
+        """
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        rapport = {"total": 0, "crees": 0, "erreurs": []}
+        # Clés normalisées déjà rencontrées dans le fichier
+        adresses_vues = set()
+        chunk: List[Tuple[int, dict]] = []
+
+        for ligne, data, erreur in rows:
+            rapport["total"] += 1
+            if erreur:
+                rapport["erreurs"].append({"ligne": ligne, "message": erreur})
+                continue
+
+            try:
+                logement_data = self.logement_service._prepare_logement_data(LogementCreate(**data))
+            except ValidationError as e:
+                rapport["erreurs"].append({"ligne": ligne, "message": self._format_validation_error(e)})
+                continue
+            except LogementBusinessRuleError as e:
+                rapport["erreurs"].append({"ligne": ligne, "message": e.message, "rule": e.rule})
+                continue
+
+            chunk.append((ligne, logement_data))
+            if len(chunk) >= chunk_size:
+                self._insert_chunk(db, chunk, rapport, adresses_vues)
+                chunk = []
+
+        if chunk:
+            self._insert_chunk(db, chunk, rapport, adresses_vues)
+
+        rapport["erreurs"].sort(key=lambda erreur: erreur["ligne"])
+        return rapport
+
+# Instance globale du service
+logement_import_service = LogementImportService(logement_service)
@@ -1,10 +1,27 @@
+from sqlalchemy import and_, or_, select, func, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
-from app.models.logement import Logement, StatutLogement
-from app.schemas.logement import LogementCreate, LogementUpdate
+import base64
+import binascii
+import json
+from app.models.logement import (
+    LIKE_ESCAPE,
+    Logement,
+    StatutLogement,
+    SEARCH_CONFIG,
+    contains_pattern,
+    logement_search_vector
+)
+from app.schemas.logement import LogementCompact, LogementCreate, LogementResponse, LogementUpdate
+from app.services.logement_cache import logement_cache
+from app.validators import logement_validators
 from app.exceptions.logement_exceptions import (
+    LogementException,
     LogementValidationError,
     LogementBusinessRuleError,
     LogementNotFoundError,
@@ -14,6 +31,15 @@ from app.exceptions.logement_exceptions import (
 class LogementService:
     """Service pour la gestion CRUD des logements"""
     
+    # Lectures en cache (détail, disponibles, stats) invalidées après chaque écriture
+    cache = logement_cache
+    
+    # Projection des listes (fields=): champs autorisés et préréglage "compact"
+    CHAMPS = tuple(LogementResponse.model_fields)
+    CHAMPS_COMPACT = tuple(LogementCompact.model_fields)
+    # Toujours sélectionnés: clés de tri nécessaires au curseur de pagination
+    CHAMPS_TRI = ("updated_at", "created_at", "id")
+    
     # Règles métier configurables
     LOYER_MIN = 50.0          # Loyer minimum acceptable
     LOYER_MAX = 50000.0       # Loyer maximum acceptable
@@ -63,77 +89,376 @@ class LogementService:
                 "montant_total_maximum"
             )
     
-    def _check_duplicate_logement(self, db: Session, adresse: str, ville: str, exclude_id: Optional[int] = None) -> None:
-        """Vérifier qu'il n'y a pas de doublon sur adresse + ville"""
-        query = db.query(Logement).filter(
-            Logement.adresse == adresse.strip(),
-            Logement.ville == ville.strip()
+    # Index unique sur l'adresse normalisée (voir Logement.__table_args__)
+    ADRESSE_UNIQUE_INDEX = "uq_logements_adresse_ville"
+    
+    def _adresse_conflict_target(self) -> list:
+        """Clé normalisée de l'index unique adresse + ville"""
+        return [func.lower(Logement.adresse), func.lower(Logement.ville)]
+    
+    def _duplicate_error(self, adresse: str, ville: str) -> LogementBusinessRuleError:
+        return LogementBusinessRuleError(
+            f"Un logement existe déjà à cette adresse: {adresse}, {ville}",
+            "duplicate_adresse"
         )
+    
+    def _integrity_error(self, e: IntegrityError, adresse: str, ville: str) -> LogementException:
+        """Traduire une violation de contrainte en exception métier"""
+        if self.ADRESSE_UNIQUE_INDEX in str(e.orig):
+            return self._duplicate_error(adresse, ville)
+        if "check_" in str(e):
+            return LogementValidationError("Données invalides: contrainte de base de données violée")
+        return LogementValidationError("Erreur d'intégrité des données")
+    
+    def _prepare_logement_data(self, logement: LogementCreate) -> dict:
+        """Valider les règles métier et préparer les colonnes à insérer"""
+        logement_data = logement.dict()
         
-        if exclude_id:
-            query = query.filter(Logement.id != exclude_id)
+        # Validation des règles métier
+        self._validate_business_rules(logement_data)
         
-        existing = query.first()
-        if existing:
-            raise LogementBusinessRuleError(
-                f"Un logement existe déjà à cette adresse: {adresse}, {ville}",
-                "duplicate_adresse"
-            )
+        # Calculer le montant total (loyer + charges)
+        logement_data['montant_total'] = logement_data['loyer'] + logement_data.get('montant_charges', 0.0)
+        if logement_data.get('statut') is None:
+            logement_data['statut'] = StatutLogement.DISPONIBLE
+        return logement_data
+    
+    def _insert_statement(self, logement_data: dict):
+        """INSERT ... ON CONFLICT DO NOTHING RETURNING du logement créé"""
+        return (
+            pg_insert(Logement)
+            .values(**logement_data)
+            .on_conflict_do_nothing(index_elements=self._adresse_conflict_target())
+            .returning(Logement)
+        )
+    
+    def _invalidate_cache(self, logement_id: Optional[int], statuts: Iterable[StatutLogement]) -> None:
+        """Invalider les lectures en cache touchées par une écriture commitée"""
+        self.cache.invalidate(*self.cache.keys_for_write(logement_id, statuts))
     
     def create_logement(self, db: Session, logement: LogementCreate) -> Logement:
-        """Créer un nouveau logement avec validations métier"""
+        """Créer un nouveau logement avec validations métier
+        
+        L'unicité de l'adresse est garantie par la base: l'INSERT ... ON CONFLICT
+        DO NOTHING ne renvoie aucune ligne si l'adresse existe déjà.
+        """
+        logement_data = self._prepare_logement_data(logement)
+        stmt = self._insert_statement(logement_data)
+        
         try:
-            logement_data = logement.dict()
-            
-            # Validation des règles métier
-            self._validate_business_rules(logement_data)
-            
-            # Vérification des doublons
-            self._check_duplicate_logement(db, logement_data['adresse'], logement_data['ville'])
-            
-            # Calculer le montant total (loyer + charges)
-            logement_data['montant_total'] = logement_data['loyer'] + logement_data.get('montant_charges', 0.0)
-            
-            db_logement = Logement(**logement_data)
-            db.add(db_logement)
-            db.commit()
-            db.refresh(db_logement)
-            return db_logement
-            
+            db_logement = db.scalars(stmt).first()
         except IntegrityError as e:
             db.rollback()
-            if "check_" in str(e):
-                raise LogementValidationError("Données invalides: contrainte de base de données violée")
-            raise LogementValidationError("Erreur d'intégrité des données")
+            raise self._integrity_error(e, logement_data['adresse'], logement_data['ville'])
+        
+        if db_logement is None:
+            db.rollback()
+            raise self._duplicate_error(logement_data['adresse'], logement_data['ville'])
+        
+        logement_id = db_logement.id
+        db.commit()
+        self._invalidate_cache(logement_id, [logement_data['statut']])
+        return db_logement
     
     def get_logement(self, db: Session, logement_id: int) -> Optional[Logement]:
         """Récupérer un logement par ID"""
         return db.query(Logement).filter(Logement.id == logement_id).first()
     
+    def _list_filters(
+        self,
+        statut: Optional[StatutLogement] = None,
+        ville: Optional[str] = None,
+        q: Optional[str] = None
+    ) -> List:
+        """Conditions WHERE communes aux listes de logements et à leur empreinte"""
+        filtres = []
+        
+        if statut:
+            filtres.append(Logement.statut == statut)
+        
+        if ville:
+            # ILIKE '%…%' servi par l'index trigramme ix_logements_ville_trgm
+            filtres.append(Logement.ville.ilike(contains_pattern(ville), escape=LIKE_ESCAPE))
+        
+        if q:
+            # Plein texte sur titre/description (ix_logements_search) ou
+            # correspondance partielle sur titre/adresse/ville (index trigrammes)
+            vector = logement_search_vector(Logement.titre, Logement.description)
+            motif = contains_pattern(q)
+            filtres.append(or_(
+                vector.op("@@")(func.websearch_to_tsquery(SEARCH_CONFIG, q)),
+                Logement.titre.ilike(motif, escape=LIKE_ESCAPE),
+                Logement.adresse.ilike(motif, escape=LIKE_ESCAPE),
+                Logement.ville.ilike(motif, escape=LIKE_ESCAPE)
+            ))
+        
+        return filtres
+    
+    def parse_fields(self, fields: Optional[str]) -> Optional[List[str]]:
+        """Champs demandés (fields=titre,ville ou fields=compact), None pour l'objet complet"""
+        if fields is None:
+            return None
+        if fields == "compact":
+            return list(self.CHAMPS_COMPACT)
+        
+        champs = list(dict.fromkeys(champ.strip() for champ in fields.split(",") if champ.strip()))
+        if not champs:
+            raise LogementValidationError("Aucun champ demandé", "fields")
+        inconnus = [champ for champ in champs if champ not in self.CHAMPS]
+        if inconnus:
+            raise LogementValidationError(
+                f"Champs inconnus: {', '.join(inconnus)}. Champs disponibles: {', '.join(self.CHAMPS)}",
+                "fields"
+            )
+        return champs
+    
+    def _project(self, rows: Sequence[Row], champs: List[str]) -> List[Dict]:
+        """Lignes partielles vers dictionnaires limités aux champs demandés"""
+        return [{champ: getattr(row, champ) for champ in champs} for row in rows]
+    
+    def _list_statement(
+        self,
+        statut: Optional[StatutLogement] = None,
+        ville: Optional[str] = None,
+        q: Optional[str] = None,
+        champs: Optional[List[str]] = None
+    ) -> Select:
+        """Construire la requête filtrée et triée commune aux listes de logements
+        
+        Avec `champs`, seules ces colonnes (et les clés de tri) sont lues: la
+        requête renvoie des lignes et non des objets Logement.
+        """
+        if champs:
+            colonnes = dict.fromkeys([*champs, *self.CHAMPS_TRI])
+            query = select(*(getattr(Logement, colonne) for colonne in colonnes))
+        else:
+            query = select(Logement)
+        query = query.where(*self._list_filters(statut, ville, q))
+        
+        tri = []
+        if q:
+            # Les résultats les plus pertinents d'abord
+            vector = logement_search_vector(Logement.titre, Logement.description)
+            tri.append(func.ts_rank(vector, func.websearch_to_tsquery(SEARCH_CONFIG, q)).desc())
+        
+        # Tri par date de modification/création (plus récent en premier),
+        # l'ID départage les égalités pour garantir un ordre total
+        return query.order_by(
+            *tri,
+            Logement.updated_at.desc().nulls_last(),
+            Logement.created_at.desc(),
+            Logement.id.desc()
+        )
+    
+    def _version_column(self):
+        """Version d'un logement: dernière modification, sinon création"""
+        return func.coalesce(Logement.updated_at, Logement.created_at)
+    
+    def _fingerprint_statement(
+        self,
+        statut: Optional[StatutLogement] = None,
+        ville: Optional[str] = None,
+        q: Optional[str] = None
+    ) -> Select:
+        version = self._version_column()
+        return select(
+            func.count(Logement.id),
+            func.max(version),
+            # Change aussi quand des transactions commitent dans le désordre
+            # (now() est l'heure de début de transaction)
+            func.sum(func.extract("epoch", version))
+        ).where(*self._list_filters(statut, ville, q))
+    
+    def _build_fingerprint(self, row: Row) -> Dict:
+        count, last_modified, checksum = row
+        return {
+            "count": count,
+            "last_modified": last_modified.isoformat() if last_modified else None,
+            "checksum": str(checksum) if checksum is not None else None
+        }
+    
+    def get_logements_fingerprint(
+        self,
+        db: Session,
+        statut: Optional[StatutLogement] = None,
+        ville: Optional[str] = None,
+        q: Optional[str] = None
+    ) -> Dict:
+        """Empreinte d'une liste filtrée (nombre, dernière modification, somme des versions)
+        
+        Une seule agrégation, sans charger ni sérialiser les lignes: toute
+        création, modification ou suppression dans l'ensemble la change.
+        """
+        return self._build_fingerprint(db.execute(self._fingerprint_statement(statut, ville, q)).one())
+    
+    def _version_statement(self, logement_id: int, for_update: bool = False) -> Select:
+        stmt = select(self._version_column()).where(Logement.id == logement_id)
+        if for_update:
+            stmt = stmt.with_for_update()
+        return stmt
+    
+    def get_logement_version(
+        self,
+        db: Session,
+        logement_id: int,
+        for_update: bool = False
+    ) -> Optional[datetime]:
+        """Version courante d'un logement (None s'il n'existe pas)
+        
+        Avec for_update, la ligne reste verrouillée jusqu'au commit de la
+        transaction: vérification de version et mise à jour sont atomiques.
+        """
+        return db.scalars(self._version_statement(logement_id, for_update)).first()
+    
     def get_logements(
         self, 
         db: Session, 
         skip: int = 0, 
         limit: int = 100,
         statut: Optional[StatutLogement] = None,
-        ville: Optional[str] = None
-    ) -> List[Logement]:
-        """Récupérer une liste de logements avec filtres optionnels"""
-        query = db.query(Logement)
+        ville: Optional[str] = None,
+        q: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> List:
+        """Récupérer une liste de logements avec filtres et recherche optionnels
         
-        if statut:
-            query = query.filter(Logement.statut == statut)
+        Avec `fields`, retourne des dictionnaires limités aux champs demandés.
+        """
+        champs = self.parse_fields(fields)
+        query = self._list_statement(statut=statut, ville=ville, q=q, champs=champs).offset(skip).limit(limit)
+        if champs:
+            return self._project(db.execute(query).all(), champs)
+        return db.scalars(query).all()
+    
+    def _encode_cursor(self, logement: Logement) -> str:
+        """Encoder la clé de tri du dernier logement d'une page en curseur opaque"""
+        payload = {
+            "u": logement.updated_at.isoformat() if logement.updated_at else None,
+            "c": logement.created_at.isoformat() if logement.created_at else None,
+            "i": logement.id
+        }
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+    
+    def _decode_cursor(self, cursor: str) -> Tuple[Optional[datetime], Optional[datetime], int]:
+        """Décoder un curseur opaque en clé de tri (updated_at, created_at, id)"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            updated_at = datetime.fromisoformat(payload["u"]) if payload["u"] else None
+            created_at = datetime.fromisoformat(payload["c"]) if payload["c"] else None
+            return updated_at, created_at, int(payload["i"])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise LogementValidationError("Curseur de pagination invalide", "cursor")
+    
+    def _apply_cursor(self, query: Select, cursor: str) -> Select:
+        """Restreindre la requête aux logements situés après le curseur dans l'ordre de tri"""
+        updated_at, created_at, logement_id = self._decode_cursor(cursor)
         
-        if ville:
-            query = query.filter(Logement.ville.ilike(f"%{ville}%"))
+        # Égalité sur updated_at/created_at puis départage par created_at et id
+        if created_at is None:
+            apres_created = and_(Logement.created_at.is_(None), Logement.id < logement_id)
+        else:
+            apres_created = or_(
+                Logement.created_at < created_at,
+                and_(Logement.created_at == created_at, Logement.id < logement_id)
+            )
         
-        # Tri par date de modification/création (plus récent en premier)
-        query = query.order_by(
-            Logement.updated_at.desc().nulls_last(),
-            Logement.created_at.desc()
-        )
+        if updated_at is None:
+            # Les logements jamais modifiés sont triés en dernier (NULLS LAST)
+            return query.where(Logement.updated_at.is_(None), apres_created)
+        
+        return query.where(or_(
+            Logement.updated_at < updated_at,
+            and_(Logement.updated_at == updated_at, apres_created),
+            Logement.updated_at.is_(None)
+        ))
+    
+    def _page_statement(
+        self,
+        limit: int,
+        statut: Optional[StatutLogement] = None,
+        ville: Optional[str] = None,
+        cursor: Optional[str] = None,
+        champs: Optional[List[str]] = None
+    ) -> Select:
+        query = self._list_statement(statut=statut, ville=ville, champs=champs)
+        
+        if cursor:
+            query = self._apply_cursor(query, cursor)
+        
+        # Un élément de plus pour savoir s'il existe une page suivante
+        return query.limit(limit + 1)
+    
+    def _split_page(
+        self,
+        logements: Sequence[Logement],
+        limit: int,
+        champs: Optional[List[str]] = None
+    ) -> Tuple[List, Optional[str]]:
+        """Séparer la page demandée du curseur de la page suivante"""
+        next_cursor = None
+        if len(logements) > limit:
+            logements = logements[:limit]
+            next_cursor = self._encode_cursor(logements[-1])
         
-        return query.offset(skip).limit(limit).all()
+        if champs:
+            return self._project(logements, champs), next_cursor
+        return list(logements), next_cursor
+    
+    def get_logements_page(
+        self,
+        db: Session,
+        limit: int = 100,
+        statut: Optional[StatutLogement] = None,
+        ville: Optional[str] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[str] = None
+    ) -> Tuple[List, Optional[str]]:
+        """Récupérer une page de logements par curseur (keyset pagination)
+        
+        Retourne la page et le curseur de la page suivante (None si dernière page).
+        Avec `fields`, la page contient des dictionnaires limités aux champs demandés.
+        """
+        champs = self.parse_fields(fields)
+        stmt = self._page_statement(limit, statut, ville, cursor, champs)
+        logements = db.execute(stmt).all() if champs else db.scalars(stmt).all()
+        return self._split_page(logements, limit, champs)
+    
+    def _apply_update(self, db_logement: Logement, logement_update: LogementUpdate) -> None:
+        """Valider et appliquer les champs fournis sur le logement"""
+        # Mise à jour des champs fournis
+        update_data = logement_update.dict(exclude_unset=True)
+        
+        if not update_data:
+            raise LogementValidationError("Aucune donnée fournie pour la mise à jour")
+        
+        # Créer un dictionnaire avec les nouvelles valeurs pour validation
+        validation_data = {
+            'loyer': update_data.get('loyer', db_logement.loyer),
+            'montant_charges': update_data.get('montant_charges', db_logement.montant_charges)
+        }
+        
+        # Validation des règles métier sur les nouvelles valeurs
+        self._validate_business_rules(validation_data)
+        
+        # Code postal au format du pays, l'un ou l'autre pouvant changer
+        if 'code_postal' in update_data or 'pays' in update_data:
+            try:
+                logement_validators.validate_code_postal(
+                    update_data.get('code_postal', db_logement.code_postal),
+                    update_data.get('pays', db_logement.pays)
+                )
+            except ValueError as e:
+                raise LogementValidationError(str(e), "code_postal")
+        
+        # Application des modifications
+        for field, value in update_data.items():
+            setattr(db_logement, field, value)
+        
+        # Recalculer le montant total si loyer ou charges ont changé
+        if 'loyer' in update_data or 'montant_charges' in update_data:
+            db_logement.montant_total = db_logement.loyer + db_logement.montant_charges
     
     def update_logement(
         self, 
@@ -147,44 +472,18 @@ class LogementService:
             if not db_logement:
                 raise LogementNotFoundError(logement_id)
             
-            # Mise à jour des champs fournis
-            update_data = logement_update.dict(exclude_unset=True)
-            
-            if not update_data:
-                raise LogementValidationError("Aucune donnée fournie pour la mise à jour")
-            
-            # Créer un dictionnaire avec les nouvelles valeurs pour validation
-            validation_data = {
-                'loyer': update_data.get('loyer', db_logement.loyer),
-                'montant_charges': update_data.get('montant_charges', db_logement.montant_charges)
-            }
-            
-            # Validation des règles métier sur les nouvelles valeurs
-            self._validate_business_rules(validation_data)
-            
-            # Vérification des doublons si adresse ou ville changée
-            if 'adresse' in update_data or 'ville' in update_data:
-                new_adresse = update_data.get('adresse', db_logement.adresse)
-                new_ville = update_data.get('ville', db_logement.ville)
-                self._check_duplicate_logement(db, new_adresse, new_ville, exclude_id=logement_id)
-            
-            # Application des modifications
-            for field, value in update_data.items():
-                setattr(db_logement, field, value)
-            
-            # Recalculer le montant total si loyer ou charges ont changé
-            if 'loyer' in update_data or 'montant_charges' in update_data:
-                db_logement.montant_total = db_logement.loyer + db_logement.montant_charges
+            ancien_statut = db_logement.statut
+            self._apply_update(db_logement, logement_update)
             
+            # Un doublon d'adresse est rejeté par l'index unique au commit
+            adresse, ville = db_logement.adresse, db_logement.ville
             db.commit()
-            db.refresh(db_logement)
+            self._invalidate_cache(logement_id, [ancien_statut, db_logement.statut])
             return db_logement
             
         except IntegrityError as e:
             db.rollback()
-            if "check_" in str(e):
-                raise LogementValidationError("Données invalides: contrainte de base de données violée")
-            raise LogementValidationError("Erreur d'intégrité des données")
+            raise self._integrity_error(e, adresse, ville)
     
     def delete_logement(self, db: Session, logement_id: int) -> bool:
         """Supprimer un logement"""
@@ -192,8 +491,10 @@ class LogementService:
         if not db_logement:
             return False
         
+        statut = db_logement.statut
         db.delete(db_logement)
         db.commit()
+        self._invalidate_cache(logement_id, [statut])
         return True
     
     def get_logements_disponibles(self, db: Session) -> List[Logement]:
@@ -204,6 +505,13 @@ class LogementService:
         """Valider les règles de changement de statut"""
         current_statut = db_logement.statut
         
+        # Pas de changement si même statut
+        if current_statut == nouveau_statut:
+            raise LogementBusinessRuleError(
+                f"Le logement est déjà dans le statut {nouveau_statut.value}",
+                "statut_identique"
+            )
+        
         # Règle: certaines transitions interdites
         transitions_interdites = {
             StatutLogement.OCCUPE: [StatutLogement.DISPONIBLE],  # Un logement occupé ne peut pas devenir disponible directement
@@ -238,34 +546,100 @@ class LogementService:
         if not db_logement:
             raise LogementNotFoundError(logement_id)
         
-        # Pas de changement si même statut
-        if db_logement.statut == nouveau_statut:
-            raise LogementBusinessRuleError(
-                f"Le logement est déjà dans le statut {nouveau_statut.value}",
-                "statut_identique"
-            )
-        
         # Validation des règles de changement de statut
         self._validate_statut_change(db_logement, nouveau_statut)
         
+        ancien_statut = db_logement.statut
         db_logement.statut = nouveau_statut
         db.commit()
-        db.refresh(db_logement)
+        self._invalidate_cache(logement_id, [ancien_statut, nouveau_statut])
         return db_logement
     
-    def get_stats_logements(self, db: Session) -> dict:
-        """Obtenir les statistiques des logements"""
-        total = db.query(Logement).count()
-        disponibles = db.query(Logement).filter(Logement.statut == StatutLogement.DISPONIBLE).count()
-        occupes = db.query(Logement).filter(Logement.statut == StatutLogement.OCCUPE).count()
-        maintenance = db.query(Logement).filter(Logement.statut == StatutLogement.MAINTENANCE).count()
-        
-        return {
-            "total": total,
-            "disponibles": disponibles,
-            "occupes": occupes,
-            "maintenance": maintenance
+    # Masques renvoyés par grouping(statut, ville, pays) pour chaque ensemble de regroupement
+    GROUPE_STATUT = 0b011
+    GROUPE_VILLE = 0b101
+    GROUPE_PAYS = 0b110
+    GROUPE_TOTAL = 0b111
+    
+    def _stats_statement(self):
+        """Requête d'agrégation unique: total, par statut, par ville et par pays"""
+        return select(
+            func.grouping(Logement.statut, Logement.ville, Logement.pays).label("groupe"),
+            Logement.statut,
+            Logement.ville,
+            Logement.pays,
+            func.count(Logement.id).label("total"),
+            func.avg(Logement.loyer).label("loyer_moyen"),
+            func.min(Logement.loyer).label("loyer_min"),
+            func.max(Logement.loyer).label("loyer_max"),
+            func.avg(Logement.montant_total).label("montant_total_moyen"),
+            func.min(Logement.montant_total).label("montant_total_min"),
+            func.max(Logement.montant_total).label("montant_total_max"),
+        ).group_by(func.grouping_sets(
+            tuple_(Logement.statut),
+            tuple_(Logement.ville),
+            tuple_(Logement.pays),
+            tuple_()
+        ))
+    
+    @staticmethod
+    def _arrondir(valeur: Optional[float]) -> Optional[float]:
+        return round(float(valeur), 2) if valeur is not None else None
+    
+    def _build_stats(self, rows: Sequence[Row]) -> Dict:
+        """Mettre en forme les lignes de l'agrégation en statistiques"""
+        stats = {
+            "total": 0,
+            "disponibles": 0,
+            "occupes": 0,
+            "maintenance": 0,
+            "loyer": {"moyen": None, "min": None, "max": None},
+            "montant_total": {"moyen": None, "min": None, "max": None},
+            "par_ville": [],
+            "par_pays": []
         }
+        cles_statut = {
+            StatutLogement.DISPONIBLE: "disponibles",
+            StatutLogement.OCCUPE: "occupes",
+            StatutLogement.MAINTENANCE: "maintenance"
+        }
+        
+        for row in rows:
+            if row.groupe == self.GROUPE_TOTAL:
+                stats["total"] = row.total
+                stats["loyer"] = {
+                    "moyen": self._arrondir(row.loyer_moyen),
+                    "min": row.loyer_min,
+                    "max": row.loyer_max
+                }
+                stats["montant_total"] = {
+                    "moyen": self._arrondir(row.montant_total_moyen),
+                    "min": row.montant_total_min,
+                    "max": row.montant_total_max
+                }
+            elif row.groupe == self.GROUPE_STATUT:
+                stats[cles_statut[row.statut]] = row.total
+            elif row.groupe == self.GROUPE_VILLE:
+                stats["par_ville"].append({
+                    "ville": row.ville,
+                    "total": row.total,
+                    "loyer_moyen": self._arrondir(row.loyer_moyen)
+                })
+            elif row.groupe == self.GROUPE_PAYS:
+                stats["par_pays"].append({
+                    "pays": row.pays,
+                    "total": row.total,
+                    "loyer_moyen": self._arrondir(row.loyer_moyen)
+                })
+        
+        stats["par_ville"].sort(key=lambda item: (-item["total"], item["ville"]))
+        stats["par_pays"].sort(key=lambda item: (-item["total"], item["pays"]))
+        return stats
+    
+    def get_stats_logements(self, db: Session) -> dict:
+        """Obtenir les statistiques des logements en un seul aller-retour"""
+        rows = db.execute(self._stats_statement()).all()
+        return self._build_stats(rows)
 
 # Instance globale du service
 logement_service = LogementService()
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""QR codes de vérification des souscriptions (images PNG/SVG servies par l'API)
+
+Les demandes arrivant ensemble (page listant des attestations, rafale de
+téléchargements) sont regroupées en lots rendus dans un pool de processus:
+le calcul de la matrice (qrcode) et l'encodage PNG sont liés au CPU et ne
+doivent pas bloquer la boucle d'événements. Les images sont gardées en
+mémoire par référence, en nombre borné (LRU).
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import asyncio
+import hashlib
+import multiprocessing
+import os
+from app.documents.qr import render_qr_batch
+from app.services.cache_backends import MemoryCacheBackend
+from app.services.organisation_service import organisation_service, OrganisationService
+
+# Images gardées en mémoire (par worker de l'API)
+QR_CACHE_MAX_SIZE = int(os.getenv("QR_CACHE_MAX_SIZE", "2048"))
+# Processus de rendu, taille maximale d'un lot, attente pour compléter un lot (secondes)
+QR_WORKER_PROCESSES = int(os.getenv("QR_WORKER_PROCESSES", "2"))
+QR_BATCH_SIZE = int(os.getenv("QR_BATCH_SIZE", "64"))
+QR_BATCH_DELAY = float(os.getenv("QR_BATCH_DELAY", "0.005"))
+# Pixels par module du QR code
+QR_MODULE_SIZE = int(os.getenv("QR_MODULE_SIZE", "8"))
+# Durée de cache HTTP des images: le QR code d'une référence ne change pas
+QR_HTTP_MAX_AGE = int(os.getenv("QR_HTTP_MAX_AGE", "31536000"))
+
+class QRImage(NamedTuple):
+    """Image rendue et son ETag (empreinte du contenu)"""
+    contenu: bytes
+    etag: str
+
+class QRCodeService:
+    """Rendu par lots et cache LRU des QR codes de vérification"""
+
+    MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+    def __init__(
+        self,
+        organisation: OrganisationService = organisation_service,
+        processes: int = QR_WORKER_PROCESSES,
+        batch_size: int = QR_BATCH_SIZE,
+        batch_delay: float = QR_BATCH_DELAY,
+        module: int = QR_MODULE_SIZE,
+        max_size: int = QR_CACHE_MAX_SIZE,
+        executor: Optional[Executor] = None
+    ):
+        self.organisation = organisation
+        self.processes = processes
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.module = module
+        # Pas d'expiration: seule la taille borne le cache
+        self.cache = MemoryCacheBackend(max_size)
+        self._executor = executor
+        self._pending: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    @property
+    def executor(self) -> Executor:
+        # spawn: pas de fork d'un processus avec threads et connexions ouvertes
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    @staticmethod
+    def cache_key(reference: str, format: str) -> str:
+        return f"{format}:{reference}"
+
+    def cached(self, reference: str, format: str) -> Optional[QRImage]:
+        """Image déjà rendue, None s'il faut la générer"""
+        image = self.cache.get(self.cache_key(reference, format))
+        if image is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return image
+
+    async def get(self, reference: str, format: str = "png") -> QRImage:
+        """Image du QR code d'une référence, rendue dans le prochain lot si absente"""
+        image = self.cache.get(self.cache_key(reference, format))
+        if image is not None:
+            return image
+        loop = asyncio.get_running_loop()
+        future = self._pending.get((format, reference))
+        if future is None:
+            # Même référence demandée deux fois avant le rendu: un seul calcul
+            future = loop.create_future()
+            self._pending[(format, reference)] = future
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+        # Requête annulée (client parti): le rendu continue pour les autres
+        return await asyncio.shield(future)
+
+    async def get_many(self, references: Iterable[str], format: str = "png") -> Dict[str, QRImage]:
+        """Images de plusieurs références (lots de batch_size)"""
+        references = list(dict.fromkeys(references))
+        images = await asyncio.gather(*(self.get(reference, format) for reference in references))
+        return dict(zip(references, images))
+
+    def _flush(self) -> None:
+        """Envoyer les demandes en attente au pool, un lot par format"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        lots: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        for (format, reference), future in pending.items():
+            lots.setdefault(format, []).append((reference, future))
+        for format, demandes in lots.items():
+            for i in range(0, len(demandes), self.batch_size):
+                task = asyncio.get_running_loop().create_task(
+                    self._render_batch(format, demandes[i:i + self.batch_size])
+                )
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _render_batch(self, format: str, demandes: List[Tuple[str, asyncio.Future]]) -> None:
+        urls = [self.organisation.generate_qr_code_url(reference) for reference, _ in demandes]
+        loop = asyncio.get_running_loop()
+        self.batches += 1
+        try:
+            contenus = await loop.run_in_executor(self.executor, render_qr_batch, format, urls, self.module)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # Processus du pool tué: pool recréé au lot suivant
+                self._executor = None
+            for _, future in demandes:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (reference, future), contenu in zip(demandes, contenus):
+            image = QRImage(contenu, f'"{hashlib.sha1(contenu).hexdigest()}"')
+            self.cache.set(self.cache_key(reference, format), image, float("inf"))
+            if not future.done():
+                future.set_result(image)
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, int]:
+        return {**self.cache.stats(), "hits": self.hits, "misses": self.misses, "batches": self.batches}
+
+# Instance globale (pool de processus créé au premier rendu)
+qr_service = QRCodeService()
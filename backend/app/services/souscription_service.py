@@ -0,0 +1,90 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import List, Tuple
+from app.models.souscription import Souscription, StatutSouscription
+from app.models.document_job import DocumentJob, TypeDocument
+from app.services.document_job_service import document_job_service, DocumentJobService
+from app.services.verification_service import verification_service, AttestationVerificationService
+from app.exceptions.souscription_exceptions import SouscriptionNotFoundError, SouscriptionStatutError
+
+class SouscriptionService:
+    """Service métier pour les souscriptions"""
+    
+    # Cycle de vie: paiement, remise des documents, clôture
+    TRANSITIONS = {
+        StatutSouscription.ATTENTE_PAIEMENT: {StatutSouscription.PAYE, StatutSouscription.CLOTURE},
+        StatutSouscription.PAYE: {StatutSouscription.LIVRE, StatutSouscription.CLOTURE},
+        StatutSouscription.LIVRE: {StatutSouscription.CLOTURE},
+        StatutSouscription.CLOTURE: set(),
+    }
+    
+    # Documents générés au paiement
+    DOCUMENTS_PAIEMENT = (TypeDocument.PROFORMA, TypeDocument.ATTESTATION)
+    
+    def __init__(
+        self,
+        documents: DocumentJobService = document_job_service,
+        verification: AttestationVerificationService = verification_service
+    ):
+        self.documents = documents
+        self.verification = verification
+    
+    def get_souscription(self, db: Session, souscription_id: int) -> Souscription:
+        souscription = db.get(Souscription, souscription_id)
+        if souscription is None:
+            raise SouscriptionNotFoundError(souscription_id)
+        return souscription
+    
+    def get_by_reference(self, db: Session, reference: str) -> Souscription:
+        souscription = db.scalars(select(Souscription).where(Souscription.reference == reference)).first()
+        if souscription is None:
+            raise SouscriptionNotFoundError(reference)
+        return souscription
+    
+    def changer_statut(
+        self,
+        db: Session,
+        souscription_id: int,
+        nouveau_statut: StatutSouscription
+    ) -> Tuple[Souscription, List[DocumentJob]]:
+        """Changer le statut d'une souscription
+        
+        Le passage à PAYE met en file la proforma et l'attestation dans la même
+        transaction; le rendu est fait par les workers de documents.
+        """
+        souscription = self.get_souscription(db, souscription_id)
+        statut_actuel = souscription.statut or StatutSouscription.ATTENTE_PAIEMENT
+        
+        if nouveau_statut != statut_actuel and nouveau_statut not in self.TRANSITIONS[statut_actuel]:
+            raise SouscriptionStatutError(
+                f"Transition de {statut_actuel.value} vers {nouveau_statut.value} non autorisée",
+                statut_actuel.value,
+                nouveau_statut.value
+            )
+        
+        souscription.statut = nouveau_statut
+        db.flush()
+        jobs = []
+        if nouveau_statut == StatutSouscription.PAYE:
+            jobs = self.documents.enqueue(db, [souscription.id], self.DOCUMENTS_PAIEMENT)
+        db.commit()
+        # Attestation délivrée ou annulée: résultat de vérification à relire
+        self.verification.invalidate(souscription.reference)
+        return souscription, jobs
+    
+    def generer_documents(self, db: Session, souscription_id: int) -> List[DocumentJob]:
+        """(Re)mettre en file les documents d'une souscription payée"""
+        souscription = self.get_souscription(db, souscription_id)
+        if souscription.statut not in self.documents.STATUTS_DOCUMENTS:
+            statut = (souscription.statut or StatutSouscription.ATTENTE_PAIEMENT).value
+            raise SouscriptionStatutError(
+                "Documents disponibles uniquement pour une souscription payée",
+                statut,
+                StatutSouscription.PAYE.value
+            )
+        jobs = self.documents.enqueue(db, [souscription.id], self.DOCUMENTS_PAIEMENT)
+        db.commit()
+        return jobs
+
+# Instance globale du service
+souscription_service = SouscriptionService()
@@ -0,0 +1,283 @@
+"""Vérification publique des attestations (QR code scanné par un tiers)
+
+Trafic public, non authentifié et en rafales (ambassades, universités): une
+vérification ne doit atteindre la base que pour une référence inconnue du
+processus. Trois niveaux, du moins au plus coûteux:
+
+1. cache positif: statut et date d'expiration des références déjà vues;
+2. cache négatif et filtre de Bloom des références existantes: une référence
+   inventée (balayage aléatoire) est rejetée sans requête;
+3. base (réplique de lecture): une requête sur l'index unique de la référence.
+
+Le filtre est chargé au premier appel puis complété par les nouvelles
+souscriptions (id croissant) au plus une fois par VERIFICATION_BLOOM_REFRESH
+secondes, quel que soit le volume de références inconnues. Une référence
+dont le statut vient de changer dans ce processus (invalidate) est lue sur le
+primaire pendant le retard de réplication, sans cache négatif ni filtre.
+"""
+from calendar import monthrange
+from datetime import date
+from typing import Callable, Dict, NamedTuple, Optional
+import os
+import re
+import threading
+import time
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.souscription import Souscription, StatutSouscription
+from app.schemas.verification import StatutVerification
+from app.services.cache_backends import BloomFilter, MemoryCacheBackend
+from app.services.organisation_service import organisation_service, OrganisationService
+from app.exceptions.souscription_exceptions import AttestationNotFoundError
+
+# Durée de vie des résultats connus et des références inconnues (secondes)
+VERIFICATION_CACHE_TTL = float(os.getenv("VERIFICATION_CACHE_TTL", "300"))
+VERIFICATION_NEGATIVE_TTL = float(os.getenv("VERIFICATION_NEGATIVE_TTL", "60"))
+VERIFICATION_CACHE_MAX_SIZE = int(os.getenv("VERIFICATION_CACHE_MAX_SIZE", "10000"))
+# Filtre de Bloom: capacité initiale (doublée si dépassée), taux de faux positifs
+VERIFICATION_BLOOM_CAPACITY = int(os.getenv("VERIFICATION_BLOOM_CAPACITY", "100000"))
+VERIFICATION_BLOOM_ERROR_RATE = float(os.getenv("VERIFICATION_BLOOM_ERROR_RATE", "0.001"))
+# Intervalle minimum entre deux lectures des nouvelles références (secondes)
+VERIFICATION_BLOOM_REFRESH = float(os.getenv("VERIFICATION_BLOOM_REFRESH", "5"))
+# Lectures sur le primaire après un changement de statut (retard de réplication)
+VERIFICATION_PRIMARY_WINDOW = float(os.getenv("DATABASE_READ_STICKY_SECONDS", "10"))
+# Cache HTTP des réponses (secondes), absorbé par les proxys et CDN
+VERIFICATION_HTTP_MAX_AGE = int(os.getenv("VERIFICATION_HTTP_MAX_AGE", "60"))
+
+# Statuts de souscription pour lesquels une attestation a été délivrée
+STATUTS_DELIVRES = (StatutSouscription.PAYE, StatutSouscription.LIVRE, StatutSouscription.CLOTURE)
+
+def date_expiration(date_entree: date, duree_location: int) -> date:
+    """Fin de l'hébergement: date d'entrée + durée en mois (jour borné à la fin du mois)"""
+    mois = date_entree.month - 1 + duree_location
+    annee, mois = date_entree.year + mois // 12, mois % 12 + 1
+    return date_entree.replace(year=annee, month=mois, day=min(date_entree.day, monthrange(annee, mois)[1]))
+
+class Verification(NamedTuple):
+    """Données d'une attestation délivrée, indépendantes du jour de la vérification"""
+    reference: str
+    statut_souscription: StatutSouscription
+    date_expiration: date
+
+    def statut(self, today: Optional[date] = None) -> StatutVerification:
+        if self.statut_souscription == StatutSouscription.CLOTURE:
+            return StatutVerification.ANNULEE
+        if (today or date.today()) > self.date_expiration:
+            return StatutVerification.EXPIREE
+        return StatutVerification.VALIDE
+
+    def to_dict(self, today: Optional[date] = None) -> Dict[str, str]:
+        return {
+            "reference": self.reference,
+            "statut": self.statut(today).value,
+            "date_expiration": self.date_expiration.isoformat()
+        }
+
+# Marqueur du cache négatif (None signifie "absent du cache")
+_INCONNUE = "inconnue"
+
+class AttestationVerificationService:
+    """Vérification des attestations par référence, sans base pour les lectures répétées"""
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        primary_session_factory: Optional[Callable[[], Session]] = None,
+        organisation: OrganisationService = organisation_service,
+        ttl: float = VERIFICATION_CACHE_TTL,
+        negative_ttl: float = VERIFICATION_NEGATIVE_TTL,
+        max_size: int = VERIFICATION_CACHE_MAX_SIZE,
+        bloom_capacity: int = VERIFICATION_BLOOM_CAPACITY,
+        bloom_error_rate: float = VERIFICATION_BLOOM_ERROR_RATE,
+        bloom_refresh: float = VERIFICATION_BLOOM_REFRESH,
+        primary_window: float = VERIFICATION_PRIMARY_WINDOW,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._session_factory = session_factory
+        # Une seule base fournie (tests): elle sert aussi de primaire
+        self._primary_session_factory = primary_session_factory or session_factory
+        self.organisation = organisation
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.cache = MemoryCacheBackend(max_size, clock)
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.bloom_refresh = bloom_refresh
+        self.primary_window = primary_window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._verrous = [threading.Lock() for _ in range(64)]
+        self._bloom: Optional[BloomFilter] = None
+        self._dernier_id = 0
+        self._dernier_chargement: Optional[float] = None
+        self._format: Optional[re.Pattern] = None
+        # Références invalidées -> fin de la lecture sur le primaire
+        self._modifiees: Dict[str, float] = {}
+        # Origine des réponses: le trafic servi sans base est la somme des trois premières
+        self.positive_hits = 0
+        self.negative_hits = 0
+        self.bloom_rejections = 0
+        self.database_lookups = 0
+        self.bloom_loads = 0
+
+    @property
+    def session_factory(self) -> Callable[[], Session]:
+        # Réplique de lecture, sauf juste après un changement de statut (primary_session_factory)
+        if self._session_factory is None:
+            from app.database import ReadSessionLocal
+            self._session_factory = ReadSessionLocal
+        return self._session_factory
+
+    @property
+    def primary_session_factory(self) -> Callable[[], Session]:
+        if self._primary_session_factory is None:
+            from app.database import SessionLocal
+            self._primary_session_factory = SessionLocal
+        return self._primary_session_factory
+
+    def _modifiee(self, reference: str) -> bool:
+        """Statut changé récemment: la réplique peut encore servir l'ancien"""
+        fin = self._modifiees.get(reference)
+        return fin is not None and self._clock() < fin
+
+    def _format_valide(self, reference: str) -> bool:
+        """Forme d'une référence générée (ATT- puis majuscules et chiffres)"""
+        if self._format is None:
+            prefixe = self.organisation.get_documents_config().get("reference_prefix", "ATT-")
+            self._format = re.compile(re.escape(prefixe) + r"[A-Z0-9]{4,60}")
+        return self._format.fullmatch(reference) is not None
+
+    def _charger(self, db: Session) -> None:
+        """Compléter le filtre avec les souscriptions créées depuis le dernier chargement"""
+        bloom, dernier_id = self._bloom, self._dernier_id
+        if bloom is None or bloom.full:
+            # (Re)construction complète, avec de la marge pour les prochaines souscriptions
+            total = db.scalar(select(func.count(Souscription.id))) or 0
+            self.bloom_capacity = max(self.bloom_capacity, 2 * total)
+            bloom, dernier_id = BloomFilter(self.bloom_capacity, self.bloom_error_rate), 0
+        lignes = db.execute(
+            select(Souscription.id, Souscription.reference)
+            .where(Souscription.id > dernier_id)
+            .order_by(Souscription.id)
+            .execution_options(yield_per=10000)
+        )
+        for souscription_id, reference in lignes:
+            bloom.add(reference)
+            dernier_id = souscription_id
+        # Filtre publié une fois rempli: les lectures sans verrou ne voient pas de filtre partiel
+        self._bloom, self._dernier_id = bloom, dernier_id
+        self._dernier_chargement = self._clock()
+        self.bloom_loads += 1
+
+    def _peut_exister(self, db: Session, reference: str) -> bool:
+        """Filtre de Bloom, rechargé si la référence est absente et le filtre ancien"""
+        with self._lock:
+            if self._bloom is None:
+                self._charger(db)
+            elif reference not in self._bloom and self._clock() - self._dernier_chargement >= self.bloom_refresh:
+                # Souscription créée depuis le dernier chargement
+                self._charger(db)
+            return reference in self._bloom
+
+    def _bloom_rejette(self, reference: str) -> bool:
+        """Rejet sans base ni verrou: filtre chargé, récent, et référence absente"""
+        bloom, chargement = self._bloom, self._dernier_chargement
+        return (
+            bloom is not None
+            and self._clock() - chargement < self.bloom_refresh
+            and reference not in bloom
+        )
+
+    def cached(self, reference: str) -> Optional[Verification]:
+        """Résultat sans accès à la base; None si la base doit être consultée
+
+        Lève AttestationNotFoundError pour une référence connue comme inexistante.
+        """
+        if not self._format_valide(reference):
+            self.negative_hits += 1
+            raise AttestationNotFoundError(reference)
+        resultat = self.cache.get(reference)
+        if resultat == _INCONNUE:
+            self.negative_hits += 1
+            raise AttestationNotFoundError(reference)
+        if resultat is not None:
+            self.positive_hits += 1
+            return resultat
+        if self._bloom_rejette(reference) and not self._modifiee(reference):
+            self.bloom_rejections += 1
+            raise AttestationNotFoundError(reference)
+        return None
+
+    def verify(self, reference: str) -> Verification:
+        """Vérifier une attestation (cache, filtre de Bloom, puis base)"""
+        resultat = self.cached(reference)
+        if resultat is not None:
+            return resultat
+        # Rafale sur une même référence absente du cache: une seule lecture en base
+        with self._verrous[hash(reference) % len(self._verrous)]:
+            resultat = self.cache.get(reference)
+            if resultat == _INCONNUE:
+                self.negative_hits += 1
+                raise AttestationNotFoundError(reference)
+            if resultat is not None:
+                self.positive_hits += 1
+                return resultat
+            return self._lire(reference)
+
+    def _lire(self, reference: str) -> Verification:
+        primaire = self._modifiee(reference)
+        with (self.primary_session_factory if primaire else self.session_factory)() as db:
+            if not primaire and not self._peut_exister(db, reference):
+                self.bloom_rejections += 1
+                self._mettre_en_cache(reference, _INCONNUE, self.negative_ttl, primaire)
+                raise AttestationNotFoundError(reference)
+            self.database_lookups += 1
+            ligne = db.execute(
+                select(Souscription.statut, Souscription.date_entree, Souscription.duree_location)
+                .where(Souscription.reference == reference)
+            ).first()
+        if ligne is None or ligne.statut not in STATUTS_DELIVRES:
+            # Faux positif du filtre, ou attestation pas encore délivrée
+            self._mettre_en_cache(reference, _INCONNUE, self.negative_ttl, primaire)
+            raise AttestationNotFoundError(reference)
+        resultat = Verification(reference, ligne.statut, date_expiration(ligne.date_entree, ligne.duree_location))
+        self._mettre_en_cache(reference, resultat, self.ttl, primaire)
+        return resultat
+
+    def _mettre_en_cache(self, reference: str, resultat, ttl: float, primaire: bool) -> None:
+        # Lecture sur la réplique pendant laquelle le statut a changé: peut-être périmée
+        if primaire or not self._modifiee(reference):
+            self.cache.set(reference, resultat, ttl)
+
+    def invalidate(self, reference: str) -> None:
+        """Statut modifié dans ce processus (les autres workers attendent l'expiration)
+
+        La référence est ensuite lue sur le primaire pendant primary_window
+        secondes: la réplique peut encore servir l'ancien statut.
+        """
+        maintenant = self._clock()
+        with self._lock:
+            self._modifiees = {r: fin for r, fin in self._modifiees.items() if fin > maintenant}
+            self._modifiees[reference] = maintenant + self.primary_window
+        self.cache.delete(reference)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.cache.clear()
+            self._bloom = None
+            self._dernier_id = 0
+            self._modifiees = {}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            **self.cache.stats(),
+            "positive_hits": self.positive_hits,
+            "negative_hits": self.negative_hits,
+            "bloom_rejections": self.bloom_rejections,
+            "database_lookups": self.database_lookups,
+            "bloom_loads": self.bloom_loads,
+            "bloom_count": self._bloom.count if self._bloom is not None else 0
+        }
+
+# Instance globale du service
+verification_service = AttestationVerificationService()
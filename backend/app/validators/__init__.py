@@ -0,0 +1 @@
+# Règles de validation partagées entre schémas Pydantic et modèles SQLAlchemy
@@ -0,0 +1,104 @@
+import re
+from types import MappingProxyType
+from typing import Optional
+
+# Règles communes au schéma LogementBase et au modèle Logement. Les motifs
+# sont compilés une fois à l'import et les tables sont figées.
+
+VILLE_PATTERN = re.compile(r"[a-zA-ZÀ-ÿ\s\-']+")
+
+_CINQ_CHIFFRES = re.compile(r"\d{5}")
+_QUATRE_CHIFFRES = re.compile(r"\d{4}")
+_CANADA = re.compile(r"[A-Za-z]\d[A-Za-z] \d[A-Za-z]\d")
+_USA = re.compile(r"\d{5}(-\d{4})?")
+
+# Format du code postal par pays supporté (clé: nom du pays en minuscules)
+CODES_POSTAUX = MappingProxyType({
+    "france": _CINQ_CHIFFRES,
+    "belgique": _QUATRE_CHIFFRES,
+    "suisse": _QUATRE_CHIFFRES,
+    "luxembourg": _QUATRE_CHIFFRES,
+    "canada": _CANADA,
+    "usa": _USA,
+    "etats-unis": _USA,
+    "allemagne": _CINQ_CHIFFRES,
+    "italie": _CINQ_CHIFFRES,
+    "espagne": _CINQ_CHIFFRES,
+})
+
+PAYS_VALIDES = frozenset(CODES_POSTAUX)
+_PAYS_MESSAGE = f"Pays non supporté. Pays valides: {', '.join(sorted(PAYS_VALIDES))}"
+
+# Pays inconnu à ce stade (validation champ par champ): n'importe quel format supporté
+CODE_POSTAL_PATTERN = re.compile("|".join(
+    f"(?:{pattern.pattern})" for pattern in dict.fromkeys(CODES_POSTAUX.values())
+))
+
+def validate_titre(titre: str) -> str:
+    if not titre or not titre.strip():
+        raise ValueError("Le titre ne peut pas être vide")
+    titre = titre.strip()
+    if len(titre) < 3:
+        raise ValueError("Le titre doit contenir au moins 3 caractères")
+    if len(titre) > 200:
+        raise ValueError("Le titre ne peut pas dépasser 200 caractères")
+    return titre
+
+def validate_adresse(adresse: str) -> str:
+    if not adresse or not adresse.strip():
+        raise ValueError("L'adresse ne peut pas être vide")
+    adresse = adresse.strip()
+    if len(adresse) < 5:
+        raise ValueError("L'adresse doit contenir au moins 5 caractères")
+    return adresse
+
+def validate_ville(ville: str) -> str:
+    if not ville or not ville.strip():
+        raise ValueError("La ville ne peut pas être vide")
+    ville = ville.strip()
+    if len(ville) < 2:
+        raise ValueError("La ville doit contenir au moins 2 caractères")
+    # Uniquement lettres, espaces, tirets et apostrophes
+    if not VILLE_PATTERN.fullmatch(ville):
+        raise ValueError("La ville ne doit contenir que des lettres, espaces, tirets et apostrophes")
+    return ville.title()
+
+def validate_code_postal(code_postal: str, pays: Optional[str] = None) -> str:
+    """Code postal normalisé (majuscules)
+
+    Avec `pays`, seul le format de ce pays est testé; sans pays (ou pays
+    inconnu), tout format supporté est accepté.
+    """
+    if not code_postal or not code_postal.strip():
+        raise ValueError("Le code postal ne peut pas être vide")
+    code_postal = code_postal.strip()
+
+    pattern = CODES_POSTAUX.get(pays.strip().lower()) if pays else None
+    if not (pattern or CODE_POSTAL_PATTERN).fullmatch(code_postal):
+        if pattern:
+            raise ValueError(f"Format de code postal invalide pour le pays: {pays.strip()}")
+        raise ValueError("Format de code postal invalide")
+    return code_postal.upper()
+
+def validate_pays(pays: Optional[str]) -> str:
+    if not pays or not pays.strip():
+        return "France"  # Valeur par défaut
+    if pays.strip().lower() not in PAYS_VALIDES:
+        raise ValueError(_PAYS_MESSAGE)
+    return pays.strip().title()
+
+def validate_loyer(loyer: float) -> float:
+    if loyer is None or loyer <= 0:
+        raise ValueError("Le loyer doit être supérieur à 0")
+    if loyer > 50000:  # Limite raisonnable pour éviter les erreurs de saisie
+        raise ValueError("Le loyer semble anormalement élevé (max 50 000€)")
+    return round(float(loyer), 2)
+
+def validate_montant_charges(montant_charges: Optional[float]) -> float:
+    if montant_charges is None:
+        return 0.0
+    if montant_charges < 0:
+        raise ValueError("Le montant des charges ne peut pas être négatif")
+    if montant_charges > 10000:  # Limite raisonnable
+        raise ValueError("Le montant des charges semble anormalement élevé (max 10 000€)")
+    return round(float(montant_charges), 2)
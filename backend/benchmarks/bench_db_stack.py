@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark requêtes/seconde des routes logements: pile synchrone vs asyncpg
+
+Lance l'API deux fois (DATABASE_ASYNC=false puis true) sur la base définie
+par DATABASE_URL et mesure le débit sous charge concurrente:
+
+    python benchmarks/bench_db_stack.py --concurrency 200 --duration 15
+
+Avec --url, mesure une API déjà démarrée au lieu de la lancer.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+
+PATHS = ["/api/logements/?limit=20", "/api/logements/disponibles", "/api/logements/stats"]
+
+async def worker(client: httpx.AsyncClient, deadline: float, latencies: list, errors: list) -> None:
+    i = 0
+    while time.perf_counter() < deadline:
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+async def run_load(url: str, concurrency: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        # Préchauffage (connexions, pool, caches du planificateur)
+        await asyncio.gather(*(client.get(path) for path in PATHS))
+
+        latencies, errors = [], []
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(worker(client, deadline, latencies, errors) for _ in range(concurrency)))
+
+    latencies.sort()
+    return {
+        "requetes": len(latencies),
+        "erreurs": len(errors),
+        "req_par_s": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0,
+    }
+
+def wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{url}/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"L'API ne répond pas sur {url}")
+
+def bench_stack(async_mode: bool, port: int, workers: int, concurrency: int, duration: float) -> dict:
+    env = dict(os.environ, DATABASE_ASYNC="true" if async_mode else "false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+        cwd=os.path.join(os.path.dirname(__file__), ".."),
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_ready(url)
+        return asyncio.run(run_load(url, concurrency, duration))
+    finally:
+        server.terminate()
+        server.wait()
+
+def print_result(label: str, result: dict) -> None:
+    print(
+        f"{label:<10} {result['req_par_s']:>9.1f} req/s   p50 {result['p50_ms']:>7.1f} ms   "
+        f"p95 {result['p95_ms']:>7.1f} ms   ({result['requetes']} requêtes, {result['erreurs']} erreurs)"
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="API déjà démarrée à mesurer (sinon lance sync puis async)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="Workers uvicorn")
+    parser.add_argument("--concurrency", type=int, default=100, help="Clients simultanés")
+    parser.add_argument("--duration", type=float, default=10.0, help="Durée de la mesure en secondes")
+    args = parser.parse_args()
+
+    if args.url:
+        print_result("api", asyncio.run(run_load(args.url, args.concurrency, args.duration)))
+        return
+
+    sync_result = bench_stack(False, args.port, args.workers, args.concurrency, args.duration)
+    print_result("sync", sync_result)
+    async_result = bench_stack(True, args.port, args.workers, args.concurrency, args.duration)
+    print_result("asyncpg", async_result)
+    if sync_result["req_par_s"]:
+        print(f"Gain: x{async_result['req_par_s'] / sync_result['req_par_s']:.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark du rendu des attestations PDF
+
+Rend N attestations (références et QR codes distincts, logo et cachet PNG
+générés dans un répertoire temporaire) et compare:
+
+- rendu direct: en-tête, préambule, images (drawImage) et QR code
+  (QrCodeWidget) retracés et réencodés pour chaque document, comme la
+  première version des workers de documents
+- gabarits: app/documents/renderers.py (couches statiques construites une
+  fois par processus, images encodées une fois, QR tracé en un chemin)
+
+    python benchmarks/bench_documents.py --documents 200
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PIL import Image, ImageDraw
+from reportlab.graphics import renderPDF
+from reportlab.graphics.barcode.qr import QrCodeWidget
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+
+from app.services.organisation_service import organisation_service
+
+LARGEUR, HAUTEUR = A4
+MARGE = 20 * mm
+
+def make_images(directory: str) -> None:
+    for nom, taille in (("logo-boaz-housing.png", (600, 300)), ("cachet-signature-boaz.png", (500, 500))):
+        image = Image.new("RGBA", taille, (255, 255, 255, 0))
+        ImageDraw.Draw(image).ellipse((10, 10, taille[0] - 10, taille[1] - 10), outline=(31, 78, 121, 255), width=16)
+        image.save(os.path.join(directory, nom))
+
+def make_payloads(count: int):
+    return [
+        {
+            "reference": f"ATT-BENCH{i:07d}",
+            "date_emission": "01/09/2024",
+            "qr_code_url": organisation_service.generate_qr_code_url(f"ATT-BENCH{i:07d}"),
+            "organisation": organisation_service.get_organisation_info(),
+            "ceo": organisation_service.get_ceo_info(),
+            "client": {
+                "nom_complet": f"Étudiant {i}", "date_naissance": "12/05/2001", "ville_naissance": "Dakar",
+                "pays_naissance": "Sénégal", "email": f"etudiant{i}@example.com", "telephone": "+33600000000",
+                "etablissement": "Université Paris-Saclay", "niveau_etude": "Master 1",
+            },
+            "logement": {
+                "titre": "Studio", "adresse": f"{i} rue des Mazières", "ville": "Évry", "code_postal": "91000",
+                "pays": "France", "loyer": 550.0, "montant_charges": 50.0, "montant_total": 600.0,
+            },
+            "souscription": {"date_entree": "01/09/2024", "duree_location": 12, "statut": "paye"},
+        }
+        for i in range(count)
+    ]
+
+def direct(data: dict, static_dir: str) -> bytes:
+    """Rendu d'origine: tout est tracé et encodé à chaque document"""
+    organisation, ceo, client, logement = data["organisation"], data["ceo"], data["client"], data["logement"]
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    y = HAUTEUR - MARGE
+    c.drawImage(os.path.join(static_dir, "logo-boaz-housing.png"), LARGEUR - MARGE - 30 * mm, y - 20, 30 * mm, 15 * mm, mask="auto")
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(MARGE, y, organisation["nom"])
+    c.setFont("Helvetica", 9)
+    for ligne in (organisation["adresse_siege"], organisation["telephone"], organisation["numero_rcs"]):
+        y -= 12
+        c.drawString(MARGE, y, ligne)
+    y -= 40
+    for texte in (
+        f"Je soussigné {ceo['nom_complet']}, né le {ceo['date_naissance']} à {ceo['ville_naissance']}, atteste que:",
+        f"{client['nom_complet']}, né(e) le {client['date_naissance']} à {client['ville_naissance']},",
+        f"est hébergé(e) au {logement['adresse']}, {logement['code_postal']} {logement['ville']}.",
+    ):
+        c.setFont("Helvetica", 11)
+        for ligne in simpleSplit(texte, "Helvetica", 11, LARGEUR - 2 * MARGE):
+            c.drawString(MARGE, y, ligne)
+            y -= 15
+    c.drawImage(os.path.join(static_dir, "cachet-signature-boaz.png"), LARGEUR - MARGE - 70 * mm, y - 50 * mm, 40 * mm, 40 * mm, mask="auto")
+    widget = QrCodeWidget(data["qr_code_url"])
+    x0, y0, x1, y1 = widget.getBounds()
+    dessin = Drawing(30 * mm, 30 * mm, transform=[30 * mm / (x1 - x0), 0, 0, 30 * mm / (y1 - y0), 0, 0])
+    dessin.add(widget)
+    renderPDF.draw(dessin, c, MARGE, MARGE)
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+def measure(render, payloads) -> float:
+    start = time.perf_counter()
+    for data in payloads:
+        render(data)
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as static_dir:
+        make_images(static_dir)
+        os.environ["DOCUMENTS_STATIC_DIR"] = static_dir
+        from app.documents import render_attestation
+        from app.documents.layers import static_path
+
+        # Les deux rendus doivent inclure logo et cachet pour être comparables
+        organisation = organisation_service.get_organisation_info()
+        for cle in ("logo_path", "cachet_signature_path"):
+            assert static_path(organisation.get(cle)), f"image introuvable: {organisation.get(cle)}"
+
+        payloads = make_payloads(args.documents)
+        start = time.perf_counter()
+        render_attestation(payloads[0])
+        print(f"construction des gabarits: {(time.perf_counter() - start) * 1000:.1f} ms (une fois par processus)")
+
+        print(f"{'rendu':<10} {'total (ms)':>11} {'par PDF (ms)':>13} {'PDF/s':>8}")
+        for name, render in (("direct", lambda data: direct(data, static_dir)), ("gabarits", render_attestation)):
+            elapsed = measure(render, payloads)
+            print(f"{name:<10} {elapsed * 1000:>11.1f} {elapsed / args.documents * 1000:>13.2f} {args.documents / elapsed:>8.0f}")
+
+if __name__ == "__main__":
+    main()
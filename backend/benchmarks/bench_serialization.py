@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark du coût de sérialisation par logement (listes de 1000 éléments)
+
+Compare, sans base ni serveur, trois chemins pour rendre une liste d'objets
+ORM Logement en JSON:
+
+- fastapi: ce que fait response_model=List[LogementResponse] (validation
+  from_attributes, dump mode json, json.dumps de JSONResponse)
+- typeadapter: TypeAdapter(List[LogementResponse]) validé puis dump_json
+- direct: serialize_logement (lecture des attributs) rendu par orjson
+
+    python benchmarks/bench_serialization.py --items 1000 --repeat 20
+
+Les trois sorties sont vérifiées identiques avant la mesure.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+from app.models.logement import Logement, StatutLogement
+from app.routers.responses import ORJSONResponse
+from app.schemas.logement import LogementResponse, serialize_logement
+
+adapter = TypeAdapter(List[LogementResponse])
+
+def make_logements(count: int) -> List[Logement]:
+    origin = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    statuts = list(StatutLogement)
+    return [
+        Logement(
+            id=i,
+            titre=f"Appartement lumineux n°{i}",
+            description="Proche des transports et des commerces, entièrement rénové.",
+            adresse=f"{i} rue de la République",
+            ville="Lyon",
+            code_postal="69002",
+            pays="France",
+            loyer=650.0 + i % 300,
+            montant_charges=80.0,
+            montant_total=730.0 + i % 300,
+            statut=statuts[i % len(statuts)],
+            created_at=origin + timedelta(minutes=i),
+            updated_at=origin + timedelta(minutes=i, seconds=30, microseconds=i) if i % 2 else None
+        )
+        for i in range(1, count + 1)
+    ]
+
+def render_fastapi(logements) -> bytes:
+    content = adapter.dump_python(adapter.validate_python(logements, from_attributes=True), mode="json")
+    return JSONResponse(content).body
+
+def render_typeadapter(logements) -> bytes:
+    return adapter.dump_json(adapter.validate_python(logements, from_attributes=True))
+
+def render_direct(logements) -> bytes:
+    return ORJSONResponse([serialize_logement(l) for l in logements]).body
+
+RENDERERS = {"fastapi": render_fastapi, "typeadapter": render_typeadapter, "direct": render_direct}
+
+def measure(render, logements, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(logements)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logements = make_logements(args.items)
+    reference = json.loads(render_fastapi(logements))
+    for name, render in RENDERERS.items():
+        if json.loads(render(logements)) != reference:
+            sys.exit(f"Sortie {name} différente de response_model")
+
+    baseline = None
+    print(f"{'chemin':<12} {'page (ms)':>10} {'par élément (µs)':>17} {'gain':>6}")
+    for name, render in RENDERERS.items():
+        page = measure(render, logements, args.repeat)
+        baseline = baseline or page
+        print(f"{name:<12} {page * 1000:>10.2f} {page / args.items * 1e6:>17.2f} {baseline / page:>5.1f}x")
+
+if __name__ == "__main__":
+    main()
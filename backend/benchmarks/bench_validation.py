@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark des validations de logement sur un import en masse
+
+Valide N lignes (pays et formats variés, comme un CSV passé à
+POST /logements/bulk) et compare:
+
+- anciennes règles: re.match sur motifs littéraux, tables de codes postaux et
+  de pays reconstruites à chaque appel (copie de l'implémentation d'origine)
+- règles partagées: app/validators/logement_validators.py (motifs compilés,
+  tables figées, seul le format du pays testé)
+- LogementCreate complet, tel que l'utilise l'import
+
+    python benchmarks/bench_validation.py --rows 50000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.schemas.logement import LogementCreate
+from app.validators import logement_validators
+
+PAYS = [("Paris", "75011", "France"), ("Bruxelles", "1050", "Belgique"), ("Montréal", "H2X 1Y4", "Canada"),
+        ("New York", "10001-1234", "USA"), ("Genève", "1201", "Suisse"), ("Berlin", "10115", "Allemagne")]
+
+def make_rows(count: int):
+    return [
+        {
+            "titre": f"Appartement n°{i}",
+            "adresse": f"{i} avenue Centrale",
+            "ville": PAYS[i % len(PAYS)][0],
+            "code_postal": PAYS[i % len(PAYS)][1],
+            "pays": PAYS[i % len(PAYS)][2],
+            "loyer": 700.0 + i % 500,
+            "montant_charges": 60.0
+        }
+        for i in range(count)
+    ]
+
+def legacy_rules(row: dict) -> None:
+    """Règles d'origine de LogementBase (ville, code postal, pays)"""
+    ville = row["ville"].strip()
+    if not re.match(r"^[a-zA-ZÀ-ÿ\s\-']+$", ville):
+        raise ValueError("ville")
+    patterns = [r'^\d{5}$', r'^\d{4}$', r'^[A-Za-z]\d[A-Za-z] \d[A-Za-z]\d$', r'^\d{5}(-\d{4})?$']
+    if not any(re.match(pattern, row["code_postal"].strip()) for pattern in patterns):
+        raise ValueError("code_postal")
+    pays_valides = {
+        'france', 'belgique', 'suisse', 'luxembourg', 'canada',
+        'usa', 'etats-unis', 'allemagne', 'italie', 'espagne'
+    }
+    if row["pays"].strip().lower() not in pays_valides:
+        raise ValueError("pays")
+
+def shared_rules(row: dict) -> None:
+    logement_validators.validate_ville(row["ville"])
+    pays = logement_validators.validate_pays(row["pays"])
+    logement_validators.validate_code_postal(row["code_postal"], pays)
+
+def schema(row: dict) -> None:
+    LogementCreate(**row)
+
+def measure(validate, rows) -> float:
+    start = time.perf_counter()
+    for row in rows:
+        validate(row)
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{'validation':<20} {'total (ms)':>11} {'par ligne (µs)':>15} {'lignes/s':>10}")
+    for name, validate in (("anciennes règles", legacy_rules), ("règles partagées", shared_rules), ("LogementCreate", schema)):
+        elapsed = measure(validate, rows)
+        print(f"{name:<20} {elapsed * 1000:>11.1f} {elapsed / args.rows * 1e6:>15.2f} {args.rows / elapsed:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -19,11 +19,9 @@ def test_create_logement_valid():
     service = LogementService()
     db_mock = MagicMock()
     
-    # Mock pour éviter la duplication
-    db_mock.query.return_value.filter.return_value.first.return_value = None
-    db_mock.add = MagicMock()
+    # Mock de l'INSERT ... ON CONFLICT ... RETURNING (ligne insérée)
+    db_mock.scalars.return_value.first.return_value = MagicMock()
     db_mock.commit = MagicMock()
-    db_mock.refresh = MagicMock()
     
     logement_data = LogementCreate(
         titre="Appartement T2 lumineux",
@@ -39,7 +37,7 @@ def test_create_logement_valid():
     result = service.create_logement(db_mock, logement_data)
     
     # Vérifications
-    db_mock.add.assert_called_once()
+    db_mock.scalars.assert_called_once()
     db_mock.commit.assert_called_once()
     print("✅ Test création logement valide: PASSED")
 
@@ -67,7 +65,6 @@ def test_create_logement_charges_trop_elevees():
     """Test création avec charges supérieures à 80% du loyer"""
     service = LogementService()
     db_mock = MagicMock()
-    db_mock.query.return_value.filter.return_value.first.return_value = None
     
     logement_data = LogementCreate(
         titre="Appartement T2",
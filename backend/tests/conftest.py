@@ -0,0 +1,26 @@
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+
+@pytest.fixture
+def count_queries():
+    """Requêtes SQL émises sur un moteur pendant un bloc
+
+        with count_queries(engine) as statements:
+            client.put(...)
+        assert len(statements) == 2
+    """
+    @contextmanager
+    def counter(engine):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return counter
@@ -0,0 +1,165 @@
+import time
+from redis.exceptions import ConnectionError as RedisConnectionError
+from app.services.cache_backends import (
+    FakeRedis,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    RedisInvalidationChannel
+)
+from app.services.logement_cache import LogementCache
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def make_worker(server):
+    """Cache d'un worker: stockage en mémoire, invalidations par Redis pub/sub"""
+    cache = LogementCache(
+        ttl=60,
+        max_size=100,
+        backend=MemoryCacheBackend(100),
+        channel=RedisInvalidationChannel(FakeRedis(server))
+    )
+    cache.start()
+    return cache
+
+def test_redis_backend_partage_entre_workers():
+    """Test stockage Redis: une valeur mise en cache par un worker est lue par l'autre"""
+    client = FakeRedis()
+    worker_a = LogementCache(ttl=60, backend=RedisCacheBackend(client))
+    worker_b = LogementCache(ttl=60, backend=RedisCacheBackend(FakeRedis(client.server)))
+
+    worker_a.set("stats", {"total": 3})
+
+    assert worker_b.get("stats") == {"total": 3}
+    worker_b.invalidate("stats")
+    assert worker_a.get("stats") is None
+
+def test_redis_backend_expiration():
+    """Test TTL transmis à Redis (PX)"""
+    now = [0.0]
+    client = FakeRedis(clock=lambda: now[0])
+    backend = RedisCacheBackend(client)
+
+    backend.set("logement:1", {"id": 1}, ttl=5)
+    assert backend.get("logement:1") == {"id": 1}
+    now[0] = 6
+    assert backend.get("logement:1") is None
+
+def test_invalidation_diffusee_aux_autres_workers():
+    """Test pub/sub: une écriture sur un worker invalide le cache mémoire des autres"""
+    server = FakeRedis().server
+    worker_a = make_worker(server)
+    worker_b = make_worker(server)
+    try:
+        worker_a.set("disponibles", [{"id": 1}])
+        worker_b.set("disponibles", [{"id": 1}])
+
+        worker_a.invalidate("disponibles", "stats")
+
+        assert worker_a.get("disponibles") is None
+        assert wait_until(lambda: worker_b.backend.get("disponibles") is None)
+        assert worker_b.stats()["remote_invalidations"] == 1
+        # Le worker émetteur ignore son propre message
+        assert worker_a.stats()["remote_invalidations"] == 0
+    finally:
+        worker_a.stop()
+        worker_b.stop()
+
+def test_invalidation_distante_incremente_generation():
+    """Test une lecture en cours sur un autre worker n'écrase pas l'invalidation"""
+    server = FakeRedis().server
+    worker_a = make_worker(server)
+    worker_b = make_worker(server)
+    try:
+        generation = worker_b.generation
+        worker_a.invalidate("stats")
+        assert wait_until(lambda: worker_b.generation != generation)
+
+        worker_b.set("stats", {"total": 0}, generation)
+        assert worker_b.get("stats") is None
+    finally:
+        worker_a.stop()
+        worker_b.stop()
+
+class FailingRedis(FakeRedis):
+    """Client Redis en panne: chaque commande lève une erreur de connexion"""
+
+    def __init__(self, server=None):
+        super().__init__(server)
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise RedisConnectionError("Redis indisponible")
+
+    def get(self, key):
+        self._check()
+        return super().get(key)
+
+    def set(self, key, value, px=None):
+        self._check()
+        return super().set(key, value, px)
+
+    def delete(self, *keys):
+        self._check()
+        return super().delete(*keys)
+
+    def scan_iter(self, match="*"):
+        self._check()
+        return super().scan_iter(match)
+
+def test_redis_backend_en_panne():
+    """Test Redis indisponible: miss, écriture ignorée, clé non supprimée plus servie"""
+    client = FailingRedis()
+    cache = LogementCache(ttl=60, backend=RedisCacheBackend(client))
+    cache.set("stats", {"total": 3})
+
+    client.down = True
+    assert cache.get("stats") is None
+    cache.set("logement:1", {"id": 1})
+    cache.invalidate("stats")
+    cache.clear()
+    assert cache.backend.stats() == {"errors": 4, "stale_keys": 1}
+
+    client.down = False
+    # Valeur restée dans Redis après l'échec de la suppression: jamais relue
+    assert client.get("logements:stats") is not None
+    assert cache.get("stats") is None
+    cache.set("stats", {"total": 4})
+    assert cache.get("stats") == {"total": 4}
+    assert cache.backend.stats()["stale_keys"] == 0
+
+def test_reconnexion_canal_redis():
+    """Test coupure Redis: l'écoute reprend et le cache local, peut-être périmé, est vidé"""
+    client = FakeRedis()
+    worker_a = make_worker(client.server)
+    worker_b = LogementCache(
+        ttl=60,
+        max_size=100,
+        backend=MemoryCacheBackend(100),
+        channel=RedisInvalidationChannel(FakeRedis(client.server), reconnect_delay=0.01)
+    )
+    worker_b.start()
+    try:
+        assert wait_until(lambda: client.server["subscribers"].get("logements:invalidation"))
+        worker_b.set("disponibles", [{"id": 1}])
+        generation = worker_b.generation
+
+        client.disconnect_subscribers()
+
+        assert wait_until(lambda: worker_b.stats()["reconnections"] == 1)
+        # Invalidations diffusées pendant la coupure perdues: cache vidé
+        assert worker_b.get("disponibles") is None
+        assert worker_b.generation != generation
+
+        worker_b.set("stats", {"total": 1})
+        worker_a.invalidate("stats")
+        assert wait_until(lambda: worker_b.backend.get("stats") is None)
+    finally:
+        worker_a.stop()
+        worker_b.stop()
@@ -0,0 +1,126 @@
+import gzip
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+from app.middleware.compression import CompressionMiddleware, negotiate_encoding
+from app.models.logement import Logement, StatutLogement
+from app.routers.responses import ORJSONResponse
+from app.schemas.logement import serialize_logement
+
+def make_page(count):
+    origin = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        serialize_logement(Logement(
+            id=i,
+            titre=f"Appartement T{i % 5 + 1} n°{i}",
+            description="Proche des transports et des commerces, entièrement rénové.",
+            adresse=f"{i} rue de la République",
+            ville=("Paris", "Lyon", "Marseille")[i % 3],
+            code_postal="69002",
+            pays="France",
+            loyer=650.0 + i % 300,
+            montant_charges=80.0,
+            montant_total=730.0 + i % 300,
+            statut=StatutLogement.DISPONIBLE,
+            created_at=origin + timedelta(minutes=i)
+        ))
+        for i in range(1, count + 1)
+    ]
+
+PAGE = make_page(1000)
+RAW_SIZE = len(ORJSONResponse(PAGE).body)
+
+def make_client(**options):
+    app = FastAPI()
+
+    @app.get("/logements")
+    def logements(limit: int = 1000):
+        return ORJSONResponse(PAGE[:limit], headers={"ETag": '"v1"'})
+
+    @app.get("/attestation.pdf")
+    def attestation():
+        return Response(b"%PDF-1.4" + b"0" * 10_000, media_type="application/pdf")
+
+    @app.get("/export.csv")
+    def export():
+        lines = (f"{l['id']};{l['titre']};{l['ville']};{l['loyer']}\n" for l in PAGE)
+        return StreamingResponse(lines, media_type="text/csv")
+
+    @app.get("/deja-compresse")
+    def deja_compresse():
+        return PlainTextResponse(gzip.compress(b"a" * 5000), headers={"Content-Encoding": "gzip"})
+
+    app.add_middleware(CompressionMiddleware, **options)
+    return TestClient(app)
+
+def test_negociation_accept_encoding():
+    """Test choix de l'encodage: q-values, refus explicite, joker et préférence serveur"""
+    assert negotiate_encoding("gzip, deflate, br", ["br", "gzip"]) == "br"
+    assert negotiate_encoding("br;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("br;q=0, *", ["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("identity", ["br", "gzip"]) is None
+    assert negotiate_encoding("", ["br", "gzip"]) is None
+
+@pytest.mark.parametrize("encoding, budget", [("gzip", 0.08), ("br", 0.05)])
+def test_liste_1000_logements_dans_le_budget(encoding, budget):
+    """Test page de 1000 logements compressée sous le budget de taille, contenu intact"""
+    if encoding == "br":
+        pytest.importorskip("brotli")
+    response = make_client().get("/logements", headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == '"v1"'
+    assert int(response.headers["content-length"]) < RAW_SIZE * budget
+    assert response.json() == PAGE
+
+def test_petite_reponse_non_compressee():
+    """Test réponse sous le seuil envoyée telle quelle"""
+    response = make_client(minimum_size=1024).get("/logements?limit=1", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.json() == PAGE[:1]
+
+def test_client_sans_accept_encoding():
+    """Test client sans Accept-Encoding: réponse identique, non compressée"""
+    response = make_client().get("/logements", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) == RAW_SIZE
+
+def test_pdf_jamais_compresse():
+    """Test PDF exclu, même ajouté à la liste des types autorisés"""
+    client = make_client(content_types=["application/json", "application/pdf"])
+    response = client.get("/attestation.pdf", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+    assert response.content.startswith(b"%PDF")
+
+def test_reponse_deja_encodee_non_recompressee():
+    """Test Content-Encoding existant respecté"""
+    response = make_client().get("/deja-compresse", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "a" * 5000
+
+def test_export_en_flux_compresse():
+    """Test export CSV en flux: compressé morceau par morceau, sans Content-Length"""
+    client = make_client()
+    with client.stream("GET", "/export.csv", headers={"Accept-Encoding": "gzip"}) as response:
+        text = response.read().decode()
+        downloaded = response.num_bytes_downloaded
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert text.count("\n") == len(PAGE)
+    assert downloaded < len(text.encode()) * 0.5
+
+def test_compression_desactivee():
+    """Test COMPRESSION_ENCODINGS vide: aucune compression"""
+    response = make_client(encodings=[]).get("/logements", headers={"Accept-Encoding": "gzip, br"})
+
+    assert "content-encoding" not in response.headers
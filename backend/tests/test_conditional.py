@@ -0,0 +1,136 @@
+import pytest
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from starlette.requests import Request
+from starlette.responses import Response
+from app.routers import conditional
+from app.schemas.logement import LogementResponse
+
+VERSION = datetime(2024, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc)
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    })
+
+def test_resource_etag_identique_apres_serialisation_json():
+    """Test ETag calculé depuis l'ORM ou depuis la réponse JSON en cache: même valeur"""
+    payload = LogementResponse(
+        id=1, titre="Studio", adresse="1 rue du Test", ville="Paris", code_postal="75001",
+        loyer=500.0, montant_total=500.0, created_at=VERSION
+    ).model_dump(mode="json")
+
+    assert conditional.resource_etag(1, conditional.parse_version(payload["created_at"])) == \
+        conditional.resource_etag(1, VERSION)
+    assert conditional.resource_etag(1, VERSION) != conditional.resource_etag(2, VERSION)
+
+def test_collection_etag_depend_des_parametres():
+    """Test ETag de liste: empreinte et paramètres de page"""
+    fingerprint = {"count": 3, "last_modified": VERSION.isoformat(), "checksum": "1.5"}
+
+    assert conditional.collection_etag(fingerprint, limit=10) == conditional.collection_etag(fingerprint, limit=10)
+    assert conditional.collection_etag(fingerprint, limit=10) != conditional.collection_etag(fingerprint, limit=20)
+    assert conditional.collection_etag(fingerprint, limit=10) != \
+        conditional.collection_etag({**fingerprint, "count": 2}, limit=10)
+
+def test_if_none_match():
+    """Test If-None-Match: liste d'ETags, ETag faible et joker"""
+    etag = conditional.resource_etag(1, VERSION)
+
+    assert conditional.is_not_modified(make_request(if_none_match=etag), etag, VERSION)
+    assert conditional.is_not_modified(make_request(if_none_match=f'"autre", W/{etag}'), etag, VERSION)
+    assert conditional.is_not_modified(make_request(if_none_match="*"), etag, VERSION)
+    assert not conditional.is_not_modified(make_request(if_none_match='"autre"'), etag, VERSION)
+
+def test_if_modified_since():
+    """Test If-Modified-Since à la seconde près, ignoré si If-None-Match est présent"""
+    etag = conditional.resource_etag(1, VERSION)
+
+    assert conditional.is_not_modified(make_request(if_modified_since="Fri, 01 Mar 2024 09:30:15 GMT"), etag, VERSION)
+    assert not conditional.is_not_modified(make_request(if_modified_since="Fri, 01 Mar 2024 09:30:14 GMT"), etag, VERSION)
+    assert not conditional.is_not_modified(make_request(if_modified_since="date invalide"), etag, VERSION)
+    assert not conditional.is_not_modified(
+        make_request(if_none_match='"autre"', if_modified_since="Fri, 01 Mar 2024 10:00:00 GMT"), etag, VERSION
+    )
+
+def test_not_modified_pose_les_validateurs():
+    """Test réponse 304 ou validateurs ajoutés à la réponse 200"""
+    etag = conditional.resource_etag(1, VERSION)
+
+    response = Response()
+    assert conditional.not_modified(make_request(), response, etag, VERSION) is None
+    assert response.headers["etag"] == etag
+    assert response.headers["last-modified"] == "Fri, 01 Mar 2024 09:30:15 GMT"
+
+    not_modified = conditional.not_modified(make_request(if_none_match=etag), Response(), etag, VERSION)
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+def test_if_match():
+    """Test concurrence optimiste: 412 si la version a changé, comparaison forte"""
+    etag = conditional.resource_etag(1, VERSION)
+
+    conditional.check_if_match(make_request(), etag)
+    conditional.check_if_match(make_request(if_match=etag), etag)
+    conditional.check_if_match(make_request(if_match="*"), etag)
+    for header in ('"autre"', f"W/{etag}"):
+        with pytest.raises(HTTPException) as exc_info:
+            conditional.check_if_match(make_request(if_match=header), etag)
+        assert exc_info.value.status_code == 412
+
+def test_page_etag():
+    """Test ETag de page: versions des lignes et paramètres, sans empreinte de l'ensemble"""
+    versions = [(1, "2024-01-02", "2024-01-01")]
+
+    assert conditional.page_etag(versions, limit=10, next_cursor="abc") == conditional.page_etag(versions, limit=10, next_cursor="abc")
+    assert conditional.page_etag(versions, limit=10) != conditional.page_etag([(1, "2024-01-03", "2024-01-01")], limit=10)
+    assert conditional.page_etag(versions, limit=10, next_cursor="abc") != conditional.page_etag(versions, limit=10, next_cursor=None)
+
+def test_liste_sans_agregation(monkeypatch):
+    """Test liste: ETag sur les versions de la page, 304 sans lire ni rendre la page"""
+    from unittest.mock import AsyncMock, MagicMock
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.routers import logements
+
+    lignes = [
+        {"id": 2, "titre": "Studio", "updated_at": "2024-01-02", "created_at": "2024-01-01"},
+        {"id": 1, "titre": "T2", "updated_at": "2024-01-01", "created_at": "2024-01-01"},
+    ]
+    demandes = []
+
+    async def get_logements_page(db, limit, statut, ville, cursor, fields):
+        demandes.append(fields)
+        champs = fields.split(",")
+        return [{champ: ligne[champ] for champ in champs} for ligne in lignes], "curseur"
+
+    fake = MagicMock()
+    fake.get_logements_page = AsyncMock(side_effect=get_logements_page)
+    fake.get_logements_fingerprint = AsyncMock(side_effect=AssertionError("agrégation inattendue"))
+    monkeypatch.setattr(logements, "service", fake)
+    app.dependency_overrides[logements.get_read_session] = lambda: MagicMock()
+    try:
+        client = TestClient(app)
+        response = client.get("/api/logements/?fields=id,titre")
+        assert response.status_code == 200
+        assert response.json() == [{"id": 2, "titre": "Studio"}, {"id": 1, "titre": "T2"}]
+        assert response.headers["x-next-cursor"] == "curseur"
+        assert "last-modified" not in response.headers
+
+        demandes.clear()
+        revalidation = client.get("/api/logements/?fields=id,titre", headers={"If-None-Match": response.headers["etag"]})
+        assert revalidation.status_code == 304
+        assert revalidation.headers["x-next-cursor"] == "curseur"
+        assert revalidation.headers["etag"] == response.headers["etag"]
+        # Seules les colonnes de version sont lues pour revalider
+        assert demandes == [logements.VERSION_FIELDS]
+
+        lignes[0]["updated_at"] = "2024-01-03"
+        assert client.get(
+            "/api/logements/?fields=id,titre", headers={"If-None-Match": response.headers["etag"]}
+        ).status_code == 200
+    finally:
+        app.dependency_overrides.pop(logements.get_read_session)
@@ -0,0 +1,193 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+from app.documents import render_document, render_proforma, render_attestation
+from app.documents.store import DocumentStore
+from app.documents.worker import DocumentWorker
+from app.exceptions.souscription_exceptions import SouscriptionStatutError
+from app.models import Client, DocumentJob, Logement, Souscription
+from app.models.document_job import StatutJob, TypeDocument
+from app.models.logement import StatutLogement
+from app.models.souscription import StatutSouscription
+from app.services.document_job_service import DocumentJobService
+from app.services.organisation_service import organisation_service
+from app.services.souscription_service import SouscriptionService
+
+PAYLOAD = {
+    "reference": "ATT-TEST00000001",
+    "date_emission": "01/09/2024",
+    "qr_code_url": "http://localhost:3000/verify/ATT-TEST00000001",
+    "organisation": organisation_service.get_organisation_info(),
+    "ceo": organisation_service.get_ceo_info(),
+    "client": {
+        "nom_complet": "Awa Diallo", "date_naissance": "12/05/2001", "ville_naissance": "Dakar",
+        "pays_naissance": "Sénégal", "email": "awa@example.com", "telephone": "+33600000000",
+        "etablissement": "Université Paris-Saclay", "niveau_etude": "Master 1",
+    },
+    "logement": {
+        "titre": "Studio Évry", "adresse": "3 rue des Mazières", "ville": "Évry", "code_postal": "91000",
+        "pays": "France", "loyer": 550.0, "montant_charges": 50.0, "montant_total": 600.0,
+    },
+    "souscription": {"date_entree": "01/09/2024", "duree_location": 12, "statut": "paye"},
+}
+
+def test_rendu_pdf():
+    """Test rendu: proforma et attestation sont des PDF complets"""
+    for contenu in (render_proforma(PAYLOAD), render_attestation(PAYLOAD)):
+        assert contenu.startswith(b"%PDF-")
+        assert contenu.rstrip().endswith(b"%%EOF")
+
+    assert render_document("proforma", PAYLOAD).startswith(b"%PDF-")
+    with pytest.raises(ValueError, match="inconnu"):
+        render_document("facture", PAYLOAD)
+
+def test_claim_skip_locked():
+    """Test réservation: un seul UPDATE ... RETURNING sur un lot verrouillé en SKIP LOCKED"""
+    sql = str(DocumentJobService().claim_statement(10).compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("UPDATE document_jobs SET statut=")
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "ORDER BY document_jobs.disponible_a, document_jobs.id" in sql
+    assert "RETURNING document_jobs.id" in sql
+
+def test_enqueue_idempotent():
+    """Test mise en file: ON CONFLICT sur l'index partiel, jobs actifs existants renvoyés"""
+    service = DocumentJobService()
+    db = MagicMock()
+    nouveau = DocumentJob(id=2, souscription_id=1, type_document=TypeDocument.ATTESTATION)
+    existant = DocumentJob(id=1, souscription_id=1, type_document=TypeDocument.PROFORMA)
+    db.scalars.side_effect = [MagicMock(all=lambda: [nouveau]), [existant]]
+
+    jobs = service.enqueue(db, [1])
+
+    assert [job.id for job in jobs] == [1, 2]
+    sql = str(db.scalars.call_args_list[0][0][0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (souscription_id, type_document) WHERE statut IN ('EN_ATTENTE', 'EN_COURS') DO NOTHING" in sql
+    db.commit.assert_not_called()
+
+def test_enqueue_sans_conflit_une_requete():
+    service = DocumentJobService()
+    db = MagicMock()
+    jobs = [DocumentJob(id=i, souscription_id=i, type_document=TypeDocument.PROFORMA) for i in (1, 2)]
+    db.scalars.return_value.all.return_value = jobs
+
+    assert service.enqueue(db, [1, 2], [TypeDocument.PROFORMA]) == jobs
+    assert db.scalars.call_count == 1
+
+def test_reprises_backoff_puis_echec():
+    """Test reprises: délai doublé à chaque tentative, échec après max_tentatives"""
+    service = DocumentJobService(retry_delay=10)
+    db = MagicMock()
+
+    assert service.retry_delay_for(1).total_seconds() == 10
+    assert service.retry_delay_for(3).total_seconds() == 40
+
+    job = DocumentJob(id=1, tentatives=1, max_tentatives=3)
+    assert service.fail(db, job, "boom") == StatutJob.EN_ATTENTE
+    job.tentatives = 3
+    assert service.fail(db, job, "boom") == StatutJob.ECHEC
+    assert db.commit.call_count == 2
+
+def test_paiement_met_documents_en_file():
+    """Test PAYE: proforma et attestation mises en file dans la transaction du statut"""
+    documents = MagicMock()
+    documents.enqueue.return_value = ["job"]
+    verification = MagicMock()
+    service = SouscriptionService(documents, verification)
+    db = MagicMock()
+    souscription = Souscription(id=7, statut=StatutSouscription.ATTENTE_PAIEMENT, reference="ATT-TEST00000007")
+    db.get.return_value = souscription
+
+    _, jobs = service.changer_statut(db, 7, StatutSouscription.PAYE)
+
+    assert jobs == ["job"]
+    assert souscription.statut == StatutSouscription.PAYE
+    documents.enqueue.assert_called_once_with(db, [7], (TypeDocument.PROFORMA, TypeDocument.ATTESTATION))
+    db.commit.assert_called_once()
+    verification.invalidate.assert_called_once_with("ATT-TEST00000007")
+
+def test_transition_interdite():
+    service = SouscriptionService(MagicMock())
+    db = MagicMock()
+    db.get.return_value = Souscription(id=7, statut=StatutSouscription.CLOTURE)
+
+    with pytest.raises(SouscriptionStatutError):
+        service.changer_statut(db, 7, StatutSouscription.PAYE)
+    db.commit.assert_not_called()
+
+@pytest.fixture
+def sqlite_session(tmp_path):
+    """Base SQLite avec souscription payée et jobs en file (sans index PostgreSQL)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        for model in (Client, Logement, Souscription, DocumentJob):
+            conn.execute(CreateTable(model.__table__))
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+
+    with Session() as db:
+        client = Client(
+            nom_complet="Awa Diallo", date_naissance=date(2001, 5, 12), ville_naissance="Dakar",
+            pays_naissance="Sénégal", email="awa@example.com", telephone="+33600000000",
+            etablissement="Université Paris-Saclay", niveau_etude="Master 1"
+        )
+        logement = Logement(
+            titre="Studio Évry", adresse="3 rue des Mazières", ville="Évry", code_postal="91000",
+            pays="France", loyer=550.0, montant_charges=50.0, montant_total=600.0,
+            statut=StatutLogement.OCCUPE
+        )
+        souscription = Souscription(
+            client=client, logement=logement, date_entree=date(2024, 9, 1), duree_location=12,
+            statut=StatutSouscription.PAYE, reference="ATT-TEST00000001"
+        )
+        db.add(souscription)
+        db.flush()
+        db.add_all([
+            DocumentJob(souscription_id=souscription.id, type_document=type_document)
+            for type_document in TypeDocument
+        ])
+        # Souscription supprimée entre la mise en file et le rendu
+        db.add(DocumentJob(souscription_id=999, type_document=TypeDocument.PROFORMA, max_tentatives=1))
+        db.commit()
+    return Session
+
+def test_worker_traite_un_lot(sqlite_session, tmp_path):
+    """Test worker: rendu des PDF, fichiers écrits, jobs terminés ou en échec"""
+    service = DocumentJobService(store=DocumentStore(str(tmp_path / "documents")))
+    worker = DocumentWorker(sqlite_session, service, batch_size=10, executor=ThreadPoolExecutor(2))
+
+    assert asyncio.run(worker.run_once()) == 3
+
+    with sqlite_session() as db:
+        jobs = {job.id: job for job in db.scalars(select(DocumentJob))}
+    assert jobs[1].statut == jobs[2].statut == StatutJob.TERMINE
+    assert jobs[1].tentatives == 1
+    for job in (jobs[1], jobs[2]):
+        with open(job.fichier, "rb") as f:
+            assert f.read().startswith(b"%PDF-")
+    assert jobs[3].statut == StatutJob.ECHEC
+    assert "introuvable" in jobs[3].erreur
+
+    # File vide
+    assert asyncio.run(worker.run_once()) == 0
+
+def test_rendu_dans_pool_de_processus(tmp_path):
+    """Test pool de processus: payload et rendu sérialisables (spawn)"""
+    service = DocumentJobService(store=DocumentStore(str(tmp_path)))
+    worker = DocumentWorker(MagicMock(), service, processes=1)
+    job = DocumentJob(id=1, souscription_id=1, type_document=TypeDocument.ATTESTATION)
+
+    async def rendre():
+        try:
+            return await worker._render(job, PAYLOAD)
+        finally:
+            await worker.stop()
+
+    key, contenu = asyncio.run(rendre())
+    assert key == service.store.key("attestation", PAYLOAD)
+    assert contenu.startswith(b"%PDF-")
@@ -0,0 +1,191 @@
+import asyncio
+import copy
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from app.documents.store import DocumentStore
+from app.documents.worker import DocumentWorker
+from app.exceptions.souscription_exceptions import SouscriptionNotFoundError
+from app.models import DocumentJob, Logement
+from app.models.document_job import StatutJob, TypeDocument
+from app.routers.responses import RangeFileResponse, parse_range
+from app.services.document_job_service import DocumentJobService
+from tests.test_document_jobs import PAYLOAD, sqlite_session  # noqa: F401
+
+class NoExecutor:
+    """Pool qui échoue s'il est sollicité: aucun rendu attendu"""
+
+    def submit(self, *args, **kwargs):
+        raise AssertionError("rendu inattendu")
+
+def test_empreinte_stable_hors_date_emission():
+    """Test empreinte: indépendante de la date d'émission et de l'ordre des clés"""
+    store = DocumentStore("/tmp/inutilise")
+    autre_jour = {**PAYLOAD, "date_emission": "02/09/2024"}
+    reordonne = dict(reversed(list(PAYLOAD.items())))
+
+    assert store.key("attestation", PAYLOAD) == store.key("attestation", autre_jour)
+    assert store.key("attestation", PAYLOAD) == store.key("attestation", reordonne)
+    assert store.key("attestation", PAYLOAD) != store.key("proforma", PAYLOAD)
+
+def test_empreinte_change_avec_client_ou_logement():
+    store = DocumentStore("/tmp/inutilise")
+    client = copy.deepcopy(PAYLOAD)
+    client["client"]["email"] = "awa.diallo@example.com"
+    logement = copy.deepcopy(PAYLOAD)
+    logement["logement"]["loyer"] = 575.0
+
+    cles = {store.key("attestation", data) for data in (PAYLOAD, client, logement)}
+    assert len(cles) == 3
+
+def test_put_get_discard(tmp_path):
+    """Test stockage: écriture atomique, lecture, suppression limitée au stockage"""
+    store = DocumentStore(str(tmp_path / "documents"))
+    key = store.key("proforma", PAYLOAD)
+
+    assert store.get(key) is None
+    path = store.put(key, b"%PDF-1.4 test")
+    assert store.get(key) == path
+    assert path.endswith(f"{key[:2]}/{key}.pdf")
+    with open(path, "rb") as f:
+        assert f.read() == b"%PDF-1.4 test"
+
+    ailleurs = tmp_path / "autre.pdf"
+    ailleurs.write_bytes(b"%PDF-")
+    assert store.discard(str(ailleurs)) is False
+    assert ailleurs.exists()
+
+    assert store.discard(path) is True
+    assert store.get(key) is None
+    assert store.discard(path) is False
+
+def test_worker_reutilise_document_stocke(sqlite_session, tmp_path):  # noqa: F811
+    """Test worker: nouvelle demande sur des données inchangées, pas de nouveau rendu"""
+    service = DocumentJobService(store=DocumentStore(str(tmp_path / "documents")))
+    asyncio.run(DocumentWorker(sqlite_session, service, batch_size=10, executor=ThreadPoolExecutor(2)).run_once())
+    with sqlite_session() as db:
+        premier = db.get(DocumentJob, 2)
+        db.add(DocumentJob(souscription_id=premier.souscription_id, type_document=TypeDocument.ATTESTATION))
+        db.commit()
+
+    assert asyncio.run(DocumentWorker(sqlite_session, service, executor=NoExecutor()).run_once()) == 1
+
+    with sqlite_session() as db:
+        jobs = db.scalars(select(DocumentJob).where(DocumentJob.type_document == TypeDocument.ATTESTATION)).all()
+    assert [job.statut for job in jobs] == [StatutJob.TERMINE, StatutJob.TERMINE]
+    assert jobs[0].fichier == jobs[1].fichier
+
+def test_modification_logement_remplace_document(sqlite_session, tmp_path):  # noqa: F811
+    """Test invalidation: logement modifié, nouveau rendu et ancien PDF supprimé"""
+    service = DocumentJobService(store=DocumentStore(str(tmp_path / "documents")))
+    worker = DocumentWorker(sqlite_session, service, batch_size=10, executor=ThreadPoolExecutor(2))
+    asyncio.run(worker.run_once())
+    with sqlite_session() as db:
+        ancien = db.get(DocumentJob, 2).fichier
+        logement = db.scalars(select(Logement)).one()
+        logement.loyer, logement.montant_total = 575.0, 625.0
+        db.add(DocumentJob(souscription_id=1, type_document=TypeDocument.ATTESTATION))
+        db.commit()
+
+    asyncio.run(worker.run_once())
+
+    with sqlite_session() as db:
+        nouveau = db.get(DocumentJob, 4)
+    assert nouveau.statut == StatutJob.TERMINE
+    assert nouveau.fichier != ancien
+    assert service.store.get(service.store.key("attestation", PAYLOAD)) is None
+    with pytest.raises(FileNotFoundError):
+        open(ancien, "rb")
+
+def test_get_document_stocke_ou_mis_en_file(sqlite_session, tmp_path):  # noqa: F811
+    """Test téléchargement par référence: fichier stocké, sinon job mis en file"""
+    service = DocumentJobService(store=DocumentStore(str(tmp_path / "documents")))
+    service.enqueue = MagicMock(return_value=["job"])
+
+    with sqlite_session() as db:
+        document = service.get_document(db, "ATT-TEST00000001", TypeDocument.PROFORMA)
+        assert document.fichier is None and document.job == "job"
+
+        service.store.put(document.key, b"%PDF-")
+        stocke = service.get_document(db, "ATT-TEST00000001", TypeDocument.PROFORMA)
+        assert stocke.key == document.key
+        assert stocke.fichier == service.store.get(document.key)
+        service.enqueue.assert_called_once()
+
+        with pytest.raises(SouscriptionNotFoundError):
+            service.get_document(db, "ATT-INCONNUE", TypeDocument.PROFORMA)
+
+def test_parse_range():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    # Multi-intervalles ou unité inconnue: fichier complet
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    assert parse_range("items=0-1", 100) is None
+    for header in ("bytes=100-", "bytes=9-2", "bytes=-0"):
+        with pytest.raises(ValueError):
+            parse_range(header, 100)
+
+@pytest.fixture
+def fichier_client(tmp_path):
+    path = tmp_path / "document.pdf"
+    path.write_bytes(bytes(range(100)))
+    app = FastAPI()
+
+    @app.get("/document")
+    def document(request: Request):
+        return RangeFileResponse(str(path), request, etag='"abc"', media_type="application/pdf")
+
+    return TestClient(app)
+
+def test_range_file_response(fichier_client):
+    """Test Range: 200 complet, 206 partiel, 416 hors fichier, If-Range périmé"""
+    complet = fichier_client.get("/document")
+    assert complet.status_code == 200
+    assert complet.headers["accept-ranges"] == "bytes"
+    assert complet.headers["etag"] == '"abc"'
+    assert complet.content == bytes(range(100))
+
+    partiel = fichier_client.get("/document", headers={"Range": "bytes=10-19"})
+    assert partiel.status_code == 206
+    assert partiel.headers["content-range"] == "bytes 10-19/100"
+    assert partiel.content == bytes(range(10, 20))
+
+    hors = fichier_client.get("/document", headers={"Range": "bytes=200-"})
+    assert hors.status_code == 416
+    assert hors.headers["content-range"] == "bytes */100"
+
+    perime = fichier_client.get("/document", headers={"Range": "bytes=10-19", "If-Range": '"autre"'})
+    assert perime.status_code == 200
+    assert len(perime.content) == 100
+
+def test_range_file_response_zerocopy(tmp_path):
+    """Test envoi zero-copy: fichier, décalage et longueur transmis au serveur"""
+    path = tmp_path / "document.pdf"
+    path.write_bytes(bytes(range(100)))
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(b"range", b"bytes=-5")],
+        "extensions": {"http.response.zerocopy": {}}
+    }
+    messages = []
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopy":
+            message = {**message, "file": message["file"].name}
+        messages.append(message)
+
+    response = RangeFileResponse(str(path), Request(scope))
+    asyncio.run(response(scope, None, send))
+
+    assert messages[0]["status"] == 206
+    assert messages[1] == {
+        "type": "http.response.zerocopy", "file": str(path), "offset": 95, "count": 5, "more_body": False
+    }
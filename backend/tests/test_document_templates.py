@@ -0,0 +1,75 @@
+import re
+import time
+import pytest
+import qrcode
+from PIL import Image, ImageDraw
+from app.documents import layers, renderers, render_attestation, render_proforma
+from app.documents.qr import qr_matrix
+from tests.test_document_jobs import PAYLOAD
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    """Logo et cachet PNG transparents dans un répertoire static temporaire"""
+    for nom, taille, couleur in (
+        ("logo-boaz-housing.png", (400, 200), (31, 78, 121, 255)),
+        ("cachet-signature-boaz.png", (300, 300), (180, 30, 30, 255)),
+    ):
+        image = Image.new("RGBA", taille, (255, 255, 255, 0))
+        ImageDraw.Draw(image).ellipse((10, 10, taille[0] - 10, taille[1] - 10), outline=couleur, width=12)
+        image.save(tmp_path / nom)
+    monkeypatch.setenv("DOCUMENTS_STATIC_DIR", str(tmp_path))
+    layers.cached_image.cache_clear()
+    renderers._template.cache_clear()
+    yield tmp_path
+    layers.cached_image.cache_clear()
+    renderers._template.cache_clear()
+
+def images(pdf: bytes):
+    """Images embarquées et références de masque résolues"""
+    objets = {int(n) for n in re.findall(rb"\n(\d+) 0 obj", pdf)}
+    masques = [int(n) for n in re.findall(rb"/SMask (\d+) 0 R", pdf)]
+    assert all(n in objets for n in masques)
+    return pdf.count(b"/Subtype /Image"), len(masques)
+
+def test_gabarit_construit_une_fois():
+    """Test cache: même gabarit pour la même organisation, nouveau si elle change"""
+    gabarit = renderers.get_template(renderers.AttestationTemplate, PAYLOAD)
+    assert renderers.get_template(renderers.AttestationTemplate, dict(PAYLOAD)) is gabarit
+
+    autre = dict(PAYLOAD, organisation=dict(PAYLOAD["organisation"], telephone="+33 1 00 00 00 00"))
+    assert renderers.get_template(renderers.AttestationTemplate, autre) is not gabarit
+
+def test_images_encodees_une_fois(static_dir):
+    """Test logo/cachet: chargés une fois par processus, embarqués dans chaque PDF"""
+    premier, second = render_attestation(PAYLOAD), render_attestation(PAYLOAD)
+
+    # Logo et cachet avec leur masque de transparence
+    assert images(premier) == images(second) == (4, 2)
+    assert images(render_proforma(PAYLOAD)) == (2, 1)
+    assert layers.cached_image.cache_info().misses == 2
+
+def test_images_absentes(tmp_path, monkeypatch):
+    """Test sans logo ni cachet: documents rendus sans images"""
+    monkeypatch.setenv("DOCUMENTS_STATIC_DIR", str(tmp_path))
+    layers.cached_image.cache_clear()
+    renderers._template.cache_clear()
+
+    assert images(render_attestation(PAYLOAD)) == (0, 0)
+    renderers._template.cache_clear()
+
+def test_qr_matrix():
+    """Test QR: mêmes modules que qrcode, calculés une fois par contenu"""
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=0)
+    qr.add_data(PAYLOAD["qr_code_url"])
+    qr.make(fit=True)
+
+    assert qr_matrix(PAYLOAD["qr_code_url"]) == tuple(tuple(ligne) for ligne in qr.get_matrix())
+    assert qr_matrix(PAYLOAD["qr_code_url"]) is qr_matrix(PAYLOAD["qr_code_url"])
+
+def test_budget_attestation(static_dir):
+    """Test budget: une attestation bien en dessous de 50 ms une fois le gabarit construit"""
+    render_attestation(PAYLOAD)
+    debut = time.perf_counter()
+    for i in range(20):
+        render_attestation(dict(PAYLOAD, reference=f"ATT-TEST{i:08d}", qr_code_url=f"http://localhost:3000/verify/ATT-TEST{i:08d}"))
+    assert (time.perf_counter() - debut) / 20 < 0.05
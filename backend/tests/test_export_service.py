@@ -0,0 +1,74 @@
+import json
+from unittest.mock import MagicMock
+from datetime import datetime, timezone
+from sqlalchemy.dialects import postgresql
+from app.models.logement import StatutLogement
+from app.services.export_service import ExportService
+
+COLUMNS = ["id", "titre", "statut", "created_at", "description"]
+CREATED_AT = datetime(2024, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+def make_db(partitions):
+    db_mock = MagicMock()
+    result = db_mock.execute.return_value
+    result.keys.return_value = COLUMNS
+    result.partitions.return_value = iter(partitions)
+    return db_mock
+
+def test_stream_csv_par_lots():
+    """Test export CSV: en-tête puis un morceau par lot lu sur le curseur"""
+    service = ExportService()
+    db_mock = make_db([
+        [(1, "Studio", StatutLogement.DISPONIBLE, CREATED_AT, None)],
+        [(2, "T2, calme", StatutLogement.OCCUPE, CREATED_AT, "Vue")],
+    ])
+
+    chunks = list(service.stream(db_mock, service.logements_statement(), "csv"))
+
+    assert chunks[0] == "id,titre,statut,created_at,description\r\n"
+    assert chunks[1] == "1,Studio,disponible,2024-03-01T09:00:00+00:00,\r\n"
+    assert chunks[2] == '2,"T2, calme",occupe,2024-03-01T09:00:00+00:00,Vue\r\n'
+
+def test_stream_ndjson():
+    """Test export NDJSON: un objet JSON par ligne"""
+    service = ExportService()
+    db_mock = make_db([[(1, "Studio é", StatutLogement.DISPONIBLE, CREATED_AT, None)]])
+
+    lignes = "".join(service.stream(db_mock, service.logements_statement(), "ndjson")).splitlines()
+
+    assert json.loads(lignes[0]) == {
+        "id": 1,
+        "titre": "Studio é",
+        "statut": "disponible",
+        "created_at": "2024-03-01T09:00:00+00:00",
+        "description": None
+    }
+
+def test_stream_utilise_curseur_serveur():
+    """Test lecture par lots (yield_per) plutôt que chargement complet"""
+    service = ExportService()
+    db_mock = make_db([])
+
+    list(service.stream(db_mock, service.logements_statement(), "csv"))
+
+    stmt = db_mock.execute.call_args[0][0]
+    assert stmt.get_execution_options()["yield_per"] == service.BATCH_SIZE
+
+def test_logements_statement_filtres():
+    """Test export filtré par statut et ville"""
+    service = ExportService()
+
+    sql = str(service.logements_statement(statut=StatutLogement.DISPONIBLE, ville="Paris").compile(dialect=postgresql.dialect()))
+
+    assert "logements.statut = " in sql
+    assert "logements.ville ILIKE" in sql
+    assert sql.endswith("ORDER BY logements.id")
+
+def test_logements_statement_ville_echappee():
+    """Test % et _ saisis dans la ville pris littéralement (ESCAPE)"""
+    service = ExportService()
+
+    compiled = service.logements_statement(ville="Saint_Denis 100%").compile(dialect=postgresql.dialect())
+
+    assert "ILIKE %(ville_1)s ESCAPE '\\\\'" in str(compiled)
+    assert compiled.params["ville_1"] == "%Saint\\_Denis 100\\%%"
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.main import app
 from app.database import SessionLocal, engine, Base
 from app.models.logement import StatutLogement
+from app.services.logement_cache import logement_cache
 
 client = TestClient(app)
 
@@ -21,6 +22,8 @@ def db_session():
         session.close()
         # Clean up tables after tests
         Base.metadata.drop_all(bind=engine)
+        # Les tables sont recréées: vider les lectures en cache
+        logement_cache.clear()
 
 def test_create_logement():
     """Test création d'un logement via API"""
@@ -148,6 +151,95 @@ def test_get_stats_logements():
     assert "occupes" in data
     assert "maintenance" in data
 
+def test_get_stats_logements_repartitions():
+    """Test répartitions par ville et par pays des statistiques"""
+    client.post("/api/logements/", json={
+        "titre": "Test Stats Ville",
+        "adresse": "1 Rue des Stats",
+        "ville": "Grenoble",
+        "code_postal": "38000",
+        "pays": "France",
+        "loyer": 450.0
+    })
+    
+    response = client.get("/api/logements/stats")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == data["disponibles"] + data["occupes"] + data["maintenance"]
+    assert any(item["ville"] == "Grenoble" for item in data["par_ville"])
+    assert sum(item["total"] for item in data["par_pays"]) == data["total"]
+    assert data["loyer"]["min"] <= data["loyer"]["moyen"] <= data["loyer"]["max"]
+
+def test_cache_invalide_apres_changement_statut():
+    """Test lectures en cache (détail, disponibles, stats) invalidées par une écriture"""
+    create_response = client.post("/api/logements/", json={
+        "titre": "Test Cache",
+        "adresse": "3 Rue du Cache",
+        "ville": "Dijon",
+        "code_postal": "21000",
+        "pays": "France",
+        "loyer": 410.0
+    })
+    logement_id = create_response.json()["id"]
+    
+    # Lectures mises en cache
+    assert client.get(f"/api/logements/{logement_id}").json()["statut"] == "disponible"
+    assert any(l["id"] == logement_id for l in client.get("/api/logements/disponibles").json())
+    maintenance = client.get("/api/logements/stats").json()["maintenance"]
+    
+    client.patch(f"/api/logements/{logement_id}/statut?nouveau_statut=maintenance")
+    
+    assert client.get(f"/api/logements/{logement_id}").json()["statut"] == "maintenance"
+    assert all(l["id"] != logement_id for l in client.get("/api/logements/disponibles").json())
+    assert client.get("/api/logements/stats").json()["maintenance"] == maintenance + 1
+
+def test_get_logement_etag_304():
+    """Test requêtes conditionnelles sur le détail: ETag, Last-Modified et 304"""
+    create_response = client.post("/api/logements/", json={
+        "titre": "Test ETag",
+        "adresse": "4 Rue des Validateurs",
+        "ville": "Rennes",
+        "code_postal": "35000",
+        "pays": "France",
+        "loyer": 430.0
+    })
+    logement_id = create_response.json()["id"]
+    
+    response = client.get(f"/api/logements/{logement_id}")
+    etag = response.headers["etag"]
+    assert "last-modified" in response.headers
+    
+    response = client.get(f"/api/logements/{logement_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    
+    response = client.get("/api/logements/?limit=5")
+    response = client.get("/api/logements/?limit=5", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+
+def test_update_logement_if_match():
+    """Test concurrence optimiste: PUT avec un ETag périmé refusé (412)"""
+    create_response = client.post("/api/logements/", json={
+        "titre": "Test If-Match",
+        "adresse": "5 Rue des Versions",
+        "ville": "Rennes",
+        "code_postal": "35000",
+        "pays": "France",
+        "loyer": 440.0
+    })
+    logement_id = create_response.json()["id"]
+    etag = client.get(f"/api/logements/{logement_id}").headers["etag"]
+    
+    response = client.put(f"/api/logements/{logement_id}", json={"loyer": 450.0}, headers={"If-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    
+    # Second client avec l'ancienne version
+    response = client.put(f"/api/logements/{logement_id}", json={"loyer": 460.0}, headers={"If-Match": etag})
+    assert response.status_code == 412
+    assert client.get(f"/api/logements/{logement_id}").json()["loyer"] == 450.0
+
 def test_get_logement_not_found():
     """Test récupération logement inexistant"""
     response = client.get("/api/logements/99999")
@@ -177,4 +269,174 @@ def test_delete_logement():
     
     # Vérifier que le logement n'existe plus
     get_response = client.get(f"/api/logements/{logement_id}")
-    assert get_response.status_code == 404
\ No newline at end of file
+    assert get_response.status_code == 404
+def test_get_logements_pagination_curseur():
+    """Test pagination par curseur sans doublon ni trou"""
+    for i in range(3):
+        client.post("/api/logements/", json={
+            "titre": f"Test Curseur {i}",
+            "adresse": f"{i} Rue du Curseur",
+            "ville": "Rennes",
+            "code_postal": "35000",
+            "pays": "France",
+            "loyer": 500.0
+        })
+    
+    ids = []
+    response = client.get("/api/logements/", params={"limit": 1})
+    while True:
+        assert response.status_code == 200
+        ids.extend(item["id"] for item in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        response = client.get("/api/logements/", params={"limit": 1, "cursor": next_cursor})
+    
+    assert len(ids) == len(set(ids))
+    assert len(ids) >= 3
+
+def test_get_logements_curseur_invalide():
+    """Test curseur invalide"""
+    response = client.get("/api/logements/", params={"cursor": "invalide"})
+    
+    assert response.status_code == 422
+    assert response.json()["detail"]["field"] == "cursor"
+
+def test_get_logements_fields_compact():
+    """Test liste compacte (vue carte) et projection personnalisée"""
+    client.post("/api/logements/", json={
+        "titre": "Test Compact",
+        "description": "Longue description " * 50,
+        "adresse": "6 Rue des Cartes",
+        "ville": "Brest",
+        "code_postal": "29200",
+        "pays": "France",
+        "loyer": 390.0
+    })
+    
+    response = client.get("/api/logements/?fields=compact&limit=5")
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"id", "titre", "ville", "loyer", "montant_total", "statut"}
+    
+    response = client.get("/api/logements/?fields=titre,ville&ville=Brest")
+    assert response.json()[0] == {"titre": "Test Compact", "ville": "Brest"}
+    
+    response = client.get("/api/logements/?fields=inconnu")
+    assert response.status_code == 422
+
+def test_recherche_logements_q():
+    """Test recherche plein texte avec le paramètre q"""
+    client.post("/api/logements/", json={
+        "titre": "Studio meublé proche campus",
+        "description": "Idéal pour étudiant, cuisine équipée",
+        "adresse": "3 Allée de la Recherche",
+        "ville": "Montpellier",
+        "code_postal": "34000",
+        "pays": "France",
+        "loyer": 480.0
+    })
+    
+    response = client.get("/api/logements/", params={"q": "cuisine équipée"})
+    assert response.status_code == 200
+    assert any(item["titre"] == "Studio meublé proche campus" for item in response.json())
+    
+    response = client.get("/api/logements/", params={"q": "Allée de la Rech"})
+    assert response.status_code == 200
+    assert any(item["adresse"] == "3 Allée de la Recherche" for item in response.json())
+
+def test_recherche_logements_q_avec_curseur():
+    """Test recherche incompatible avec la pagination par curseur"""
+    response = client.get("/api/logements/", params={"q": "studio", "cursor": "abc"})
+    
+    assert response.status_code == 422
+
+def test_create_logement_doublon_adresse():
+    """Test doublon d'adresse (insensible à la casse) rejeté par la base"""
+    logement_data = {
+        "titre": "Test Doublon",
+        "adresse": "12 Rue du Doublon",
+        "ville": "Dijon",
+        "code_postal": "21000",
+        "pays": "France",
+        "loyer": 390.0
+    }
+    client.post("/api/logements/", json=logement_data)
+    
+    response = client.post("/api/logements/", json={**logement_data, "adresse": "12 rue du doublon"})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"]["rule"] == "duplicate_adresse"
+
+def test_import_logements_bulk():
+    """Test import en masse CSV avec rapport d'erreurs"""
+    contenu = (
+        "titre,adresse,ville,code_postal,loyer\n"
+        "Import A,10 Rue de l'Import,Brest,29200,450\n"
+        "Import B,11 Rue de l'Import,Brest,29200,5\n"
+    )
+    
+    response = client.post(
+        "/api/logements/bulk",
+        files={"fichier": ("logements.csv", contenu, "text/csv")}
+    )
+    
+    assert response.status_code == 200
+    rapport = response.json()
+    assert rapport["total"] == 2
+    assert rapport["crees"] == 1
+    assert rapport["erreurs"][0]["ligne"] == 3
+
+def test_export_logements_csv():
+    """Test export CSV du catalogue"""
+    client.post("/api/logements/", json={
+        "titre": "Test Export",
+        "adresse": "5 Rue de l'Export",
+        "ville": "Reims",
+        "code_postal": "51100",
+        "pays": "France",
+        "loyer": 410.0
+    })
+    
+    response = client.get("/api/logements/export", params={"format": "csv", "ville": "Reims"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+    lignes = response.text.splitlines()
+    assert lignes[0].startswith("id,titre")
+    assert any("5 Rue de l'Export" in ligne for ligne in lignes[1:])
+
+def test_export_logements_format_invalide():
+    """Test format d'export non supporté"""
+    response = client.get("/api/logements/export", params={"format": "xml"})
+    
+    assert response.status_code == 422
+
+def test_ecritures_nombre_de_requetes(db_session, count_queries):
+    """Test une requête SQL par écriture: INSERT/UPDATE ... RETURNING, sans refresh"""
+    logement_data = {
+        "titre": "Test Requêtes",
+        "adresse": "8 Rue du Compteur",
+        "ville": "Angers",
+        "code_postal": "49000",
+        "pays": "France",
+        "loyer": 480.0
+    }
+    
+    with count_queries(engine) as statements:
+        response = client.post("/api/logements/", json=logement_data)
+    assert response.status_code == 200
+    assert len(statements) == 1
+    logement_id = response.json()["id"]
+    
+    # Lecture du logement puis UPDATE ... RETURNING updated_at
+    with count_queries(engine) as statements:
+        response = client.patch(f"/api/logements/{logement_id}/statut", params={"nouveau_statut": "maintenance"})
+    assert response.status_code == 200
+    assert len(statements) == 2
+    
+    with count_queries(engine) as statements:
+        response = client.put(f"/api/logements/{logement_id}", json={"loyer": 500.0})
+    assert response.status_code == 200
+    assert response.json()["montant_total"] == 500.0
+    assert len(statements) == 2
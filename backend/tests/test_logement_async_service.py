@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.models.logement import Logement, StatutLogement
+from app.schemas.logement import LogementCreate
+from app.services.logement_service import LogementService
+from app.services.logement_async_service import AsyncLogementService, ThreadedLogementService
+from app.exceptions.logement_exceptions import LogementNotFoundError, LogementBusinessRuleError
+
+def make_db():
+    db_mock = AsyncMock()
+    db_mock.add = MagicMock()
+    return db_mock
+
+def logement_data():
+    return LogementCreate(
+        titre="Studio moderne",
+        adresse="12 rue de la Paix",
+        ville="Paris",
+        code_postal="75001",
+        pays="France",
+        loyer=800.0,
+        montant_charges=50.0,
+        frais_agence=200.0,
+        frais_dossier=100.0
+    )
+
+def test_create_logement_async():
+    """Test création via AsyncSession: INSERT ... RETURNING puis commit"""
+    service = AsyncLogementService()
+    db_mock = make_db()
+    logement = Logement(id=1, titre="Studio moderne")
+    result = MagicMock()
+    result.first.return_value = logement
+    db_mock.scalars.return_value = result
+
+    created = asyncio.run(service.create_logement(db_mock, logement_data()))
+
+    assert created is logement
+    db_mock.scalars.assert_awaited_once()
+    db_mock.commit.assert_awaited_once()
+    db_mock.rollback.assert_not_awaited()
+
+def test_create_logement_async_adresse_dupliquee():
+    """Test conflit d'adresse: rollback et erreur métier"""
+    service = AsyncLogementService()
+    db_mock = make_db()
+    result = MagicMock()
+    result.first.return_value = None
+    db_mock.scalars.return_value = result
+
+    with pytest.raises(LogementBusinessRuleError) as exc_info:
+        asyncio.run(service.create_logement(db_mock, logement_data()))
+
+    assert exc_info.value.rule == "duplicate_adresse"
+    db_mock.rollback.assert_awaited_once()
+    db_mock.commit.assert_not_awaited()
+
+def test_changer_statut_async_logement_introuvable():
+    """Test changement de statut d'un logement inexistant"""
+    service = AsyncLogementService()
+    db_mock = make_db()
+    db_mock.get.return_value = None
+
+    with pytest.raises(LogementNotFoundError):
+        asyncio.run(service.changer_statut_logement(db_mock, 999, StatutLogement.OCCUPE))
+
+def test_threaded_service_delegue_au_service_synchrone():
+    """Test adaptateur threadpool: mêmes résultats que le service synchrone"""
+    sync_service = LogementService()
+    sync_service.get_logement = MagicMock(return_value="logement")
+    service = ThreadedLogementService(sync_service)
+
+    assert asyncio.run(service.get_logement("db", 1)) == "logement"
+    sync_service.get_logement.assert_called_once_with("db", 1)
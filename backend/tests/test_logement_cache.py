@@ -0,0 +1,152 @@
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from app.models.logement import Logement, StatutLogement
+from app.services.logement_cache import CachedLogementService, LogementCache
+from app.services.logement_service import LogementService
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_logement(logement_id=1, statut=StatutLogement.DISPONIBLE):
+    return Logement(
+        id=logement_id,
+        titre="Studio",
+        adresse="1 rue du Test",
+        ville="Paris",
+        code_postal="75001",
+        pays="France",
+        loyer=500.0,
+        montant_charges=50.0,
+        montant_total=550.0,
+        statut=statut,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc)
+    )
+
+def test_cache_expiration_ttl():
+    """Test expiration d'une entrée après le TTL"""
+    clock = FakeClock()
+    cache = LogementCache(ttl=10, max_size=10, clock=clock)
+    cache.set("stats", {"total": 1})
+
+    assert cache.get("stats") == {"total": 1}
+    clock.now = 11
+    assert cache.get("stats") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_cache_eviction_lru():
+    """Test éviction de l'entrée la moins récemment utilisée"""
+    cache = LogementCache(ttl=60, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_cache_ignore_valeur_lue_avant_invalidation():
+    """Test une lecture commencée avant une écriture n'est pas remise en cache"""
+    cache = LogementCache(ttl=60, max_size=10)
+    generation = cache.generation
+    cache.invalidate("stats")
+    cache.set("stats", {"total": 0}, generation)
+
+    assert cache.get("stats") is None
+
+def test_cache_pas_de_remplissage_pendant_retard_replique():
+    """Test lecture après invalidation, réplique peut-être en retard: pas remise en cache"""
+    clock = FakeClock()
+    cache = LogementCache(ttl=60, max_size=10, clock=clock, replica_lag=5)
+    cache.invalidate("stats")
+
+    cache.set("stats", {"total": 0}, cache.generation)
+    assert cache.get("stats") is None
+
+    clock.now = 5
+    cache.set("stats", {"total": 1}, cache.generation)
+    assert cache.get("stats") == {"total": 1}
+
+def test_cache_desactive_ttl_zero():
+    """Test LOGEMENT_CACHE_TTL=0: rien n'est mis en cache"""
+    cache = LogementCache(ttl=0, max_size=10)
+    cache.set("stats", {"total": 1})
+
+    assert cache.get("stats") is None
+
+def test_keys_for_write_precises():
+    """Test invalidation ciblée selon les statuts avant/après écriture"""
+    cache = LogementCache()
+
+    assert cache.keys_for_write(5, [StatutLogement.OCCUPE, StatutLogement.MAINTENANCE]) == [
+        "stats", "logement:5"
+    ]
+    assert cache.keys_for_write(5, [StatutLogement.DISPONIBLE, StatutLogement.OCCUPE]) == [
+        "stats", "logement:5", "disponibles"
+    ]
+
+def test_cached_service_hit_sans_base():
+    """Test second appel servi par le cache sans toucher au service ni à la session"""
+    inner = MagicMock()
+    inner.get_logement = AsyncMock(return_value=make_logement())
+    service = CachedLogementService(inner, LogementCache(ttl=60, max_size=10))
+
+    first = asyncio.run(service.get_logement(db="db", logement_id=1))
+    second = asyncio.run(service.get_logement(db="db", logement_id=1))
+
+    assert first == second
+    assert first["id"] == 1
+    assert first["statut"] == "disponible"
+    inner.get_logement.assert_awaited_once()
+
+def test_cached_service_ne_cache_pas_absence():
+    """Test logement introuvable: pas de mise en cache du 404"""
+    inner = MagicMock()
+    inner.get_logement = AsyncMock(return_value=None)
+    service = CachedLogementService(inner, LogementCache(ttl=60, max_size=10))
+
+    assert asyncio.run(service.get_logement(db="db", logement_id=9)) is None
+    assert asyncio.run(service.get_logement(db="db", logement_id=9)) is None
+    assert inner.get_logement.await_count == 2
+
+def test_changer_statut_invalide_cache():
+    """Test changement de statut: détail, stats et disponibles invalidés après commit"""
+    cache = LogementCache(ttl=60, max_size=10)
+    for key in ("stats", "disponibles", "logement:1", "logement:2"):
+        cache.set(key, {})
+
+    service = LogementService()
+    service.cache = cache
+    db_mock = MagicMock()
+    db_mock.query.return_value.filter.return_value.first.return_value = make_logement()
+
+    service.changer_statut_logement(db_mock, 1, StatutLogement.MAINTENANCE)
+
+    assert cache.get("stats") is None
+    assert cache.get("disponibles") is None
+    assert cache.get("logement:1") is None
+    assert cache.get("logement:2") == {}
+
+def test_cached_service_disponibles_avec_empreinte():
+    """Test disponibles mis en cache avec l'empreinte utilisée pour l'ETag"""
+    inner = MagicMock()
+    fingerprint = {"count": 1, "last_modified": "2024-01-01T00:00:00+00:00", "checksum": "1704067200"}
+    inner.get_logements_fingerprint = AsyncMock(return_value=fingerprint)
+    inner.get_logements_disponibles = AsyncMock(return_value=[make_logement()])
+    service = CachedLogementService(inner, LogementCache(ttl=60, max_size=10))
+
+    snapshot = asyncio.run(service.get_disponibles_snapshot(db="db"))
+    items = asyncio.run(service.get_logements_disponibles(db="db"))
+
+    assert snapshot["fingerprint"] == fingerprint
+    assert items == snapshot["items"]
+    assert items[0]["id"] == 1
+    inner.get_logements_fingerprint.assert_awaited_once()
+    inner.get_logements_disponibles.assert_awaited_once()
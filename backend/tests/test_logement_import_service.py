@@ -0,0 +1,201 @@
+import io
+import json
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.exc import IntegrityError
+from app.services.logement_import_service import LogementImportService
+from app.services.logement_service import LogementService
+from app.exceptions.logement_exceptions import LogementValidationError
+
+CSV_CONTENT = """titre,description,adresse,ville,code_postal,pays,loyer,montant_charges
+Studio centre,,1 Rue Alpha,Paris,75001,France,600,50
+Studio bis,,1 rue alpha,paris,75001,France,620,
+Loyer trop bas,,2 Rue Beta,Lyon,69001,France,10,0
+T2 Lyon,Calme,3 Rue Gamma,Lyon,69002,France,800,100
+"""
+
+def make_service() -> LogementImportService:
+    return LogementImportService(LogementService())
+
+def test_detect_format():
+    """Test détection du format d'import"""
+    service = make_service()
+
+    assert service.detect_format("CSV", None, None) == "csv"
+    assert service.detect_format(None, "application/x-ndjson", "x.txt") == "ndjson"
+    assert service.detect_format(None, "application/octet-stream", "logements.jsonl") == "ndjson"
+    assert service.detect_format(None, None, "logements.csv") == "csv"
+
+    with pytest.raises(LogementValidationError) as exc_info:
+        service.detect_format(None, None, "logements.xlsx")
+    assert exc_info.value.field == "format"
+
+def test_iter_rows_csv():
+    """Test lecture CSV: numéros de ligne et cellules vides ignorées"""
+    service = make_service()
+    stream = io.BytesIO(CSV_CONTENT.encode("utf-8"))
+
+    rows = list(service.iter_rows(stream, "csv"))
+
+    assert [ligne for ligne, _, _ in rows] == [2, 3, 4, 5]
+    assert "description" not in rows[0][1]
+    assert rows[3][1]["description"] == "Calme"
+    assert not stream.closed
+
+def test_iter_rows_ndjson():
+    """Test lecture NDJSON avec lignes vides et invalides"""
+    service = make_service()
+    content = json.dumps({"titre": "A"}) + "\n\n{invalide\n[1, 2]\n"
+
+    rows = list(service.iter_rows(io.BytesIO(content.encode("utf-8")), "ndjson"))
+
+    assert rows[0] == (1, {"titre": "A"}, None)
+    assert rows[1][0] == 3 and rows[1][2].startswith("JSON invalide")
+    assert rows[2][0] == 4 and rows[2][1] is None
+
+def test_import_logements_rapport():
+    """Test import: validation, doublons dans le fichier et en base, rapport par ligne"""
+    service = make_service()
+    db_mock = MagicMock()
+    # Seule la ligne Lyon est insérée, Paris existe déjà en base
+    db_mock.execute.return_value = [("3 rue gamma", "lyon")]
+
+    rows = service.iter_rows(io.BytesIO(CSV_CONTENT.encode("utf-8")), "csv")
+    rapport = service.import_logements(db_mock, rows)
+
+    assert rapport["total"] == 4
+    assert rapport["crees"] == 1
+    erreurs = {erreur["ligne"]: erreur for erreur in rapport["erreurs"]}
+    assert erreurs[2]["rule"] == "duplicate_adresse"
+    assert erreurs[3]["message"] == "Adresse en double dans le fichier"
+    assert erreurs[4]["rule"] == "loyer_minimum"
+    db_mock.execute.assert_called_once()
+    db_mock.commit.assert_called_once()
+
+def test_import_logements_par_lots():
+    """Test un INSERT et un commit par lot"""
+    service = make_service()
+    db_mock = MagicMock()
+    db_mock.execute.side_effect = lambda stmt: []
+    rows = [
+        (i, {
+            "titre": f"Logement {i}",
+            "adresse": f"{i} Rue du Lot",
+            "ville": "Paris",
+            "code_postal": "75001",
+            "loyer": 500.0
+        }, None)
+        for i in range(1, 6)
+    ]
+
+    service.import_logements(db_mock, rows, chunk_size=2)
+
+    assert db_mock.execute.call_count == 3
+    assert db_mock.commit.call_count == 3
+
+def test_import_logements_erreur_validation():
+    """Test erreur de schéma rapportée avec le champ concerné"""
+    service = make_service()
+    db_mock = MagicMock()
+
+    rapport = service.import_logements(db_mock, [(1, {"titre": "Sans adresse"}, None)])
+
+    assert rapport["crees"] == 0
+    assert "adresse" in rapport["erreurs"][0]["message"]
+    db_mock.execute.assert_not_called()
+
+def make_row(i, adresse, ville="Paris", loyer=500.0):
+    return i, {"titre": f"Logement {i}", "adresse": adresse, "ville": ville, "code_postal": "75001", "loyer": loyer}, None
+
+def test_import_lot_rejete_repris_ligne_par_ligne():
+    """Test contrainte violée dans un lot: seules les lignes fautives sont rapportées"""
+    service = make_service()
+    db_mock = MagicMock()
+    violation = IntegrityError("INSERT", {}, Exception('violates check constraint "check_loyer_positive"'))
+    # Lot rejeté, puis ligne 1 insérée, ligne 2 fautive, ligne 3 déjà en base
+    effets = iter([violation, ("1 rue a", "paris"), violation, None])
+
+    def execute(stmt):
+        effet = next(effets)
+        if isinstance(effet, Exception):
+            raise effet
+        return MagicMock(first=MagicMock(return_value=effet))
+
+    db_mock.execute.side_effect = execute
+    rows = [make_row(1, "1 Rue A"), make_row(2, "2 Rue B"), make_row(3, "3 Rue C")]
+
+    rapport = service.import_logements(db_mock, rows)
+
+    assert rapport["crees"] == 1
+    erreurs = {erreur["ligne"]: erreur for erreur in rapport["erreurs"]}
+    assert list(erreurs) == [2, 3]
+    assert "contrainte" in erreurs[2]["message"]
+    assert erreurs[3]["rule"] == "duplicate_adresse"
+    assert db_mock.rollback.call_count == 2
+    assert db_mock.commit.call_count == 2
+
+def test_import_cles_hors_ascii_normalisees_par_la_base():
+    """Test doublons hors ASCII: clés calculées par lower() de la base, comme l'index"""
+    service = make_service()
+    db_mock = MagicMock()
+    # Normalisation par la base, puis insertion des deux adresses distinctes
+    db_mock.execute.side_effect = [
+        [(1, "1 rue de l'été", "évry"), (2, "1 rue de l'été", "évry"), (3, "2 rue de l'été", "évry")],
+        [("1 rue de l'été", "évry"), ("2 rue de l'été", "évry")]
+    ]
+    rows = [
+        make_row(1, "1 Rue de l'Été", "Évry"),
+        make_row(2, "1 RUE DE L'ÉTÉ", "Évry"),
+        make_row(3, "2 Rue de l'Été", "Évry")
+    ]
+
+    rapport = service.import_logements(db_mock, rows)
+
+    assert rapport["crees"] == 2
+    assert rapport["erreurs"] == [{"ligne": 2, "message": "Adresse en double dans le fichier", "rule": "duplicate_adresse"}]
+    assert "lower" in str(db_mock.execute.call_args_list[0].args[0])
+    db_mock.commit.assert_called_once()
+
+def test_import_adresse_ligne_rejetee_reste_libre():
+    """Test ligne rejetée par une contrainte: la ligne suivante à la même adresse est insérée"""
+    service = make_service()
+    db_mock = MagicMock()
+    violation = IntegrityError("INSERT", {}, Exception('violates check constraint "check_loyer_positive"'))
+    # Lot 1 rejeté puis ligne 1 rejetée; lot 2 (ligne 2, même adresse) inséré
+    effets = iter([violation, violation, [("1 rue a", "paris")]])
+
+    def execute(stmt):
+        effet = next(effets)
+        if isinstance(effet, Exception):
+            raise effet
+        return effet
+
+    db_mock.execute.side_effect = execute
+    rows = [make_row(1, "1 Rue A"), make_row(2, "1 rue a")]
+
+    rapport = service.import_logements(db_mock, rows, chunk_size=1)
+
+    assert rapport["crees"] == 1
+    assert [erreur["ligne"] for erreur in rapport["erreurs"]] == [1]
+    assert "contrainte" in rapport["erreurs"][0]["message"]
+
+def test_import_doublon_du_lot_apres_ligne_rejetee():
+    """Test même lot: la ligne rejetée ne rend pas la suivante doublon du fichier"""
+    service = make_service()
+    db_mock = MagicMock()
+    violation = IntegrityError("INSERT", {}, Exception('violates check constraint "check_loyer_positive"'))
+    effets = iter([violation, violation, ("1 rue a", "paris")])
+
+    def execute(stmt):
+        effet = next(effets)
+        if isinstance(effet, Exception):
+            raise effet
+        return MagicMock(first=MagicMock(return_value=effet))
+
+    db_mock.execute.side_effect = execute
+    rows = [make_row(1, "1 Rue A"), make_row(2, "1 rue a")]
+
+    rapport = service.import_logements(db_mock, rows)
+
+    assert rapport["crees"] == 1
+    assert [erreur["ligne"] for erreur in rapport["erreurs"]] == [1]
@@ -0,0 +1,67 @@
+import json
+from datetime import datetime, timedelta, timezone
+from fastapi import Response
+from app.models.logement import Logement, StatutLogement
+from app.routers.responses import ORJSONResponse, json_response
+from app.schemas.logement import LogementResponse, serialize_logement
+
+def make_logement(**overrides):
+    values = dict(
+        id=1,
+        titre="Studio meublé",
+        description=None,
+        adresse="1 rue du Test",
+        ville="Paris",
+        code_postal="75001",
+        pays="France",
+        loyer=500,
+        montant_charges=50.0,
+        montant_total=550.0,
+        statut=StatutLogement.DISPONIBLE,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        updated_at=None
+    )
+    values.update(overrides)
+    return Logement(**values)
+
+def test_serialize_logement_identique_a_response_model():
+    """Test sérialisation directe: mêmes clés, même ordre et mêmes valeurs que LogementResponse"""
+    logements = [
+        make_logement(),
+        make_logement(
+            statut=StatutLogement.OCCUPE,
+            description="Vue dégagée",
+            updated_at=datetime(2024, 2, 1, 12, 30, 0, 123456, tzinfo=timezone.utc)
+        ),
+        make_logement(created_at=datetime(2024, 1, 1, 10, tzinfo=timezone(timedelta(hours=2)))),
+        make_logement(created_at=datetime(2024, 1, 1, 10))
+    ]
+
+    for logement in logements:
+        expected = LogementResponse.model_validate(logement).model_dump(mode="json")
+        data = serialize_logement(logement)
+        assert list(data) == list(expected)
+        assert data == expected
+
+def test_orjson_response_rendu_comme_pydantic():
+    """Test rendu orjson: UTC en "Z", énumérations par valeur"""
+    body = ORJSONResponse({
+        "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "statut": StatutLogement.DISPONIBLE
+    }).body
+
+    assert json.loads(body) == {"created_at": "2024-01-01T00:00:00Z", "statut": "disponible"}
+
+def test_json_response_conserve_les_en_tetes():
+    """Test en-têtes de la réponse injectée recopiés sur la réponse rendue"""
+    response = Response()
+    del response.headers["content-length"]
+    response.headers["X-Next-Cursor"] = "abc"
+    response.headers["ETag"] = '"v1"'
+
+    rendered = json_response([serialize_logement(make_logement())], response)
+
+    assert rendered.headers["x-next-cursor"] == "abc"
+    assert rendered.headers["etag"] == '"v1"'
+    assert rendered.headers["content-type"] == "application/json"
+    assert json.loads(rendered.body)[0]["loyer"] == 500.0
@@ -0,0 +1,260 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateIndex
+from datetime import datetime, timezone
+from app.models.logement import Logement, StatutLogement
+from app.services.logement_service import LogementService
+from app.exceptions.logement_exceptions import LogementValidationError, LogementBusinessRuleError
+from app.schemas.logement import LogementCreate, LogementUpdate
+
+def make_logement(logement_id: int, updated_at=None) -> Logement:
+    logement = Logement()
+    logement.id = logement_id
+    logement.created_at = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    logement.updated_at = updated_at
+    return logement
+
+def test_cursor_round_trip():
+    """Test encodage/décodage d'un curseur de pagination"""
+    service = LogementService()
+    logement = make_logement(42, updated_at=datetime(2024, 2, 1, 8, 30, tzinfo=timezone.utc))
+
+    cursor = service._encode_cursor(logement)
+    updated_at, created_at, logement_id = service._decode_cursor(cursor)
+
+    assert "=" not in cursor
+    assert updated_at == logement.updated_at
+    assert created_at == logement.created_at
+    assert logement_id == 42
+
+def test_cursor_round_trip_sans_updated_at():
+    """Test curseur d'un logement jamais modifié"""
+    service = LogementService()
+    cursor = service._encode_cursor(make_logement(7))
+
+    updated_at, created_at, logement_id = service._decode_cursor(cursor)
+
+    assert updated_at is None
+    assert logement_id == 7
+
+@pytest.mark.parametrize("cursor", ["pas-un-curseur", "e30", "!!!"])
+def test_cursor_invalide(cursor):
+    """Test rejet d'un curseur falsifié"""
+    service = LogementService()
+
+    with pytest.raises(LogementValidationError) as exc_info:
+        service._decode_cursor(cursor)
+
+    assert exc_info.value.field == "cursor"
+
+def test_get_logements_page_avec_page_suivante():
+    """Test page pleine: un curseur est renvoyé pour la page suivante"""
+    service = LogementService()
+    db_mock = MagicMock()
+    rows = [make_logement(i) for i in (5, 4, 3)]
+    db_mock.scalars.return_value.all.return_value = rows
+
+    logements, next_cursor = service.get_logements_page(db_mock, limit=2)
+
+    assert db_mock.scalars.call_args[0][0]._limit == 3
+    assert [l.id for l in logements] == [5, 4]
+    assert service._decode_cursor(next_cursor)[2] == 4
+
+def test_get_logements_page_derniere_page():
+    """Test dernière page: pas de curseur suivant"""
+    service = LogementService()
+    db_mock = MagicMock()
+    rows = [make_logement(1)]
+    db_mock.scalars.return_value.all.return_value = rows
+
+    logements, next_cursor = service.get_logements_page(db_mock, limit=2, statut=StatutLogement.DISPONIBLE)
+
+    assert len(logements) == 1
+    assert next_cursor is None
+
+def make_stats_row(groupe, statut=None, ville=None, pays=None, total=0, loyers=(None, None, None), totaux=(None, None, None)):
+    return SimpleNamespace(
+        groupe=groupe, statut=statut, ville=ville, pays=pays, total=total,
+        loyer_moyen=loyers[0], loyer_min=loyers[1], loyer_max=loyers[2],
+        montant_total_moyen=totaux[0], montant_total_min=totaux[1], montant_total_max=totaux[2]
+    )
+
+def test_get_stats_logements_une_seule_requete():
+    """Test statistiques calculées à partir d'une seule agrégation"""
+    service = LogementService()
+    db_mock = MagicMock()
+    db_mock.execute.return_value.all.return_value = [
+        make_stats_row(service.GROUPE_TOTAL, total=3, loyers=(633.333, 400.0, 1000.0), totaux=(700.0, 450.0, 1150.0)),
+        make_stats_row(service.GROUPE_STATUT, statut=StatutLogement.DISPONIBLE, total=2),
+        make_stats_row(service.GROUPE_STATUT, statut=StatutLogement.OCCUPE, total=1),
+        make_stats_row(service.GROUPE_VILLE, ville="Lyon", total=1, loyers=(400.0, 400.0, 400.0)),
+        make_stats_row(service.GROUPE_VILLE, ville="Paris", total=2, loyers=(750.0, 500.0, 1000.0)),
+        make_stats_row(service.GROUPE_PAYS, pays="France", total=3, loyers=(633.333, 400.0, 1000.0)),
+    ]
+
+    stats = service.get_stats_logements(db_mock)
+
+    db_mock.execute.assert_called_once()
+    assert stats["total"] == 3
+    assert stats["disponibles"] == 2
+    assert stats["occupes"] == 1
+    assert stats["maintenance"] == 0
+    assert stats["loyer"] == {"moyen": 633.33, "min": 400.0, "max": 1000.0}
+    assert stats["montant_total"]["max"] == 1150.0
+    assert [v["ville"] for v in stats["par_ville"]] == ["Paris", "Lyon"]
+    assert stats["par_pays"] == [{"pays": "France", "total": 3, "loyer_moyen": 633.33}]
+
+def test_get_stats_logements_table_vide():
+    """Test statistiques sans aucun logement"""
+    service = LogementService()
+    db_mock = MagicMock()
+    db_mock.execute.return_value.all.return_value = [make_stats_row(service.GROUPE_TOTAL, total=0)]
+
+    stats = service.get_stats_logements(db_mock)
+
+    assert stats["total"] == 0
+    assert stats["loyer"]["moyen"] is None
+    assert stats["par_ville"] == []
+
+def test_recherche_utilise_expression_indexee():
+    """Test que la requête de recherche reprend l'expression de l'index plein texte"""
+    service = LogementService()
+    index = next(i for i in Logement.__table__.indexes if i.name == "ix_logements_search")
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    expression = ddl[ddl.index("(") + 1:ddl.rindex(")")]
+
+    sql = str(service._list_statement(q="studio").compile(dialect=postgresql.dialect()))
+
+    assert expression.replace("titre", "logements.titre").replace("description", "logements.description") in sql
+
+def test_get_logements_fingerprint_une_agregation():
+    """Test empreinte de liste: une agrégation filtrée, sans charger les lignes"""
+    service = LogementService()
+    db_mock = MagicMock()
+    last_modified = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    db_mock.execute.return_value.one.return_value = (4, last_modified, 1709251200.5)
+
+    fingerprint = service.get_logements_fingerprint(db_mock, statut=StatutLogement.DISPONIBLE, ville="Paris")
+
+    assert fingerprint == {"count": 4, "last_modified": last_modified.isoformat(), "checksum": "1709251200.5"}
+    sql = str(db_mock.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+    assert "count(logements.id)" in sql
+    assert "max(coalesce(logements.updated_at, logements.created_at))" in sql
+    assert "logements.statut = " in sql
+    assert "ORDER BY" not in sql
+
+def test_get_logements_fingerprint_liste_vide():
+    """Test empreinte d'une liste vide"""
+    service = LogementService()
+    db_mock = MagicMock()
+    db_mock.execute.return_value.one.return_value = (0, None, None)
+
+    assert service.get_logements_fingerprint(db_mock) == {"count": 0, "last_modified": None, "checksum": None}
+
+def test_get_logement_version_verrouille_pour_if_match():
+    """Test version lue avec SELECT ... FOR UPDATE avant une mise à jour conditionnelle"""
+    service = LogementService()
+
+    sql = str(service._version_statement(1, for_update=True).compile(dialect=postgresql.dialect()))
+
+    assert sql.endswith("FOR UPDATE")
+
+def test_parse_fields():
+    """Test paramètre fields: liste, préréglage compact et champs inconnus"""
+    service = LogementService()
+
+    assert service.parse_fields(None) is None
+    assert service.parse_fields("titre, ville,titre") == ["titre", "ville"]
+    assert service.parse_fields("compact") == ["id", "titre", "ville", "loyer", "montant_total", "statut"]
+    for fields in ("titre,mot_de_passe", " , "):
+        with pytest.raises(LogementValidationError) as exc_info:
+            service.parse_fields(fields)
+        assert exc_info.value.field == "fields"
+
+def test_projection_selectionne_colonnes_et_cles_de_tri():
+    """Test fields: seules les colonnes demandées et les clés de tri sont lues"""
+    service = LogementService()
+
+    stmt = service._page_statement(10, champs=["titre", "ville"])
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    colonnes = sql[len("SELECT "):sql.index(" \nFROM")]
+
+    assert colonnes.split(", ") == [
+        "logements.titre", "logements.ville", "logements.updated_at", "logements.created_at", "logements.id"
+    ]
+    assert "description" not in sql
+
+def test_get_logements_page_projection():
+    """Test page partielle: dictionnaires des champs demandés et curseur conservé"""
+    service = LogementService()
+    db_mock = MagicMock()
+    rows = [
+        SimpleNamespace(id=i, titre=f"Logement {i}", updated_at=None, created_at=datetime(2024, 1, i, tzinfo=timezone.utc))
+        for i in (3, 2, 1)
+    ]
+    db_mock.execute.return_value.all.return_value = rows
+
+    page, next_cursor = service.get_logements_page(db_mock, limit=2, fields="titre")
+
+    assert page == [{"titre": "Logement 3"}, {"titre": "Logement 2"}]
+    assert service._decode_cursor(next_cursor)[2] == 2
+    db_mock.scalars.assert_not_called()
+
+def make_logement_create(**overrides) -> LogementCreate:
+    data = {
+        "titre": "Appartement T2 lumineux",
+        "adresse": "15 rue de la Paix",
+        "ville": "Paris",
+        "code_postal": "75001",
+        "loyer": 1000.0,
+        "montant_charges": 150.0
+    }
+    data.update(overrides)
+    return LogementCreate(**data)
+
+def test_create_logement_doublon_adresse():
+    """Test doublon détecté par ON CONFLICT DO NOTHING (aucune ligne renvoyée)"""
+    service = LogementService()
+    db_mock = MagicMock()
+    db_mock.scalars.return_value.first.return_value = None
+
+    with pytest.raises(LogementBusinessRuleError) as exc_info:
+        service.create_logement(db_mock, make_logement_create())
+
+    assert exc_info.value.rule == "duplicate_adresse"
+    db_mock.rollback.assert_called_once()
+    db_mock.commit.assert_not_called()
+
+def test_create_logement_un_seul_aller_retour():
+    """Test création sans SELECT préalable de détection des doublons"""
+    service = LogementService()
+    db_mock = MagicMock()
+
+    service.create_logement(db_mock, make_logement_create())
+
+    db_mock.query.assert_not_called()
+    sql = str(db_mock.scalars.call_args[0][0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (lower(adresse), lower(ville)) DO NOTHING" in sql
+    assert "RETURNING" in sql
+
+def test_update_logement_doublon_adresse():
+    """Test violation de l'index unique à la mise à jour traduite en règle métier"""
+    service = LogementService()
+    db_mock = MagicMock()
+    existant = make_logement(1)
+    existant.loyer = 1000.0
+    existant.montant_charges = 100.0
+    service.get_logement = MagicMock(return_value=existant)
+    db_mock.commit.side_effect = IntegrityError(
+        "UPDATE logements ...", {},
+        Exception('duplicate key value violates unique constraint "uq_logements_adresse_ville"')
+    )
+
+    with pytest.raises(LogementBusinessRuleError) as exc_info:
+        service.update_logement(db_mock, 1, LogementUpdate(adresse="15 rue de la Paix"))
+
+    assert exc_info.value.rule == "duplicate_adresse"
+    db_mock.rollback.assert_called_once()
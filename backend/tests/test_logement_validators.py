@@ -0,0 +1,88 @@
+import pytest
+from pydantic import ValidationError
+from unittest.mock import MagicMock
+from app.exceptions.logement_exceptions import LogementValidationError
+from app.models.logement import Logement
+from datetime import datetime
+from app.schemas.logement import LogementCreate, LogementResponse, LogementUpdate
+from app.services.logement_service import LogementService
+from app.validators import logement_validators
+
+def make_create(**overrides):
+    values = dict(
+        titre="Appartement lumineux",
+        adresse="12 rue des Lilas",
+        ville="Paris",
+        code_postal="75011",
+        pays="France",
+        loyer=900.0,
+        montant_charges=100.0
+    )
+    values.update(overrides)
+    return LogementCreate(**values)
+
+def test_code_postal_selon_le_pays():
+    """Test seul le format du pays est accepté quand le pays est connu"""
+    assert logement_validators.validate_code_postal("1000", "Belgique") == "1000"
+    assert logement_validators.validate_code_postal(" h2x 1y4 ", "canada") == "H2X 1Y4"
+    assert logement_validators.validate_code_postal("10001-1234", "USA") == "10001-1234"
+
+    with pytest.raises(ValueError) as exc_info:
+        logement_validators.validate_code_postal("75001", "Belgique")
+    assert "pour le pays: Belgique" in str(exc_info.value)
+
+def test_code_postal_sans_pays():
+    """Test sans pays: tout format supporté, correspondance complète exigée"""
+    for code_postal in ("75001", "1000", "H2X 1Y4", "10001-1234"):
+        logement_validators.validate_code_postal(code_postal)
+
+    for code_postal in ("123", "750011", "7500A", "ABCDE"):
+        with pytest.raises(ValueError):
+            logement_validators.validate_code_postal(code_postal)
+
+def test_tables_figees():
+    """Test tables de pays non modifiables à l'exécution"""
+    with pytest.raises(TypeError):
+        logement_validators.CODES_POSTAUX["japon"] = None
+    assert logement_validators.PAYS_VALIDES == frozenset(logement_validators.CODES_POSTAUX)
+
+def test_schema_et_modele_memes_regles():
+    """Test mêmes normalisations et mêmes messages côté schéma et côté modèle"""
+    logement = Logement()
+    assert logement.validate_ville("ville", "  saint-étienne ") == make_create(ville="  saint-étienne ").ville
+    assert logement.validate_pays("pays", "belgique") == make_create(pays="belgique", code_postal="1000").pays
+
+    with pytest.raises(ValueError) as model_error:
+        logement.validate_ville("ville", "Paris 15")
+    with pytest.raises(ValidationError) as schema_error:
+        make_create(ville="Paris 15")
+    assert str(model_error.value) in str(schema_error.value)
+
+def test_schema_code_postal_du_pays():
+    """Test création: code postal français refusé pour un logement au Canada"""
+    assert make_create(pays="Canada", code_postal="h2x 1y4").code_postal == "H2X 1Y4"
+
+    with pytest.raises(ValidationError) as exc_info:
+        make_create(pays="Canada", code_postal="75011")
+    assert "pour le pays: Canada" in str(exc_info.value)
+
+def test_reponse_ligne_ancienne_regle():
+    """Test réponse: ligne enregistrée sous l'ancienne règle relue sans erreur"""
+    data = make_create().model_dump()
+    data.update(code_postal="7501", id=1, montant_total=1000.0, created_at=datetime(2024, 1, 1))
+
+    assert LogementResponse(**data).code_postal == "7501"
+    with pytest.raises(ValidationError):
+        make_create(code_postal="7501")
+
+def test_mise_a_jour_pays_verifie_code_postal():
+    """Test mise à jour: nouveau pays vérifié avec le code postal existant"""
+    service = LogementService()
+    db_logement = Logement(code_postal="75011", pays="France", loyer=900.0, montant_charges=100.0)
+
+    with pytest.raises(LogementValidationError) as exc_info:
+        service._apply_update(db_logement, LogementUpdate(pays="Belgique"))
+    assert exc_info.value.field == "code_postal"
+
+    service._apply_update(db_logement, LogementUpdate(pays="Belgique", code_postal="1050"))
+    assert (db_logement.pays, db_logement.code_postal) == ("Belgique", "1050")
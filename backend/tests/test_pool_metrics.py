@@ -0,0 +1,62 @@
+import sqlite3
+import pytest
+from sqlalchemy import create_engine, exc
+from app.monitoring import InstrumentedQueuePool, register_engine, pool_stats
+
+def make_engine(**kwargs):
+    return create_engine(
+        "sqlite://",
+        creator=lambda: sqlite3.connect(":memory:", check_same_thread=False),
+        poolclass=InstrumentedQueuePool,
+        **kwargs
+    )
+
+def test_pool_compte_emprunts_et_debordements():
+    """Test emprunts, débordement au-delà de pool_size et pic d'overflow"""
+    engine = make_engine(pool_size=1, max_overflow=1)
+
+    conn1 = engine.connect()
+    conn2 = engine.connect()
+    conn1.close()
+    conn2.close()
+
+    metrics = engine.pool.metrics.snapshot()
+    assert metrics["checkouts"] == 2
+    assert metrics["overflow_created"] == 1
+    assert metrics["overflow_max"] == 1
+    assert metrics["timeouts"] == 0
+
+def test_pool_compte_timeouts_et_attente():
+    """Test pool épuisé: attente mesurée et timeout comptabilisé"""
+    engine = make_engine(pool_size=1, max_overflow=0, pool_timeout=0.05)
+
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    metrics = engine.pool.metrics.snapshot()
+    assert metrics["checkouts"] == 1
+    assert metrics["timeouts"] == 1
+
+def test_pool_metrics_conservees_apres_dispose():
+    """Test compteurs conservés lorsque le pool est recréé"""
+    engine = make_engine(pool_size=1, max_overflow=0)
+    engine.connect().close()
+
+    engine.dispose()
+    engine.connect().close()
+
+    assert engine.pool.metrics.snapshot()["checkouts"] == 2
+
+def test_pool_stats_expose_etat_du_pool():
+    """Test snapshot publié par l'endpoint /metrics/pool"""
+    engine = make_engine(pool_size=2, max_overflow=3)
+    register_engine("test", engine)
+
+    with engine.connect():
+        stats = pool_stats()["test"]
+
+    assert stats["size"] == 2
+    assert stats["checked_out"] == 1
+    assert stats["max_overflow"] == 3
+    assert stats["checkouts"] == 1
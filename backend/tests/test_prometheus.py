@@ -0,0 +1,97 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.exceptions.logement_exceptions import (
+    LogementNotFoundError,
+    LogementValidationError,
+    convert_to_http_exception
+)
+from app.middleware.metrics import PrometheusMiddleware
+from app.monitoring.metrics import LOGEMENT_ERRORS, REQUEST_LATENCY, REQUESTS_IN_PROGRESS, REQUESTS_TOTAL
+from app.monitoring.prometheus import Counter, Gauge, Histogram, Registry
+
+def test_format_texte_exposition():
+    """Test rendu Prometheus: HELP/TYPE, étiquettes échappées, compteur sans étiquette à zéro"""
+    registry = Registry()
+    counter = registry.register(Counter("jobs_total", "Travaux", ["queue"]))
+    registry.register(Gauge("en_cours", "En cours"))
+    counter.inc(queue='pdf "attestation"')
+    counter.inc(2, queue='pdf "attestation"')
+
+    lines = registry.render().splitlines()
+
+    assert lines[:3] == [
+        "# HELP jobs_total Travaux",
+        "# TYPE jobs_total counter",
+        'jobs_total{queue="pdf \\"attestation\\""} 3.0',
+    ]
+    assert "en_cours 0.0" in lines
+
+def test_histogramme_cumulatif():
+    """Test buckets cumulés, somme et nombre d'observations"""
+    histogram = Histogram("latence_seconds", "Latence", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 3.0):
+        histogram.observe(value, route="/x")
+
+    samples = {(name, labels.get("le")): value for name, labels, value in histogram.samples()}
+
+    assert samples[("latence_seconds_bucket", "0.1")] == 1
+    assert samples[("latence_seconds_bucket", "1.0")] == 2
+    assert samples[("latence_seconds_bucket", "+Inf")] == 3
+    assert samples[("latence_seconds_sum", None)] == pytest.approx(3.55)
+    assert samples[("latence_seconds_count", None)] == 3
+
+def test_etiquettes_obligatoires():
+    """Test étiquettes manquantes refusées"""
+    with pytest.raises(ValueError):
+        Counter("c_total", "C", ["route"]).inc()
+
+def test_erreurs_metier_comptees_par_classe():
+    """Test convert_to_http_exception compte chaque classe avec son code HTTP"""
+    before = LOGEMENT_ERRORS.value(exception="LogementNotFoundError", status_code=404)
+
+    convert_to_http_exception(LogementNotFoundError(7))
+    convert_to_http_exception(LogementValidationError("Titre invalide", "titre"))
+
+    assert LOGEMENT_ERRORS.value(exception="LogementNotFoundError", status_code=404) == before + 1
+    assert LOGEMENT_ERRORS.value(exception="LogementValidationError", status_code=422) >= 1
+
+def test_middleware_par_modele_de_route():
+    """Test requêtes étiquetées par modèle de route, pas par chemin"""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    app.add_middleware(PrometheusMiddleware)
+    client = TestClient(app)
+    route = "/items/{item_id}"
+    before = REQUEST_LATENCY.count(method="GET", route=route)
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/abc")
+    client.post("/items/1")
+    client.get("/inconnu")
+
+    assert REQUEST_LATENCY.count(method="GET", route=route) == before + 3
+    assert REQUESTS_TOTAL.value(method="GET", route=route, status_code=422) >= 1
+    assert REQUESTS_TOTAL.value(method="POST", route=route, status_code=405) >= 1
+    assert REQUESTS_TOTAL.value(method="GET", route="unmatched", status_code=404) >= 1
+    assert REQUESTS_IN_PROGRESS.value() == 0
+
+def test_endpoint_metrics():
+    """Test GET /metrics de l'application: HTTP, pools et cache"""
+    from app.main import app
+
+    client = TestClient(app)
+    client.get("/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/health",status_code="200"}' in body
+    assert 'db_pool_checkouts_total{engine="primary"}' in body
+    assert "logement_cache_hit_ratio" in body
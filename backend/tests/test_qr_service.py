@@ -0,0 +1,123 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from PIL import Image
+from app.database import get_read_db
+from app.documents.qr import MARGE_IMAGE, qr_matrix, qr_png, qr_svg, render_qr_batch
+from app.exceptions.souscription_exceptions import SouscriptionNotFoundError
+from app.main import app
+from app.services.qr_service import QRCodeService
+from app.services.souscription_service import souscription_service
+
+URL = "http://localhost:3000/verify/ATT-TEST00000001"
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Pool de threads qui compte les lots reçus"""
+
+    def __init__(self):
+        super().__init__(2)
+        self.lots = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.lots.append(list(args[1]))
+        return super().submit(fn, *args, **kwargs)
+
+def test_images_png_svg():
+    """Test rendu: PNG 1 bit avec marge, SVG à un seul chemin"""
+    cote = (len(qr_matrix(URL)) + 2 * MARGE_IMAGE) * 4
+    image = Image.open(BytesIO(qr_png(URL, module=4)))
+    assert image.format == "PNG"
+    assert image.size == (cote, cote)
+    # Marge blanche, module de position noir
+    assert image.getpixel((0, 0)) == 255
+    assert image.getpixel((MARGE_IMAGE * 4, MARGE_IMAGE * 4)) == 0
+
+    svg = qr_svg(URL)
+    assert svg.startswith(b'<svg xmlns="http://www.w3.org/2000/svg"')
+    assert svg.count(b"<path") == 1
+
+    assert render_qr_batch("svg", [URL, URL]) == [svg, svg]
+    with pytest.raises(ValueError, match="inconnu"):
+        render_qr_batch("gif", [URL])
+
+def test_rendu_par_lots_et_dedoublonnage():
+    """Test lots: demandes simultanées regroupées, même référence rendue une fois"""
+    executor = CountingExecutor()
+    service = QRCodeService(batch_size=2, batch_delay=0.01, executor=executor)
+    references = [f"ATT-TEST0000000{i}" for i in range(5)]
+
+    async def demander():
+        images = await service.get_many(references)
+        doublons = await asyncio.gather(service.get(references[0]), service.get(references[0], "svg"))
+        return images, doublons
+
+    images, doublons = asyncio.run(demander())
+
+    assert list(images) == references
+    assert [len(lot) for lot in executor.lots] == [2, 2, 1, 1]
+    assert doublons[0] is images[references[0]]
+    assert doublons[1].contenu.startswith(b"<svg")
+    assert images[references[0]].etag != images[references[1]].etag
+    assert service.stats()["batches"] == 4
+
+def test_cache_lru_borne():
+    service = QRCodeService(max_size=2, executor=ThreadPoolExecutor(1))
+
+    async def demander(*references):
+        for reference in references:
+            await service.get(reference)
+
+    asyncio.run(demander("ATT-A", "ATT-B", "ATT-A", "ATT-C"))
+
+    assert service.cached("ATT-A", "png") is not None
+    assert service.cached("ATT-B", "png") is None
+    assert service.cached("ATT-C", "png") is not None
+    assert service.stats()["evictions"] == 1
+
+def test_echec_du_lot_propage():
+    executor = MagicMock()
+    executor.submit.side_effect = RuntimeError("pool arrêté")
+    service = QRCodeService(executor=executor)
+
+    with pytest.raises(RuntimeError, match="pool arrêté"):
+        asyncio.run(service.get("ATT-A"))
+    assert service.cached("ATT-A", "png") is None
+
+@pytest.fixture
+def qr_client(monkeypatch):
+    service = QRCodeService(executor=ThreadPoolExecutor(2))
+    monkeypatch.setattr("app.routers.souscriptions.qr_service", service)
+    lookup = MagicMock(side_effect=lambda db, reference: reference)
+    monkeypatch.setattr(souscription_service, "get_by_reference", lookup)
+    app.dependency_overrides[get_read_db] = lambda: MagicMock()
+    try:
+        yield TestClient(app), lookup
+    finally:
+        app.dependency_overrides.pop(get_read_db)
+
+def test_qr_endpoint_cache_http(qr_client):
+    """Test GET /qr: image, cache HTTP long, 304, base consultée au premier rendu seulement"""
+    client, lookup = qr_client
+
+    response = client.get("/api/souscriptions/ATT-TEST00000001/qr")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert response.content == qr_png(URL)
+
+    etag = response.headers["etag"]
+    assert client.get("/api/souscriptions/ATT-TEST00000001/qr", headers={"If-None-Match": etag}).status_code == 304
+    lookup.assert_called_once()
+
+    svg = client.get("/api/souscriptions/ATT-TEST00000001/qr", params={"format": "svg"})
+    assert svg.headers["content-type"] == "image/svg+xml"
+    assert client.get("/api/souscriptions/ATT-TEST00000001/qr", params={"format": "gif"}).status_code == 422
+
+def test_qr_endpoint_reference_inconnue(qr_client):
+    client, lookup = qr_client
+    lookup.side_effect = SouscriptionNotFoundError("ATT-INCONNUE")
+
+    assert client.get("/api/souscriptions/ATT-INCONNUE/qr").status_code == 404
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from app.database import SessionLocal, engine, Base
+from app.models import Logement, Souscription
+from app.models.logement import StatutLogement
+from app.services.logement_service import LogementService
+
+@pytest.fixture
+def db_session():
+    # Create tables for testing (indexes trigrammes: extension pg_trgm requise)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.create_all(bind=engine)
+
+    session = SessionLocal()
+    # Sur une table quasi vide le planificateur préfère un parcours séquentiel:
+    # on le désactive pour vérifier que l'index est utilisable
+    session.execute(text("SET enable_seqscan = off"))
+
+    try:
+        yield session
+    finally:
+        session.close()
+        # Clean up tables after tests
+        Base.metadata.drop_all(bind=engine)
+
+def explain(db_session: Session, stmt) -> str:
+    """Plan d'exécution PostgreSQL d'une requête"""
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    rows = db_session.execute(text(f"EXPLAIN {sql}")).scalars().all()
+    return "\n".join(rows)
+
+def test_plan_liste_logements(db_session: Session):
+    """Test tri de la liste servi par ix_logements_recent"""
+    query = LogementService()._list_statement().limit(20)
+
+    assert "ix_logements_recent" in explain(db_session, query)
+
+def test_plan_logements_disponibles(db_session: Session):
+    """Test liste des disponibles servie par l'index partiel"""
+    query = LogementService()._list_statement(statut=StatutLogement.DISPONIBLE).limit(20)
+
+    assert "ix_logements_disponibles_recent" in explain(db_session, query)
+
+def test_plan_doublon_adresse(db_session: Session):
+    """Test recherche sur l'adresse normalisée servie par l'index unique"""
+    query = select(Logement).where(
+        func.lower(Logement.adresse) == "15 rue de la paix",
+        func.lower(Logement.ville) == "paris"
+    )
+
+    assert "uq_logements_adresse_ville" in explain(db_session, query)
+
+def test_plan_filtre_ville(db_session: Session):
+    """Test filtre ville ILIKE servi par l'index trigramme"""
+    query = LogementService()._list_statement(ville="Paris")
+
+    assert "ix_logements_ville_trgm" in explain(db_session, query)
+
+def test_plan_souscriptions_par_logement(db_session: Session):
+    """Test souscriptions d'un logement indexées par clé étrangère"""
+    query = select(Souscription).where(Souscription.logement_id == 1)
+
+    assert "ix_souscriptions_logement_id" in explain(db_session, query)
+
+def test_plan_souscriptions_par_client(db_session: Session):
+    """Test souscriptions d'un client indexées par clé étrangère"""
+    query = select(Souscription).where(Souscription.client_id == 1)
+
+    assert "ix_souscriptions_client_id" in explain(db_session, query)
@@ -0,0 +1,82 @@
+import logging
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.middleware.timing import QueryTimingMiddleware
+from app.monitoring import current_request_stats, instrument_engine, queries
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'timing.db'}")
+    instrument_engine(engine)
+    Session = sessionmaker(bind=engine)
+
+    def get_session():
+        with Session() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/trois-requetes")
+    def trois_requetes(db=Depends(get_session)):
+        # Route synchrone: exécutée dans le threadpool
+        for _ in range(3):
+            db.execute(text("SELECT 1"))
+        return {"stats": current_request_stats().count}
+
+    @app.get("/sans-base")
+    async def sans_base():
+        return {}
+
+    app.add_middleware(QueryTimingMiddleware)
+    return TestClient(app)
+
+def parse_server_timing(header):
+    metrics = {}
+    for entry in header.split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        metrics[name] = dict(param.split("=", 1) for param in params)
+    return metrics
+
+def test_server_timing_compte_les_requetes(client):
+    """Test en-tête Server-Timing: requêtes SQL du threadpool comptées pour la requête"""
+    response = client.get("/trois-requetes")
+
+    assert response.json() == {"stats": 3}
+    metrics = parse_server_timing(response.headers["server-timing"])
+    assert metrics["db"]["desc"] == '"SQL: 3"'
+    assert float(metrics["db"]["dur"]) > 0
+    assert float(metrics["total"]["dur"]) >= float(metrics["db"]["dur"])
+
+def test_requetes_isolees_entre_requetes_http(client):
+    """Test compteurs propres à chaque requête HTTP"""
+    client.get("/trois-requetes")
+    response = client.get("/sans-base")
+
+    assert parse_server_timing(response.headers["server-timing"])["db"]["desc"] == '"SQL: 0"'
+
+def test_journal_structure(client, caplog):
+    """Test journal par requête avec champs structurés"""
+    with caplog.at_level(logging.INFO, logger="app.requests"):
+        client.get("/trois-requetes")
+
+    record = next(r for r in caplog.records if r.name == "app.requests")
+    assert (record.method, record.path, record.status_code, record.queries) == ("GET", "/trois-requetes", 200, 3)
+    assert record.total_ms >= record.db_ms
+
+def test_journal_requetes_lentes(client, caplog, monkeypatch):
+    """Test requêtes au-delà de SLOW_QUERY_THRESHOLD_MS journalisées"""
+    monkeypatch.setattr(queries, "SLOW_QUERY_THRESHOLD_MS", 0.000001)
+    with caplog.at_level(logging.WARNING, logger="app.monitoring.queries"):
+        client.get("/trois-requetes")
+
+    slow = [r for r in caplog.records if r.name == "app.monitoring.queries"]
+    assert len(slow) == 3
+    assert slow[0].statement == "SELECT 1"
+
+    monkeypatch.setattr(queries, "SLOW_QUERY_THRESHOLD_MS", 0)
+    caplog.clear()
+    client.get("/trois-requetes")
+    assert not [r for r in caplog.records if r.name == "app.monitoring.queries"]
@@ -0,0 +1,99 @@
+import time
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app import database
+from app.database import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER, get_read_db, get_write_db
+
+def make_sessionmaker(path, name):
+    """Base SQLite fichier marquée par son rôle (primaire ou réplique)"""
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE role (name TEXT)"))
+        conn.execute(text("INSERT INTO role VALUES (:name)"), {"name": name})
+    return sessionmaker(bind=engine)
+
+def role(db):
+    return db.execute(text("SELECT name FROM role")).scalar()
+
+app = FastAPI()
+
+@app.get("/lecture")
+def lecture(db=Depends(get_read_db)):
+    return {"base": role(db)}
+
+@app.post("/ecriture")
+def ecriture(db=Depends(get_write_db)):
+    return {"base": role(db)}
+
+@pytest.fixture
+def primary(tmp_path, monkeypatch):
+    primary = make_sessionmaker(tmp_path / "primary.db", "primary")
+    monkeypatch.setattr(database, "SessionLocal", primary)
+    return primary
+
+@pytest.fixture
+def replica(tmp_path, monkeypatch, primary):
+    replica = make_sessionmaker(tmp_path / "replica.db", "replica")
+    monkeypatch.setattr(database, "ReadSessionLocal", replica)
+    return replica
+
+def test_lectures_sur_replique_ecritures_sur_primaire(replica):
+    """Test routage: GET sur la réplique, écriture sur le primaire"""
+    client = TestClient(app)
+
+    assert client.get("/lecture").json() == {"base": "replica"}
+    assert client.post("/ecriture").json() == {"base": "primary"}
+
+def test_lecture_apres_ecriture_sur_primaire(replica):
+    """Test read-your-writes: après une écriture le client lit le primaire"""
+    client = TestClient(app)
+
+    response = client.post("/ecriture")
+    assert READ_PRIMARY_COOKIE in response.cookies
+    assert client.get("/lecture").json() == {"base": "primary"}
+
+    # Un autre client (sans cookie) continue de lire la réplique
+    assert TestClient(app).get("/lecture").json() == {"base": "replica"}
+
+def test_sans_replique_pas_de_cookie(primary, monkeypatch):
+    """Test sans DATABASE_READ_URL: tout passe par le primaire"""
+    monkeypatch.setattr(database, "ReadSessionLocal", primary)
+    client = TestClient(app)
+
+    response = client.post("/ecriture")
+
+    assert READ_PRIMARY_COOKIE not in response.cookies
+    assert READ_PRIMARY_HEADER not in response.headers
+    assert client.get("/lecture").json() == {"base": "primary"}
+
+def test_lecture_apres_ecriture_par_en_tete(replica):
+    """Test read-your-writes cross-origin: échéance renvoyée par le client en en-tête"""
+    response = TestClient(app).post("/ecriture")
+    until = response.headers[READ_PRIMARY_HEADER]
+    assert time.time() < float(until) <= time.time() + database.READ_STICKY_SECONDS
+
+    # Client sans cookie (frontend cross-origin): seul l'en-tête est renvoyé
+    client = TestClient(app)
+    assert client.get("/lecture", headers={READ_PRIMARY_HEADER: until}).json() == {"base": "primary"}
+    for valeur in (str(time.time() - 1), str(time.time() + 3600), "abc"):
+        assert client.get("/lecture", headers={READ_PRIMARY_HEADER: valeur}).json() == {"base": "replica"}
+
+def test_cors_en_tete_read_primary():
+    """Test CORS: en-tête autorisé en requête et exposé en réponse au frontend"""
+    from app.main import app as api
+    client = TestClient(api)
+    origin = {"Origin": "http://localhost:3000"}
+
+    preflight = client.options("/api/logements/", headers={
+        **origin,
+        "Access-Control-Request-Method": "GET",
+        "Access-Control-Request-Headers": READ_PRIMARY_HEADER.lower()
+    })
+    assert preflight.status_code == 200
+    assert READ_PRIMARY_HEADER.lower() in preflight.headers["access-control-allow-headers"].lower()
+
+    response = client.get("/health", headers=origin)
+    assert READ_PRIMARY_HEADER in response.headers["access-control-expose-headers"]
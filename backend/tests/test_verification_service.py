@@ -0,0 +1,180 @@
+import shutil
+import pytest
+from datetime import date
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.exceptions.souscription_exceptions import AttestationNotFoundError
+from app.main import app
+from app.models import Client, Logement, Souscription
+from app.models.souscription import StatutSouscription
+from app.schemas.verification import StatutVerification
+from app.services.cache_backends import BloomFilter
+from app.services.verification_service import AttestationVerificationService, Verification, date_expiration
+from tests.test_document_jobs import sqlite_session  # noqa: F401
+
+REFERENCE = "ATT-TEST00000001"
+
+class Horloge:
+    def __init__(self):
+        self.t = 1000.0
+
+    def __call__(self):
+        return self.t
+
+def test_bloom_filter():
+    """Test filtre de Bloom: aucun faux négatif, faux positifs proches du taux visé"""
+    bloom = BloomFilter(1000, 0.01)
+    references = [f"ATT-{i:012d}" for i in range(1000)]
+    for reference in references:
+        bloom.add(reference)
+
+    assert all(reference in bloom for reference in references)
+    faux_positifs = sum(f"ATT-X{i:011d}" in bloom for i in range(10000))
+    assert faux_positifs < 300
+    assert not bloom.full
+    bloom.add("ATT-EN-TROP")
+    assert bloom.full
+
+def test_date_expiration_et_statut():
+    assert date_expiration(date(2024, 9, 1), 12) == date(2025, 9, 1)
+    assert date_expiration(date(2024, 1, 31), 1) == date(2024, 2, 29)
+    assert date_expiration(date(2024, 11, 30), 3) == date(2025, 2, 28)
+
+    verification = Verification(REFERENCE, StatutSouscription.PAYE, date(2025, 9, 1))
+    assert verification.statut(date(2025, 9, 1)) == StatutVerification.VALIDE
+    assert verification.statut(date(2025, 9, 2)) == StatutVerification.EXPIREE
+    annulee = verification._replace(statut_souscription=StatutSouscription.CLOTURE)
+    assert annulee.statut(date(2025, 1, 1)) == StatutVerification.ANNULEE
+    assert verification.to_dict(date(2025, 1, 1)) == {
+        "reference": REFERENCE, "statut": "valide", "date_expiration": "2025-09-01"
+    }
+
+@pytest.fixture
+def service(sqlite_session):  # noqa: F811
+    horloge = Horloge()
+    return AttestationVerificationService(sqlite_session, bloom_refresh=5, clock=horloge), horloge
+
+def test_cache_positif(service, count_queries):
+    """Test cache positif: une seule lecture de la souscription, puis plus aucune requête"""
+    service, _ = service
+    engine = service.session_factory.kw["bind"]
+
+    with count_queries(engine) as statements:
+        verification = service.verify(REFERENCE)
+    assert verification.date_expiration == date(2025, 9, 1)
+    assert verification.statut_souscription == StatutSouscription.PAYE
+    # Chargement du filtre (comptage, références) puis lecture par référence
+    assert len(statements) == 3
+
+    with count_queries(engine) as statements:
+        assert service.cached(REFERENCE) == verification
+        assert service.verify(REFERENCE) == verification
+    assert statements == []
+    assert service.stats()["database_lookups"] == 1
+
+def test_balayage_aleatoire_sans_base(service, count_queries):
+    """Test références inventées: rejet par le filtre, au plus un rechargement par intervalle"""
+    service, horloge = service
+    engine = service.session_factory.kw["bind"]
+    service.verify(REFERENCE)
+
+    with count_queries(engine) as statements:
+        for i in range(200):
+            with pytest.raises(AttestationNotFoundError):
+                service.cached(f"ATT-RANDOM{i:06d}")
+    assert statements == []
+
+    horloge.t += 10
+    with count_queries(engine) as statements:
+        for i in range(200):
+            with pytest.raises(AttestationNotFoundError):
+                service.cached(f"ATT-RANDOM{i:06d}") or service.verify(f"ATT-RANDOM{i:06d}")
+    # Filtre ancien: un seul rechargement incrémental pour toute la rafale
+    assert len(statements) == 1
+    assert service.stats()["database_lookups"] == 1
+
+    with pytest.raises(AttestationNotFoundError):
+        service.cached("pas-une-reference")
+
+def test_nouvelle_souscription_et_invalidation(service, sqlite_session):  # noqa: F811
+    """Test nouvelle référence après chargement du filtre, puis paiement invalidé"""
+    service, horloge = service
+    service.verify(REFERENCE)
+    with sqlite_session() as db:
+        db.add(Souscription(
+            client=db.get(Client, 1), logement=db.get(Logement, 1), date_entree=date.today(),
+            duree_location=6, statut=StatutSouscription.ATTENTE_PAIEMENT, reference="ATT-NOUVELLE0001"
+        ))
+        db.commit()
+
+    horloge.t += 10
+    with pytest.raises(AttestationNotFoundError):
+        # Attestation pas encore délivrée
+        service.verify("ATT-NOUVELLE0001")
+    with sqlite_session() as db:
+        nouvelle = db.query(Souscription).filter_by(reference="ATT-NOUVELLE0001").one()
+        nouvelle.statut = StatutSouscription.PAYE
+        db.commit()
+    with pytest.raises(AttestationNotFoundError):
+        service.cached("ATT-NOUVELLE0001")
+
+    service.invalidate("ATT-NOUVELLE0001")
+    assert service.verify("ATT-NOUVELLE0001").statut() == StatutVerification.VALIDE
+
+def test_endpoint_verification(service, monkeypatch):
+    """Test GET /api/verify-attestation/{reference}: statut et cache HTTP public"""
+    service, _ = service
+    monkeypatch.setattr("app.routers.verification.verification_service", service)
+    client = TestClient(app)
+
+    response = client.get(f"/api/verify-attestation/{REFERENCE}")
+    assert response.status_code == 200
+    assert response.json() == {"reference": REFERENCE, "statut": "expiree", "date_expiration": "2025-09-01"}
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+    inconnue = client.get("/api/verify-attestation/ATT-INCONNUE0001")
+    assert inconnue.status_code == 404
+    assert inconnue.json()["detail"]["reference"] == "ATT-INCONNUE0001"
+    # Référence peut-être délivrée juste après: pas de 404 gardé par les proxys
+    assert inconnue.headers["cache-control"] == "no-store"
+
+def test_lecture_primaire_apres_invalidation(sqlite_session, tmp_path):  # noqa: F811
+    """Test réplique en retard: après invalidate, la référence est lue sur le primaire"""
+    with sqlite_session() as db:
+        db.add(Souscription(
+            client=db.get(Client, 1), logement=db.get(Logement, 1), date_entree=date.today(),
+            duree_location=6, statut=StatutSouscription.ATTENTE_PAIEMENT, reference="ATT-NOUVELLE0001"
+        ))
+        db.commit()
+    # Réplique figée avant le paiement
+    shutil.copy(sqlite_session.kw["bind"].url.database, tmp_path / "replique.db")
+    replique = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'replique.db'}"))
+    horloge = Horloge()
+    service = AttestationVerificationService(
+        replique, primary_session_factory=sqlite_session, bloom_refresh=5, primary_window=10, clock=horloge
+    )
+    service.verify(REFERENCE)
+
+    with sqlite_session() as db:
+        db.query(Souscription).filter_by(reference="ATT-NOUVELLE0001").one().statut = StatutSouscription.PAYE
+        db.add(Souscription(
+            client=db.get(Client, 1), logement=db.get(Logement, 1), date_entree=date.today(),
+            duree_location=6, statut=StatutSouscription.PAYE, reference="ATT-NOUVELLE0002"
+        ))
+        db.commit()
+    with pytest.raises(AttestationNotFoundError):
+        # Absente de la réplique et du filtre
+        service.cached("ATT-NOUVELLE0002")
+
+    for reference in ("ATT-NOUVELLE0001", "ATT-NOUVELLE0002"):
+        service.invalidate(reference)
+        assert service.cached(reference) is None
+        assert service.verify(reference).statut() == StatutVerification.VALIDE
+        assert service.cached(reference).statut() == StatutVerification.VALIDE
+
+    # Fenêtre écoulée: retour à la réplique
+    horloge.t += 10
+    service.cache.clear()
+    with pytest.raises(AttestationNotFoundError):
+        service.verify("ATT-NOUVELLE0001")
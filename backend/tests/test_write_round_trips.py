@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+from app.models.logement import Logement, StatutLogement
+from app.schemas.logement import LogementUpdate
+from app.services.logement_service import LogementService
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Base SQLite (RETURNING supporté), table logements sans les index PostgreSQL"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'logements.db'}")
+    with engine.begin() as conn:
+        conn.execute(CreateTable(Logement.__table__))
+    factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    with factory() as db:
+        db.add(Logement(
+            id=1, titre="Studio meublé", adresse="1 rue du Test", ville="Paris", code_postal="75001",
+            pays="France", loyer=500.0, montant_charges=50.0, montant_total=550.0,
+            statut=StatutLogement.DISPONIBLE
+        ))
+        db.commit()
+    return factory
+
+def make_service():
+    service = LogementService()
+    service.cache.clear()
+    return service
+
+def test_update_un_aller_retour(session_factory, count_queries):
+    """Test mise à jour: SELECT puis UPDATE ... RETURNING, aucun rechargement après commit"""
+    db = session_factory()
+    engine = db.get_bind()
+
+    with count_queries(engine) as statements:
+        db_logement = make_service().update_logement(db, 1, LogementUpdate(loyer=600.0))
+        assert db_logement.updated_at is not None
+        assert db_logement.montant_total == 650.0
+
+    assert len(statements) == 2
+    assert statements[0].startswith("SELECT")
+    assert statements[1].startswith("UPDATE") and "RETURNING" in statements[1]
+
+def test_changer_statut_un_aller_retour(session_factory, count_queries):
+    """Test changement de statut: version relue par RETURNING, sans refresh"""
+    db = session_factory()
+
+    with count_queries(db.get_bind()) as statements:
+        db_logement = make_service().changer_statut_logement(db, 1, StatutLogement.MAINTENANCE)
+        assert db_logement.statut == StatutLogement.MAINTENANCE
+        assert db_logement.updated_at is not None
+
+    assert len(statements) == 2
+    assert "RETURNING" in statements[1]
+
+def test_expiration_limitee_aux_ecritures_logements():
+    """Test sessions: seule la fabrique des écritures de logements n'expire pas au commit"""
+    from app import database
+
+    assert database.LogementWriteSessionLocal.kw["expire_on_commit"] is False
+    assert database.SessionLocal.kw.get("expire_on_commit", True) is True
@@ -2,6 +2,11 @@ import axios from 'axios';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 
+// Après une écriture, l'API renvoie l'échéance jusqu'à laquelle les lectures
+// doivent aller au primaire (réplique en retard): elle est répétée telle quelle
+const READ_PRIMARY_HEADER = 'X-Read-Primary-Until';
+let readPrimaryUntil = 0;
+
 const api = axios.create({
   baseURL: `${API_URL}/api`,
   headers: {
@@ -9,12 +14,25 @@ const api = axios.create({
   },
 });
 
+api.interceptors.request.use((config) => {
+  if (readPrimaryUntil > Date.now() / 1000) {
+    config.headers[READ_PRIMARY_HEADER] = String(readPrimaryUntil);
+  }
+  return config;
+});
+
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const until = Number(response.headers[READ_PRIMARY_HEADER.toLowerCase()]);
+    if (until) {
+      readPrimaryUntil = Math.max(readPrimaryUntil, until);
+    }
+    return response;
+  },
   (error) => {
     console.error('API Error:', error.response?.data || error.message);
     return Promise.reject(error);
   }
 );
 
-export default api;
\ No newline at end of file
+export default api;